@@ -0,0 +1,209 @@
+"""Motor de alinhamento semente-e-extensão (seed-and-extend).
+
+Em vez de preencher a matriz de Smith-Waterman inteira (query x ~44 kb da
+referência), localiza âncoras exatas com o índice de k-mers, encadeia as
+colineares e só executa programação dinâmica nos intervalos entre âncoras,
+nas pontas e na janela protegida (exon29), onde a posição exata de gaps e
+substituições importa para o laudo.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+from Bio.Align import Alignment, PairwiseAligner
+
+from kmers import Ancora, IndiceKmers, buscar_ancoras, encadear_ancoras
+
+EXTENSAO_MAXIMA = 1000
+FOLGA_EXTENSAO = 50
+MARGEM_JANELA_PROTEGIDA = 100
+
+
+def _clonar_aligner(base: PairwiseAligner, extremidade_livre: Optional[str] = None) -> PairwiseAligner:
+    """Cria um aligner global com a mesma pontuação do ``base``.
+
+    ``extremidade_livre`` ("left" ou "right") zera os gaps daquela ponta nas
+    duas sequências, o que equivale a um alinhamento local ancorado na ponta
+    oposta.
+    """
+    aligner = PairwiseAligner()
+    aligner.mode = "global"
+    if base.substitution_matrix is not None:
+        aligner.substitution_matrix = base.substitution_matrix
+    else:
+        aligner.match_score = base.match_score
+        aligner.mismatch_score = base.mismatch_score
+    aligner.open_gap_score = base.target_internal_open_gap_score
+    aligner.extend_gap_score = base.target_internal_extend_gap_score
+    if extremidade_livre:
+        for seq in ("target", "query"):
+            setattr(aligner, f"{seq}_{extremidade_livre}_open_gap_score", 0)
+            setattr(aligner, f"{seq}_{extremidade_livre}_extend_gap_score", 0)
+    return aligner
+
+
+def _pontuacao_identica(aligner: PairwiseAligner, trecho: str) -> float:
+    matriz = aligner.substitution_matrix
+    if matriz is None:
+        return float(aligner.match_score) * len(trecho)
+    return float(sum(matriz[b, b] for b in trecho))
+
+
+def _pontuacao_gap(aligner: PairwiseAligner, tamanho: int) -> float:
+    if tamanho <= 0:
+        return 0.0
+    return float(aligner.open_gap_score + (tamanho - 1) * aligner.extend_gap_score)
+
+
+def _aparar_gaps_extremos(coordenadas: np.ndarray, extremidade: str) -> np.ndarray:
+    """Remove os segmentos de gap da ponta livre ("left" ou "right")."""
+    coluna, vizinha = (0, 1) if extremidade == "left" else (-1, -2)
+    while coordenadas.shape[1] > 1:
+        passo = np.abs(coordenadas[:, coluna] - coordenadas[:, vizinha])
+        if passo[0] > 0 and passo[1] > 0:
+            break
+        coordenadas = np.delete(coordenadas, coluna, axis=1)
+    return coordenadas
+
+
+def _simplificar_coordenadas(pontos: List[Tuple[int, int]]) -> np.ndarray:
+    """Remove pontos repetidos e funde segmentos consecutivos do mesmo tipo."""
+    simplificados: List[Tuple[int, int]] = []
+    for ponto in pontos:
+        if simplificados and simplificados[-1] == ponto:
+            continue
+        if len(simplificados) >= 2:
+            (r0, q0), (r1, q1) = simplificados[-2], simplificados[-1]
+            dr_ant, dq_ant = r1 - r0, q1 - q0
+            dr, dq = ponto[0] - r1, ponto[1] - q1
+            mesmo_tipo = (dr_ant > 0) == (dr > 0) and (dq_ant > 0) == (dq > 0)
+            if mesmo_tipo:
+                simplificados[-1] = ponto
+                continue
+        simplificados.append(ponto)
+    return np.array(simplificados, dtype=np.int64).T
+
+
+def _remover_janela_protegida(cadeia: List[Ancora], inicio: int, fim: int) -> List[Ancora]:
+    """Apara as âncoras que invadem a janela protegida da referência."""
+    resultado: List[Ancora] = []
+    for q, r, tam in cadeia:
+        if r + tam <= inicio or r >= fim:
+            resultado.append((q, r, tam))
+            continue
+        if r < inicio:
+            resultado.append((q, r, inicio - r))
+        if r + tam > fim:
+            corte = fim - r
+            resultado.append((q + corte, fim, tam - corte))
+    return resultado
+
+
+def _alinhar_intervalo(
+    aligner: PairwiseAligner,
+    referencia: str,
+    sequencia: str,
+    ref_ini: int,
+    query_ini: int,
+) -> Tuple[List[Tuple[int, int]], float]:
+    """Alinha globalmente dois trechos e devolve os pontos em coordenadas absolutas."""
+    if not referencia and not sequencia:
+        return [], 0.0
+    if not referencia or not sequencia:
+        pontos = [(ref_ini, query_ini), (ref_ini + len(referencia), query_ini + len(sequencia))]
+        return pontos, _pontuacao_gap(aligner, max(len(referencia), len(sequencia)))
+
+    alinhamentos = aligner.align(referencia, sequencia)
+    coordenadas = alinhamentos[0].coordinates
+    pontos = [(ref_ini + int(r), query_ini + int(q)) for r, q in coordenadas.T]
+    return pontos, float(alinhamentos.score)
+
+
+def _estender_ponta(
+    aligner: PairwiseAligner,
+    extremidade: str,
+    referencia: str,
+    sequencia: str,
+    ref_ini: int,
+    query_ini: int,
+) -> Tuple[List[Tuple[int, int]], float]:
+    """Extensão com gaps livres na ponta externa (semântica local)."""
+    if not referencia or not sequencia:
+        return [], 0.0
+    alinhamentos = aligner.align(referencia, sequencia)
+    if alinhamentos.score <= 0:
+        return [], 0.0
+    coordenadas = _aparar_gaps_extremos(alinhamentos[0].coordinates, extremidade)
+    pontos = [(ref_ini + int(r), query_ini + int(q)) for r, q in coordenadas.T]
+    return pontos, float(alinhamentos.score)
+
+
+def alinhar_ancorado(
+    aligner: PairwiseAligner,
+    referencia: str,
+    sequencia: str,
+    indice: Optional[IndiceKmers] = None,
+    janela_protegida: Optional[Tuple[int, int]] = None,
+) -> Optional[Alignment]:
+    """Alinha ``sequencia`` contra ``referencia`` por semente-e-extensão.
+
+    Retorna um ``Alignment`` com o mesmo formato do obtido pelo
+    ``PairwiseAligner`` local (referência como target), ou ``None`` quando não
+    há âncoras suficientes — nesse caso o chamador deve recorrer à DP completa.
+    """
+    if indice is None:
+        indice = IndiceKmers.construir(referencia)
+
+    cadeia = encadear_ancoras(buscar_ancoras(indice, sequencia))
+    if janela_protegida is not None:
+        inicio, fim = janela_protegida
+        # Se a amostra só cobre a janela, mantém as âncoras originais
+        cadeia = _remover_janela_protegida(
+            cadeia,
+            max(0, inicio - MARGEM_JANELA_PROTEGIDA),
+            fim + MARGEM_JANELA_PROTEGIDA,
+        ) or cadeia
+    if not cadeia:
+        return None
+
+    aligner_global = _clonar_aligner(aligner)
+    pontos: List[Tuple[int, int]] = []
+    pontuacao = 0.0
+
+    # Ponta esquerda: local na extremidade livre, ancorada na primeira âncora
+    q0, r0, _ = cadeia[0]
+    q_esq = max(0, q0 - EXTENSAO_MAXIMA)
+    r_esq = max(0, r0 - (q0 - q_esq) - FOLGA_EXTENSAO)
+    trecho, valor = _estender_ponta(
+        _clonar_aligner(aligner, "left"), "left",
+        referencia[r_esq:r0], sequencia[q_esq:q0], r_esq, q_esq,
+    )
+    pontos.extend(trecho)
+    pontuacao += valor
+
+    for idx, (q, r, tam) in enumerate(cadeia):
+        if idx > 0:
+            q_ant, r_ant, tam_ant = cadeia[idx - 1]
+            fim_q, fim_r = q_ant + tam_ant, r_ant + tam_ant
+            trecho, valor = _alinhar_intervalo(
+                aligner_global, referencia[fim_r:r], sequencia[fim_q:q], fim_r, fim_q,
+            )
+            pontos.extend(trecho)
+            pontuacao += valor
+        pontos.extend([(r, q), (r + tam, q + tam)])
+        pontuacao += _pontuacao_identica(aligner, referencia[r:r + tam])
+
+    # Ponta direita: ancorada na última âncora, extremidade final livre
+    q_fim, r_fim, tam_fim = cadeia[-1]
+    q_fim, r_fim = q_fim + tam_fim, r_fim + tam_fim
+    q_dir = min(len(sequencia), q_fim + EXTENSAO_MAXIMA)
+    r_dir = min(len(referencia), r_fim + (q_dir - q_fim) + FOLGA_EXTENSAO)
+    trecho, valor = _estender_ponta(
+        _clonar_aligner(aligner, "right"), "right",
+        referencia[r_fim:r_dir], sequencia[q_fim:q_dir], r_fim, q_fim,
+    )
+    pontos.extend(trecho)
+    pontuacao += valor
+
+    alinhamento = Alignment([referencia, sequencia], _simplificar_coordenadas(pontos))
+    alinhamento.score = pontuacao
+    return alinhamento
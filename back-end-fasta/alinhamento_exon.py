@@ -0,0 +1,111 @@
+"""Alinhamento focado no exon29 (janela da referência contra janela da amostra).
+
+Todo o laudo depende de ~200 nt da referência. Este modo estima pela cadeia
+de âncoras de k-mers as diagonais (deslocamento query -> referência) nas
+bordas do exon29 e faz um alinhamento local completo (sem limite de banda
+na DP) da janela ``[inicio - margem, fim + margem)`` da referência contra o
+trecho correspondente da amostra, alargado em ``folga_janela`` nucleotídeos
+para cada lado para acomodar indels.
+
+O alinhamento devolvido cobre só essas janelas: escore, identidade e
+coordenadas não descrevem a amostra inteira, e ``detalhes["escopo"]`` vale
+``"janela"`` para que o chamador não os confunda com os do modo completo.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from Bio.Align import Alignment, PairwiseAligner
+
+from kmers import IndiceKmers, buscar_ancoras, encadear_ancoras
+
+FOLGA_JANELA_PADRAO = 100
+MARGEM_PADRAO = 50
+
+
+def estimar_diagonais(
+    indice: IndiceKmers,
+    sequencia: str,
+    inicio: int,
+    fim: int,
+) -> Optional[Tuple[int, int]]:
+    """Estima ``posicao_ref - posicao_query`` nas bordas da região ``[inicio, fim)``.
+
+    Usa as âncoras da melhor cadeia mais próximas da janela pela esquerda e
+    pela direita; a diferença entre as duas diagonais é o saldo de indels
+    dentro da janela. Retorna ``None`` se a amostra não tem nenhuma âncora.
+    """
+    cadeia = encadear_ancoras(buscar_ancoras(indice, sequencia))
+    if not cadeia:
+        return None
+
+    pela_esquerda = [a for a in cadeia if a[1] < fim]
+    pela_direita = [a for a in cadeia if a[1] + a[2] > inicio]
+    esquerda = max(pela_esquerda, key=lambda a: a[1] + a[2]) if pela_esquerda else None
+    direita = min(pela_direita, key=lambda a: a[1]) if pela_direita else None
+    esquerda = esquerda or direita
+    direita = direita or esquerda
+    return esquerda[1] - esquerda[0], direita[1] - direita[0]
+
+
+def alinhar_janela_exon(
+    aligner: PairwiseAligner,
+    referencia: str,
+    sequencia: str,
+    indice: IndiceKmers,
+    janela: Tuple[int, int],
+    folga_janela: int = FOLGA_JANELA_PADRAO,
+    margem: int = MARGEM_PADRAO,
+) -> Tuple[Optional[Alignment], Dict[str, object]]:
+    """Alinha somente a vizinhança de ``janela`` na referência.
+
+    Retorna ``(alinhamento, detalhes)``. O alinhamento é ``None`` quando não
+    foi possível localizar a região ou quando a janela da amostra se mostrou
+    estreita demais (saldo de indels maior que ``folga_janela``, ou
+    alinhamento que não cobre a região); ``detalhes["motivo"]`` explica o caso para que o
+    chamador recorra ao alinhamento completo.
+    """
+    inicio, fim = janela
+    detalhes: Dict[str, object] = {"folga_janela": folga_janela, "margem": margem}
+
+    diagonais = estimar_diagonais(indice, sequencia, inicio, fim)
+    if diagonais is None:
+        detalhes["motivo"] = "sem_ancoras"
+        return None, detalhes
+
+    diagonal_esq, diagonal_dir = diagonais
+    ref_ini = max(0, inicio - margem)
+    ref_fim = min(len(referencia), fim + margem)
+    query_ini = max(0, ref_ini - diagonal_esq - folga_janela)
+    query_fim = min(len(sequencia), ref_fim - diagonal_dir + folga_janela)
+    detalhes.update({
+        "diagonal_estimada": [diagonal_esq, diagonal_dir],
+        "janela_ref": [ref_ini, ref_fim],
+        "janela_query": [query_ini, query_fim],
+    })
+    if abs(diagonal_esq - diagonal_dir) > folga_janela:
+        detalhes["motivo"] = "janela_insuficiente"
+        return None, detalhes
+    if query_fim <= query_ini:
+        detalhes["motivo"] = "janela_fora_da_amostra"
+        return None, detalhes
+
+    alinhamentos = aligner.align(referencia[ref_ini:ref_fim], sequencia[query_ini:query_fim])
+    if alinhamentos.score <= 0:
+        detalhes["motivo"] = "sem_alinhamento_na_janela"
+        return None, detalhes
+
+    local = alinhamentos[0]
+    coordenadas = local.coordinates + np.array([[ref_ini], [query_ini]])
+    alinhamento = Alignment([referencia, sequencia], coordenadas)
+    alinhamento.score = float(alinhamentos.score)
+
+    inicio_ref_al, fim_ref_al = int(coordenadas[0, 0]), int(coordenadas[0, -1])
+    inicio_query_al, fim_query_al = int(coordenadas[1, 0]), int(coordenadas[1, -1])
+    cobre_esquerda = inicio_ref_al <= inicio or inicio_query_al == 0
+    cobre_direita = fim_ref_al >= fim or fim_query_al == len(sequencia)
+    if not (cobre_esquerda and cobre_direita):
+        detalhes["motivo"] = "janela_insuficiente"
+        return None, detalhes
+
+    detalhes["escopo"] = "janela"
+    return alinhamento, detalhes
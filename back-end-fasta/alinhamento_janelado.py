@@ -0,0 +1,99 @@
+"""Recorte de amostras muito maiores que a referência (contigs, scaffolds).
+
+Alinhar localmente um contig de megabases contra o PKD1 é quadrático em
+tempo e memória. Antes disso, a amostra é percorrida em blocos contando os
+k-mers que também existem na referência (busca no índice, custo linear no
+tamanho da amostra e memória limitada ao bloco); janelas sobrepostas do
+tamanho da referência somam os blocos vizinhos e só a janela com mais
+acertos, com margem, segue para o alinhamento. As coordenadas do resultado
+são devolvidas de volta para a amostra original.
+"""
+import math
+from typing import Dict, Optional
+
+import numpy as np
+from Bio.Align import Alignment
+
+from kmers import MAX_OCORRENCIAS_PADRAO, IndiceKmers, codificar_sequencia, codigos_kmers
+
+# Amostras maiores que FATOR_RECORTE x a referência são recortadas antes do alinhamento
+FATOR_RECORTE = 3
+# A janela cobre a referência mais essa folga (indels e bordas)
+FOLGA_JANELA = 0.25
+# Blocos por janela: janelas consecutivas se sobrepõem em (BLOCOS_POR_JANELA - 1) blocos
+BLOCOS_POR_JANELA = 4
+# Abaixo disso os acertos da melhor janela são coincidências de k-mers aleatórios
+ACERTOS_MINIMOS = 50
+# Bases codificadas por vez na varredura (limita a memória em contigs enormes)
+LOTE_VARREDURA_NT = 1 << 20
+
+
+def precisa_recorte(tamanho_query: int, tamanho_referencia: int) -> bool:
+    return tamanho_query > FATOR_RECORTE * tamanho_referencia
+
+
+def contar_acertos_por_bloco(
+    indice: IndiceKmers,
+    sequencia: str,
+    tamanho_bloco: int,
+    max_ocorrencias: int = MAX_OCORRENCIAS_PADRAO,
+) -> np.ndarray:
+    """K-mers da referência que começam em cada bloco de ``tamanho_bloco`` nt da amostra.
+
+    A amostra é codificada em lotes de ~``LOTE_VARREDURA_NT`` nt (múltiplos do
+    bloco), então a memória não cresce com o tamanho do contig. K-mers
+    repetitivos na referência (mais de ``max_ocorrencias`` cópias) não contam,
+    para que repetições espalhadas no contig não pareçam o gene.
+    """
+    k = indice.k
+    total_blocos = math.ceil(len(sequencia) / tamanho_bloco)
+    acertos = np.zeros(total_blocos, dtype=np.int64)
+    lote = tamanho_bloco * max(1, LOTE_VARREDURA_NT // tamanho_bloco)
+    for inicio in range(0, len(sequencia), lote):
+        codigos, posicoes = codigos_kmers(codificar_sequencia(sequencia[inicio:inicio + lote + k - 1]), k)
+        if codigos.size == 0:
+            continue
+        contagens = (
+            np.searchsorted(indice.codigos, codigos, side="right")
+            - np.searchsorted(indice.codigos, codigos, side="left")
+        )
+        uteis = posicoes[(contagens > 0) & (contagens <= max_ocorrencias)]
+        primeiro = inicio // tamanho_bloco
+        por_bloco = np.bincount(uteis // tamanho_bloco, minlength=lote // tamanho_bloco)
+        fim = min(total_blocos, primeiro + len(por_bloco))
+        acertos[primeiro:fim] += por_bloco[:fim - primeiro]
+    return acertos
+
+
+def localizar_janela(indice: IndiceKmers, sequencia: str, tamanho_referencia: int) -> Optional[Dict[str, int]]:
+    """Trecho da amostra com mais k-mers da referência, do tamanho da referência mais margens.
+
+    Retorna ``{"inicio", "fim", "acertos_kmers", "tamanho_original"}`` ou
+    ``None`` quando nenhuma janela soma ``ACERTOS_MINIMOS`` k-mers da referência.
+    """
+    tamanho_janela = int(tamanho_referencia * (1 + FOLGA_JANELA))
+    tamanho_bloco = max(indice.k, math.ceil(tamanho_janela / BLOCOS_POR_JANELA))
+    acertos = contar_acertos_por_bloco(indice, sequencia, tamanho_bloco)
+
+    por_janela = min(BLOCOS_POR_JANELA, len(acertos))
+    somas = np.convolve(acertos, np.ones(por_janela, dtype=np.int64), mode="valid")
+    melhor = int(np.argmax(somas))
+    if somas[melhor] < ACERTOS_MINIMOS:
+        return None
+    # Um bloco de margem de cada lado cobre o gene partido entre janelas vizinhas
+    inicio = max(0, (melhor - 1) * tamanho_bloco)
+    fim = min(len(sequencia), (melhor + por_janela + 1) * tamanho_bloco)
+    return {
+        "inicio": inicio,
+        "fim": fim,
+        "acertos_kmers": int(somas[melhor]),
+        "tamanho_original": len(sequencia),
+    }
+
+
+def reposicionar(alinhamento: Alignment, referencia: str, sequencia: str, deslocamento: int) -> Alignment:
+    """Leva um alinhamento feito sobre ``sequencia[deslocamento:...]`` para a amostra inteira."""
+    coordenadas = alinhamento.coordinates + np.array([[0], [deslocamento]])
+    reposicionado = Alignment([referencia, sequencia], coordenadas)
+    reposicionado.score = alinhamento.score
+    return reposicionado
@@ -0,0 +1,216 @@
+"""Alinhamento completo em paralelo, dividido em ladrilhos pela cadeia de âncoras.
+
+O Smith-Waterman do ``PairwiseAligner`` usa um único núcleo e custa
+``len(referencia) * len(amostra)`` células. Aqui as âncoras exatas da
+amostra (índice de k-mers) são encadeadas e a cadeia é cortada em pontos no
+meio de âncoras longas, um ladrilho por worker: cada ladrilho alinha só o
+trecho da referência entre dois cortes contra o trecho correspondente da
+amostra. Somados, os ladrilhos custam uma fração da DP completa (a soma cai
+com o número de ladrilhos), então o modo ganha mesmo com um único núcleo.
+
+Os ladrilhos internos são alinhados globalmente entre os cortes; as pontas
+usam gaps livres na extremidade externa (semântica local, como no modo
+ancorado). O resultado é o alinhamento ótimo que passa pelos pontos de
+corte; como eles ficam no meio de matches exatos longos, na prática é o
+mesmo do serial (``benchmarks/bench_paralelo.py`` confere).
+
+Antes de usar o pool o custo dos ladrilhos (células de DP divididas entre
+os núcleos, mais um custo fixo por ladrilho) é comparado ao da DP serial;
+quando o serial sai mais barato, ou o modo não se aplica, o chamador recebe
+``None`` e ``detalhes["motivo"]``:
+
+  - ``workers<2``: ``ALINHAMENTO_WORKERS`` abaixo de 2;
+  - ``sem_ancoras``: nenhuma âncora entre amostra e referência;
+  - ``ancoras_insuficientes``: nenhuma âncora longa o bastante para um corte;
+  - ``custo_serial_menor``: a estimativa do serial é menor;
+  - ``pool_quebrado``: um worker morreu durante a rodada;
+  - ``sem_alinhamento``: os ladrilhos não produziram alinhamento positivo.
+
+Desligado por padrão: ``ALINHAMENTO_WORKERS`` >= 2 liga o modo.
+"""
+import math
+import os
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from Bio.Align import Alignment, PairwiseAligner
+
+from alinhamento_ancorado import (
+    FOLGA_EXTENSAO,
+    _alinhar_intervalo,
+    _clonar_aligner,
+    _estender_ponta,
+    _simplificar_coordenadas,
+)
+from kmers import IndiceKmers, buscar_ancoras, encadear_ancoras
+from pool_processos import PoolProcessos
+from referencia import REF_PADRAO, obter_referencia
+
+# Ladrilho: (tipo, ref_inicio, ref_fim, query_inicio, query_fim); tipo é
+# "left"/"right" nas pontas (extremidade externa livre) ou "global"
+Ladrilho = Tuple[str, int, int, int, int]
+
+# Âncoras menores que isso não recebem corte: o caminho ótimo pode contorná-las
+TAMANHO_MINIMO_CORTE = 32
+
+# Folga da referência nas pontas (fração do trecho da amostra), para as deleções
+FOLGA_PONTA = 0.1
+
+# Custo fixo de um ladrilho no pool (envio, serialização, retorno), em células de DP
+CUSTO_FIXO_LADRILHO = 200_000
+
+
+def numero_workers() -> int:
+    return max(0, int(os.getenv("ALINHAMENTO_WORKERS", "0")))
+
+
+def paralelo_habilitado() -> bool:
+    return numero_workers() >= 2
+
+
+def _nucleos_disponiveis() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _inicializar_worker(ref_path: str) -> None:
+    # Só abre a referência: cada ladrilho decodifica a própria janela
+    obter_referencia(ref_path)
+
+
+pool = PoolProcessos(numero_workers, _inicializar_worker, (REF_PADRAO,))
+
+# Aligners derivados do da referência, por processo e tipo de ladrilho
+_aligners: Dict[Tuple[str, str], PairwiseAligner] = {}
+
+
+def _aligner_ladrilho(ref_path: str, tipo: str) -> PairwiseAligner:
+    chave = (ref_path, tipo)
+    if chave not in _aligners:
+        base = obter_referencia(ref_path).aligner_alinhamento
+        _aligners[chave] = _clonar_aligner(base, None if tipo == "global" else tipo)
+    return _aligners[chave]
+
+
+def escolher_cortes(cadeia, tamanho_query: int, quantidade: int) -> List[Tuple[int, int]]:
+    """Até ``quantidade - 1`` pontos ``(query, ref)`` no meio de âncoras longas.
+
+    Os cortes ficam o mais perto possível de frações iguais da amostra e são
+    estritamente crescentes nas duas sequências.
+    """
+    longas = [(q + tam // 2, r + tam // 2) for q, r, tam in cadeia if tam >= TAMANHO_MINIMO_CORTE]
+    cortes: List[Tuple[int, int]] = []
+    for parte in range(1, quantidade):
+        alvo = parte * tamanho_query / quantidade
+        candidatos = [c for c in longas if not cortes or (c[0] > cortes[-1][0] and c[1] > cortes[-1][1])]
+        if not candidatos:
+            break
+        melhor = min(candidatos, key=lambda c: abs(c[0] - alvo))
+        if cortes and melhor == cortes[-1]:
+            continue
+        cortes.append(melhor)
+    return cortes
+
+
+def dividir_pela_cadeia(
+    cortes: List[Tuple[int, int]], tamanho_referencia: int, tamanho_query: int
+) -> List[Ladrilho]:
+    """Ladrilhos entre cortes consecutivos, mais as duas pontas."""
+    q0, r0 = cortes[0]
+    inicio_ref = max(0, r0 - math.ceil(q0 * (1 + FOLGA_PONTA)) - FOLGA_EXTENSAO)
+    ladrilhos: List[Ladrilho] = [("left", inicio_ref, r0, 0, q0)]
+    for (q_a, r_a), (q_b, r_b) in zip(cortes, cortes[1:]):
+        ladrilhos.append(("global", r_a, r_b, q_a, q_b))
+    q_n, r_n = cortes[-1]
+    resto = tamanho_query - q_n
+    fim_ref = min(tamanho_referencia, r_n + math.ceil(resto * (1 + FOLGA_PONTA)) + FOLGA_EXTENSAO)
+    ladrilhos.append(("right", r_n, fim_ref, q_n, tamanho_query))
+    return ladrilhos
+
+
+def custo_celulas(ladrilhos: List[Ladrilho], workers: int) -> float:
+    """Células de DP no caminho crítico dos ladrilhos, mais o custo fixo de cada um."""
+    celulas = [(r_b - r_a) * (q_b - q_a) for _, r_a, r_b, q_a, q_b in ladrilhos]
+    paralelismo = max(1, min(workers, _nucleos_disponiveis(), len(ladrilhos)))
+    return max(max(celulas), sum(celulas) / paralelismo) + CUSTO_FIXO_LADRILHO * len(ladrilhos)
+
+
+def _alinhar_ladrilho(ref_path: str, ladrilho: Ladrilho, trecho_query: str) -> Tuple[List[Tuple[int, int]], float]:
+    """Executado no worker: pontos ``(ref, query)`` absolutos e escore do ladrilho."""
+    tipo, r_a, r_b, q_a, _ = ladrilho
+    trecho_ref = obter_referencia(ref_path).trecho(r_a, r_b)
+    aligner = _aligner_ladrilho(ref_path, tipo)
+    if tipo == "global":
+        return _alinhar_intervalo(aligner, trecho_ref, trecho_query, r_a, q_a)
+    return _estender_ponta(aligner, tipo, trecho_ref, trecho_query, r_a, q_a)
+
+
+def alinhar_em_ladrilhos(
+    aligner: PairwiseAligner,
+    ref_path: str,
+    referencia: str,
+    consulta: str,
+    indice: Optional[IndiceKmers] = None,
+) -> Tuple[Optional[Alignment], Dict[str, object]]:
+    """Alinhamento local completo da ``consulta`` distribuído por ladrilhos da cadeia de âncoras.
+
+    Retorna ``(alinhamento, detalhes)``; ``alinhamento`` é ``None`` quando o
+    modo não se aplica, sai mais caro que o serial ou o pool quebrou
+    (``detalhes["motivo"]``) e o chamador deve alinhar em série.
+    """
+    workers = numero_workers()
+    detalhes: Dict[str, object] = {"workers": workers}
+    if workers < 2:
+        detalhes["motivo"] = "workers<2"
+        return None, detalhes
+
+    if indice is None:
+        indice = IndiceKmers.construir(referencia)
+    cadeia = encadear_ancoras(buscar_ancoras(indice, consulta))
+    if not cadeia:
+        detalhes["motivo"] = "sem_ancoras"
+        return None, detalhes
+    cortes = escolher_cortes(cadeia, len(consulta), workers)
+    if not cortes:
+        detalhes["motivo"] = "ancoras_insuficientes"
+        return None, detalhes
+
+    ladrilhos = dividir_pela_cadeia(cortes, len(referencia), len(consulta))
+    custo_serial = len(referencia) * len(consulta)
+    custo_paralelo = custo_celulas(ladrilhos, workers)
+    detalhes.update({
+        "ladrilhos": len(ladrilhos),
+        "celulas_serial": custo_serial,
+        "celulas_estimadas": int(custo_paralelo),
+    })
+    if custo_paralelo >= custo_serial:
+        detalhes["motivo"] = "custo_serial_menor"
+        return None, detalhes
+
+    futuros = [
+        pool.submeter(_alinhar_ladrilho, ref_path, ladrilho, consulta[ladrilho[3]:ladrilho[4]])
+        for ladrilho in ladrilhos
+    ]
+    try:
+        resultados = [futuro.result() for futuro, _ in futuros]
+    except BrokenProcessPool:
+        # Worker morto no meio da rodada: o pool é recriado no próximo
+        # pedido e este volta ao alinhamento serial
+        for _, executor in futuros:
+            pool.descartar(executor)
+        detalhes["motivo"] = "pool_quebrado"
+        return None, detalhes
+
+    pontos: List[Tuple[int, int]] = []
+    escore = 0.0
+    for trecho, valor in resultados:
+        pontos.extend(trecho)
+        escore += valor
+    if escore <= 0 or len(pontos) < 2:
+        detalhes["motivo"] = "sem_alinhamento"
+        return None, detalhes
+
+    alinhamento = Alignment([referencia, consulta], _simplificar_coordenadas(pontos))
+    alinhamento.score = escore
+    return alinhamento, detalhes
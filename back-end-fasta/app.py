@@ -1,13 +1,30 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from services import buscar_gene_pkd1, realizar_alinhamento_grande
+from services import MODOS_ALINHAMENTO, buscar_gene_pkd1, realizar_alinhamento_grande
+from alinhamento_exon import FOLGA_JANELA_PADRAO, MARGEM_PADRAO
+from referencia import registro_referencias
+from leitura_fasta import iterar_registros
+from lote import processar_lote
+from jobs import FilaCheia, fila_jobs
+from cache_resultados import cache_resultados, chave_analise
+from armazenamento import criar_armazenamento, novo_id_analise
+from cliente_ia import ClassificacaoIndisponivel, criar_cliente_ia
+from resumo_llm import PENDENTE, PRONTO, gerador_resumos
+from serializacao import resposta_json
+from perfilador import perfilar_rota
+from metricas import (
+    TIPO_CONTEUDO,
+    Cronometro,
+    consultas_cache,
+    falhas_ia,
+    identificacoes,
+    registrar_etapas,
+    registro_metricas,
+)
 import sys
-import requests
 import os
-import json
-import time
-import numbers
-import math
+import shutil
+import tempfile
 
 app = Flask(__name__)
 CORS(
@@ -23,9 +40,15 @@ def raiz():
         "status": "ok",
         "service": "back-end-fasta",
         "endpoints": [
-            "/buscar-pkd1 (POST multipart: arquivo)",
-            "/dados-analise (GET)",
-            "/health (GET)"
+            "/buscar-pkd1 (POST multipart: arquivo, modo_alinhamento e alternativas opcionais)",
+            "/buscar-pkd1/lote (POST multipart: arquivos e/ou arquivo multi-amostra)",
+            "/jobs/buscar-pkd1 (POST multipart, assíncrono: devolve job_id)",
+            "/jobs/<job_id> (GET)",
+            "/dados-analise (GET, última análise)",
+            "/dados-analise/<analise_id> (GET)",
+            "/health (GET)",
+            "/estatisticas (GET)",
+            "/metrics (GET, formato Prometheus)"
         ]
     })
 
@@ -33,99 +56,35 @@ def raiz():
 def health():
     return jsonify({"status": "ok"})
 
-# Variável global para armazenar o último resultado da análise
-ultimo_resultado_analise = {}
-
-
-def _to_serializable(value):
-    """Converte recursivamente valores para tipos compatíveis com JSON."""
-    if isinstance(value, dict):
-        return {str(k): _to_serializable(v) for k, v in value.items()}
-    if isinstance(value, (list, tuple, set)):
-        return [_to_serializable(v) for v in value]
-    if isinstance(value, numbers.Number):
-        coerced = value.item() if hasattr(value, "item") else value
-        if isinstance(coerced, float) and math.isnan(coerced):
-            return None
-        return coerced
-    if isinstance(value, (str, bool)) or value is None:
-        return value
-    # Fallback para tipos não suportados diretamente
-    return str(value)
-
-def sanitize_sequence(seq: str, max_len: int = 400):
-    if not seq:
-        return "(sequência vazia)"
-    seq = seq.strip().upper()
-    if len(seq) <= max_len:
-        return seq
-    return seq[:max_len] + f"... (total {len(seq)} nt)"
-
-def generate_llm_summary(dados: dict) -> str:
-    """Gera um resumo textual usando Gemini (quando habilitado).
-
-    Requisitos:
-      - ENABLE_LLM=true
-      - GEMINI_API_KEY definido
-    Fallback: retorna texto padrão se não configurado ou em erro.
-    """
-    if os.getenv("ENABLE_LLM", "false").lower() != "true":
-        return "Resumo LLM desativado (ENABLE_LLM != true)."
-
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return "Resumo LLM indisponível: GEMINI_API_KEY não configurada."
-
-    # Monta prompt estruturado
-    identidade = dados.get("identidade") or "N/D"
-    score = dados.get("score") or "N/D"
-    classificacao = dados.get("classificacao") or "N/D"
-    confianca = dados.get("confianca") or "N/D"
-    exon_seq = sanitize_sequence(dados.get("exon29_amostra"))
-
-    prompt = f"""
-Você é um assistente especializado em genética veterinária.
-Gere um relatório clínico interpretativo em português claro sobre o gene PKD1 (exon29) para felinos.
-Inclua seções: 1) Visão Geral, 2) Interpretação do Alinhamento, 3) Classificação do Modelo, 4) Risco / Implicações, 5) Próximos Passos Recomendados.
-Use bullets quando apropriado. Evite prometer diagnóstico definitivo.
-
-Dados:
-- Identidade do alinhamento: {identidade}
-- Score bruto do alinhamento: {score}
-- Classificação do modelo (interno): {classificacao}
-- Confiança do modelo: {confianca}
-- Trecho exon29 analisado (parcial/truncado se grande): {exon_seq}
-
-Produza texto objetivo (máx ~450 palavras), mantendo tom profissional e acessível a veterinário.
-""".strip()
-
-    # Endpoint básico Gemini generative (v1beta) - model gemini-pro (ajustável)
-    url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "contents": [
-            {"parts": [{"text": prompt}]}
-        ]
-    }
+@app.route('/estatisticas', methods=['GET'])
+def estatisticas():
+    """Contadores internos do processo (ex.: acertos/faltas do registro de referências)."""
+    return jsonify({
+        "referencias": registro_referencias.estatisticas(),
+        "jobs": fila_jobs.estatisticas(),
+        "cache": cache_resultados.estatisticas(),
+        "analises": armazenamento_analises.estatisticas(),
+        "ia": cliente_ia.estatisticas(),
+        "llm": gerador_resumos.estatisticas(),
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Histogramas de duração por etapa e contadores no formato texto do Prometheus."""
+    return Response(registro_metricas.exportar(), content_type=TIPO_CONTEUDO)
+
+# Limite de caminhos co-ótimos extras que um cliente pode pedir por requisição
+MAX_ALTERNATIVAS = 10
+
+# Uploads de jobs maiores que isso vão para disco enquanto aguardam na fila
+UPLOAD_MEMORIA_MAX = 8 * 1024 * 1024
+
+# Análises por analise_id (memória do processo ou SQLite compartilhado entre workers)
+armazenamento_analises = criar_armazenamento()
+
+# Cliente do classificador (pool keep-alive, timeouts, novas tentativas e disjuntor)
+cliente_ia = criar_cliente_ia()
 
-    try:
-        start = time.time()
-        resp = requests.post(f"{url}?key={api_key}", headers=headers, data=json.dumps(payload), timeout=25)
-        dur = time.time() - start
-        if resp.status_code != 200:
-            return f"Falha ao gerar resumo LLM (HTTP {resp.status_code}) em {dur:.1f}s"
-        data = resp.json()
-        # Estrutura típica: data['candidates'][0]['content']['parts'][0]['text']
-        candidates = data.get('candidates') or []
-        if not candidates:
-            return "Resposta LLM vazia ou sem candidatos."
-        parts = candidates[0].get('content', {}).get('parts') or []
-        if not parts:
-            return "Resposta LLM sem partes de texto."
-        texto = parts[0].get('text', '').strip()
-        return texto or "Resposta LLM vazia."
-    except Exception as e:
-        return f"Erro ao contatar LLM: {e}"  # Fallback amigável
 
 def print_progress(progress, message=None):
     bar_length = 40
@@ -136,33 +95,81 @@ def print_progress(progress, message=None):
     sys.stdout.write(text)
     sys.stdout.flush()
 
-@app.route('/buscar-pkd1', methods=['POST'])
-def buscar_pkd1():
-    global ultimo_resultado_analise
-
-    if 'arquivo' not in request.files:
-        return jsonify({"error": "Nenhum arquivo foi enviado"}), 400
-
-    arquivo = request.files['arquivo']
-    conteudo = arquivo.stream.read().decode('utf-8').splitlines()
-
-    def update_progress(progress, message):
-        print_progress(progress, message)
+def _ler_opcoes_alinhamento():
+    """Lê modo_alinhamento/alternativas do formulário. Retorna (opcoes, erro)."""
+    modo_alinhamento = request.form.get(
+        'modo_alinhamento',
+        os.getenv("MODO_ALINHAMENTO", "completo"),
+    )
+    if modo_alinhamento not in MODOS_ALINHAMENTO:
+        return None, f"modo_alinhamento inválido. Use um de: {', '.join(MODOS_ALINHAMENTO)}"
 
+    try:
+        alternativas = min(int(request.form.get('alternativas', 0)), MAX_ALTERNATIVAS)
+    except ValueError:
+        return None, "alternativas deve ser um número inteiro"
+
+    return {
+        "modo": modo_alinhamento,
+        "folga_janela": int(os.getenv("EXON_FOLGA_JANELA", FOLGA_JANELA_PADRAO)),
+        "margem": int(os.getenv("EXON_MARGEM", MARGEM_PADRAO)),
+        "alternativas": alternativas,
+    }, None
+
+def executar_analise(fonte, opcoes, progresso=print_progress):
+    """Identificação, alinhamento, classificação na IA e resumo LLM de uma amostra.
+
+    ``progresso(fracao, mensagem)`` recebe o avanço da análise inteira (o
+    alinhamento ocupa de 10% a 80%). A análise fica disponível em
+    ``/dados-analise/<analise_id>`` assim que o alinhamento termina. O tempo
+    de cada etapa vai em ``metadados.timings_ms`` e nos histogramas de
+    ``/metrics``. Retorna ``(corpo, status_http)``.
+    """
+    cronometro = Cronometro()
+    with cronometro.etapa("total"):
+        corpo, status = _executar_etapas(fonte, opcoes, progresso, cronometro)
+    timings = cronometro.resumo()
+    registrar_etapas(cronometro.tempos_ms)
+    if isinstance(corpo.get('metadados'), dict):
+        corpo['metadados']['timings_ms'] = timings
+    else:
+        corpo['timings_ms'] = timings
+    return corpo, status
+
+def _executar_etapas(fonte, opcoes, progresso, cronometro):
     print("📁 Processando arquivo...")
-    gene_info = buscar_gene_pkd1(conteudo)
+    progresso(0.0, "Identificando o gene PKD1...")
+    # Lido em fluxo (aceita .fasta, .gz e BGZF) para não estourar memória com montagens grandes
+    gene_info = buscar_gene_pkd1(fonte, cronometro=cronometro)
+    identificacoes.inc(metodo=gene_info.get('metadados', {}).get('metodo_identificacao', 'erro'))
     if 'error' in gene_info:
-        return jsonify(gene_info)
+        return gene_info, 200
+
+    with cronometro.etapa("cache"):
+        chave_cache = chave_analise(gene_info['sequencia'], opcoes)
+        em_cache, camada_cache = cache_resultados.obter(chave_cache)
+    consultas_cache.inc(resultado=camada_cache or "falta")
+    gene_info.setdefault('metadados', {})['cache'] = {
+        "acerto": em_cache is not None,
+        "camada": camada_cache,
+        "chave": chave_cache,
+    }
 
-    print("\n🔬 Executando alinhamento...")
-    alinhamento_result = realizar_alinhamento_grande(
-        gene_info['sequencia'],
-        progress_callback=update_progress
-    )
+    if em_cache is not None:
+        print(f"\n♻️ Resultado reaproveitado do cache ({camada_cache})")
+        alinhamento_result = em_cache["alinhamento_result"]
+    else:
+        print("\n🔬 Executando alinhamento...")
+        alinhamento_result = realizar_alinhamento_grande(
+            gene_info['sequencia'],
+            progress_callback=lambda fracao, mensagem: progresso(0.1 + 0.7 * fracao, mensagem),
+            cronometro=cronometro,
+            **opcoes,
+        )
 
-    # Se houve erro no alinhamento, retorna com 422 (processamento)
-    if isinstance(alinhamento_result, dict) and 'error' in alinhamento_result:
-        return jsonify(alinhamento_result), 422
+        # Se houve erro no alinhamento, retorna com 422 (processamento)
+        if isinstance(alinhamento_result, dict) and 'error' in alinhamento_result:
+            return alinhamento_result, 422
 
     gene_info['alinhamento_result'] = alinhamento_result
     print("\n✅ Processo concluído!")
@@ -185,112 +192,213 @@ def buscar_pkd1():
             print(f"   • ... +{len(variantes_detectadas) - 5} variantes")
 
     # Disponibiliza dados para /dados-analise imediatamente após alinhamento
-    try:
-        global ultimo_resultado_analise
-        ultimo_resultado_analise = {
-            "identidade": melhor.get("identidade"),
-            "identidade_pct": melhor.get("identidade_pct"),
-            "score": melhor.get("score"),
-            "classificacao": None,
-            "confianca": None,
-            "confianca_float": None,
-            "variantes_exon29": variantes_detectadas,
-            "metricas_exon29": metricas_exon,
-            "exon29_amostra": alinhamento_result.get("exon29_amostra"),
-            "exon29_referencia": alinhamento_result.get("exon29_referencia"),
-            "gene_metadados": gene_info.get("metadados"),
-        }
-        ultimo_resultado_analise = _to_serializable(ultimo_resultado_analise)
-    except Exception:
-        pass
+    analise_id = novo_id_analise()
+    gene_info["analise_id"] = analise_id
+    analise = {
+        "analise_id": analise_id,
+        "identidade": melhor.get("identidade"),
+        "identidade_pct": melhor.get("identidade_pct"),
+        "score": melhor.get("score"),
+        "classificacao": None,
+        "confianca": None,
+        "confianca_float": None,
+        "variantes_exon29": variantes_detectadas,
+        "metricas_exon29": metricas_exon,
+        "exon29_amostra": alinhamento_result.get("exon29_amostra"),
+        "exon29_referencia": alinhamento_result.get("exon29_referencia"),
+        "gene_metadados": gene_info.get("metadados"),
+        "relatorio_status": PENDENTE,
+    }
+    armazenamento_analises.salvar(analise_id, analise)
 
     # Envia o exon29 para a IA (classificador interno)
-    ia_host = os.getenv("IA_HOST", "ia")  # usar nome do serviço no docker compose
-    outra_api_url = f"http://{ia_host}:6000/classificar-exon29"
+    progresso(0.8, "Classificando o exon29 na IA...")
+    resultado_ia = None
     try:
-        payload_serializado = _to_serializable(alinhamento_result)
-        response = requests.post(
-            outra_api_url,
-            json={"alinhamento_result": payload_serializado}
-        )
-        if response.status_code != 200:
-            print(f"\n❌ Erro ao enviar para a IA: {response.status_code} - {response.text}")
-            try:
-                ultimo_resultado_analise.update({
-                    "erro_ia": {
-                        "status": response.status_code,
-                        "detalhe": response.text[:600],
-                    }
-                })
-                ultimo_resultado_analise = _to_serializable(ultimo_resultado_analise)
-            except Exception:
-                pass
-        else:
-            resultado_ia = response.json()
-            print("\n🤖 Resposta da IA:")
-            print(f"📌 Classificação: {resultado_ia['classificacao']}")
-            print(f"📊 Confiança: {resultado_ia['confianca']}")
-            gene_info["classificacao_ia"] = resultado_ia
-
-            # Salva as informações importantes para a nova rota
-            try:
-                ultimo_resultado_analise.update({
-                    "classificacao": resultado_ia.get("classificacao"),
-                    "confianca": resultado_ia.get("confianca"),
-                    "confianca_float": resultado_ia.get("confianca_float"),
-                    "erro_ia": None,
-                })
-                ultimo_resultado_analise = _to_serializable(ultimo_resultado_analise)
-            except Exception:
-                pass
-
-    except Exception as e:
-        print(f"\n❌ Erro ao conectar com a IA: {e}")
-        try:
-            ultimo_resultado_analise.update({
-                "erro_ia": str(e),
-            })
-            ultimo_resultado_analise = _to_serializable(ultimo_resultado_analise)
-        except Exception:
-            pass
-
-    # Geração de resumo LLM (opcional)
-    try:
-        contexto_llm = {
-            "identidade": ultimo_resultado_analise.get("identidade"),
-            "identidade_pct": ultimo_resultado_analise.get("identidade_pct"),
-            "score": ultimo_resultado_analise.get("score"),
-            "classificacao": ultimo_resultado_analise.get("classificacao"),
-            "confianca": ultimo_resultado_analise.get("confianca"),
-            "exon29_amostra": alinhamento_result.get('exon29_amostra'),
-            "variantes_exon29": variantes_detectadas,
-            "metricas_exon29": metricas_exon,
-        }
-        resumo_texto = generate_llm_summary(contexto_llm)
-        ultimo_resultado_analise["relatorio_texto"] = resumo_texto
+        with cronometro.etapa("ia"):
+            resultado_ia = cliente_ia.classificar(alinhamento_result)
+    except ClassificacaoIndisponivel as e:
+        print(f"\n❌ Classificação indisponível ({e.motivo}): {e}")
+        falhas_ia.inc(motivo=e.motivo)
+        analise["erro_ia"] = e.como_dict()
+
+    if resultado_ia is not None:
+        print("\n🤖 Resposta da IA:")
+        print(f"📌 Classificação: {resultado_ia['classificacao']}")
+        print(f"📊 Confiança: {resultado_ia['confianca']}")
+        gene_info["classificacao_ia"] = resultado_ia
+
+        # Salva as informações importantes para /dados-analise
+        analise.update({
+            "classificacao": resultado_ia.get("classificacao"),
+            "confianca": resultado_ia.get("confianca"),
+            "confianca_float": resultado_ia.get("confianca_float"),
+            "erro_ia": None,
+        })
+
+    armazenamento_analises.atualizar(analise_id, {
+        campo: analise.get(campo)
+        for campo in ("classificacao", "confianca", "confianca_float", "erro_ia")
+    })
+
+    # Só o alinhamento vai para o cache: a chave não identifica o modelo da IA,
+    # que pode ser retreinado sem que nada do lado do back-end-fasta mude
+    if em_cache is None:
+        cache_resultados.gravar(chave_cache, {"alinhamento_result": alinhamento_result})
+
+    # Resumo LLM (opcional) em segundo plano; /resumo-analise/<id> informa quando fica pronto
+    progresso(0.9, "Agendando resumo LLM...")
+    contexto_llm = {
+        "identidade": analise.get("identidade"),
+        "identidade_pct": analise.get("identidade_pct"),
+        "score": analise.get("score"),
+        "classificacao": analise.get("classificacao"),
+        "confianca": analise.get("confianca"),
+        "exon29_amostra": alinhamento_result.get('exon29_amostra'),
+        "variantes_exon29": variantes_detectadas,
+        "metricas_exon29": metricas_exon,
+    }
+
+    def registrar_resumo(texto):
+        armazenamento_analises.atualizar(analise_id, {"relatorio_texto": texto, "relatorio_status": PRONTO})
+
+    status_resumo, resumo_texto = gerador_resumos.agendar(contexto_llm, registrar_resumo)
+    gene_info["relatorio_status"] = status_resumo
+    if status_resumo == PRONTO:
         gene_info["relatorio_texto"] = resumo_texto
-    except Exception as e:
-        ultimo_resultado_analise["relatorio_texto"] = f"Falha ao gerar resumo: {e}"
-        gene_info["relatorio_texto"] = ultimo_resultado_analise["relatorio_texto"]
+        registrar_resumo(resumo_texto)
+
+    return gene_info, 200
+
+@app.route('/buscar-pkd1', methods=['POST'])
+@perfilar_rota('buscar-pkd1')
+def buscar_pkd1():
+    if 'arquivo' not in request.files:
+        return jsonify({"error": "Nenhum arquivo foi enviado"}), 400
+
+    opcoes, erro = _ler_opcoes_alinhamento()
+    if erro:
+        return jsonify({"error": erro}), 400
 
-    ultimo_resultado_analise = _to_serializable(ultimo_resultado_analise)
-    gene_info = _to_serializable(gene_info)
-    return jsonify(gene_info)
+    corpo, status = executar_analise(request.files['arquivo'].stream, opcoes)
+    return resposta_json(corpo, status)
+
+@app.route('/jobs/buscar-pkd1', methods=['POST'])
+def submeter_job_pkd1():
+    """Versão assíncrona de /buscar-pkd1: responde 202 com o ID do job."""
+    if 'arquivo' not in request.files:
+        return jsonify({"error": "Nenhum arquivo foi enviado"}), 400
+
+    opcoes, erro = _ler_opcoes_alinhamento()
+    if erro:
+        return jsonify({"error": erro}), 400
+
+    # O upload é descartado ao fim da requisição; o job lê uma cópia temporária
+    upload = tempfile.SpooledTemporaryFile(max_size=UPLOAD_MEMORIA_MAX)
+    shutil.copyfileobj(request.files['arquivo'].stream, upload)
+    upload.seek(0)
+
+    def tarefa(progresso):
+        with upload:
+            return executar_analise(upload, opcoes, progresso)
+
+    try:
+        job = fila_jobs.submeter(tarefa)
+    except FilaCheia as e:
+        upload.close()
+        resposta = jsonify({"error": str(e)})
+        resposta.headers["Retry-After"] = "5"
+        return resposta, 429
+
+    return jsonify({
+        "job_id": job.id,
+        "estado": job.estado,
+        "status_url": f"/jobs/{job.id}",
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def consultar_job(job_id):
+    # O job pode ter sido recebido por outro worker: o resumo vem do registro compartilhado
+    dados = fila_jobs.obter_json(job_id)
+    if dados is None:
+        return jsonify({"error": "Job não encontrado"}), 404
+    return resposta_json(dados)
+
+@app.route('/buscar-pkd1/lote', methods=['POST'])
+def buscar_pkd1_lote():
+    """Analisa várias amostras em paralelo (pool de processos, ver FASTA_WORKERS).
+
+    - ``arquivos``: um ou mais arquivos, cada arquivo é uma amostra;
+    - ``arquivo``: um FASTA multi-amostra, cada registro é uma amostra.
+
+    Devolve os resultados por amostra (na ordem de envio) e o tempo agregado.
+    Não consulta a IA nem gera o resumo LLM.
+    """
+    opcoes, erro = _ler_opcoes_alinhamento()
+    if erro:
+        return jsonify({"error": erro}), 400
+
+    amostras = []
+    for arquivo in request.files.getlist('arquivos'):
+        amostras.append((arquivo.filename or f"amostra_{len(amostras) + 1}", arquivo.read()))
+    if 'arquivo' in request.files:
+        for registro in iterar_registros(request.files['arquivo'].stream):
+            amostras.append((registro.id, [f">{registro.description}", str(registro.seq)]))
+
+    if not amostras:
+        return jsonify({"error": "Nenhuma amostra foi enviada"}), 400
+
+    print(f"📦 Processando lote com {len(amostras)} amostra(s)...")
+    resultado = processar_lote(amostras, opcoes)
+    resumo = resultado["resumo"]
+    print(f"✅ Lote concluído: {resumo['sucesso']}/{resumo['total_amostras']} em {resumo['tempo_total_ms'] / 1000:.1f}s")
+    return resposta_json(resultado)
+
+def _analise_ou_404(analise_id=None, codificada=False):
+    """Busca a análise pelo ID ou, sem ID, a mais recente. Retorna (dados, resposta_erro).
+
+    Com ``codificada=True`` os dados vêm como o JSON já codificado pelo armazenamento.
+    """
+    if analise_id is None:
+        if codificada:
+            dados = armazenamento_analises.ultima_json()
+        else:
+            ultima = armazenamento_analises.ultima()
+            dados = ultima[1] if ultima else None
+        if dados is None:
+            return None, (jsonify({"error": "Nenhuma análise foi realizada ainda"}), 404)
+        return dados, None
+    if codificada:
+        dados = armazenamento_analises.obter_json(analise_id)
+    else:
+        dados = armazenamento_analises.obter(analise_id)
+    if dados is None:
+        return None, (jsonify({"error": "Análise não encontrada"}), 404)
+    return dados, None
 
 @app.route('/dados-analise', methods=['GET'])
-def dados_analise():
-    if not ultimo_resultado_analise:
-        return jsonify({"error": "Nenhuma análise foi realizada ainda"}), 404
-    return jsonify(_to_serializable(ultimo_resultado_analise))
+@app.route('/dados-analise/<analise_id>', methods=['GET'])
+def dados_analise(analise_id=None):
+    # Serve os bytes guardados pelo armazenamento, sem decodificar/recodificar
+    dados, erro = _analise_ou_404(analise_id, codificada=True)
+    if erro:
+        return erro
+    return resposta_json(dados)
 
 @app.route('/resumo-analise', methods=['GET'])
-def resumo_analise():
-    if not ultimo_resultado_analise:
-        return jsonify({"error": "Nenhuma análise foi realizada ainda"}), 404
-    texto = ultimo_resultado_analise.get("relatorio_texto")
+@app.route('/resumo-analise/<analise_id>', methods=['GET'])
+def resumo_analise(analise_id=None):
+    dados, erro = _analise_ou_404(analise_id)
+    if erro:
+        return erro
+    texto = dados.get("relatorio_texto")
     if not texto:
-        return jsonify({"status": "pendente", "hint": "Execute /buscar-pkd1 primeiro"})
-    return jsonify({"relatorio_texto": texto})
+        return jsonify({
+            "analise_id": dados.get("analise_id"),
+            "status": PENDENTE,
+            "hint": "O resumo está sendo gerado; consulte novamente em instantes",
+        })
+    return jsonify({"analise_id": dados.get("analise_id"), "status": PRONTO, "relatorio_texto": texto})
 
 if __name__ == '__main__':
     print("🧬 Servidor de Análise Genética rodando em http://localhost:5000/buscar-pkd1")
@@ -0,0 +1,159 @@
+"""Armazenamento das análises concluídas, identificadas por ``analise_id``.
+
+Dois backends com a mesma interface, escolhidos por ``ANALISES_BACKEND``:
+  - ``memoria``: dicionário do processo (servidor com um único worker);
+  - ``sqlite``: arquivo em ``ANALISES_SQLITE_PATH`` que vários workers do
+    gunicorn (ou réplicas com o mesmo volume) compartilham.
+
+Ambos mantêm no máximo ``ANALISES_MAX`` análises, descartando as mais antigas,
+e guardam o JSON já codificado: ``obter_json``/``ultima_json`` devolvem os
+bytes prontos para a resposta, sem decodificar e recodificar a cada consulta.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import closing
+from typing import Dict, Optional, Tuple
+
+from serializacao import codificar
+
+BACKENDS_ANALISES = ("memoria", "sqlite")
+
+
+def novo_id_analise() -> str:
+    return uuid.uuid4().hex
+
+
+class ArmazenamentoMemoria:
+    def __init__(self, max_analises: int = 500):
+        self.max_analises = max(1, max_analises)
+        # analise_id -> JSON codificado (o dicionário é reconstruído só quando pedido)
+        self._analises: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def salvar(self, analise_id: str, dados: Dict[str, object]) -> None:
+        codificado = codificar(dados)
+        with self._lock:
+            self._analises[analise_id] = codificado
+            while len(self._analises) > self.max_analises:
+                self._analises.popitem(last=False)
+
+    def atualizar(self, analise_id: str, campos: Dict[str, object]) -> None:
+        with self._lock:
+            if analise_id in self._analises:
+                dados = json.loads(self._analises[analise_id])
+                dados.update(campos)
+                self._analises[analise_id] = codificar(dados)
+
+    def obter_json(self, analise_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._analises.get(analise_id)
+
+    def ultima_json(self) -> Optional[bytes]:
+        with self._lock:
+            return self._analises[next(reversed(self._analises))] if self._analises else None
+
+    def obter(self, analise_id: str) -> Optional[Dict[str, object]]:
+        codificado = self.obter_json(analise_id)
+        return json.loads(codificado) if codificado is not None else None
+
+    def ultima(self) -> Optional[Tuple[str, Dict[str, object]]]:
+        with self._lock:
+            if not self._analises:
+                return None
+            analise_id = next(reversed(self._analises))
+            return analise_id, json.loads(self._analises[analise_id])
+
+    def estatisticas(self) -> Dict[str, object]:
+        with self._lock:
+            return {"backend": "memoria", "analises": len(self._analises)}
+
+
+class ArmazenamentoSQLite:
+    def __init__(self, caminho: str, max_analises: int = 500):
+        self.caminho = caminho
+        self.max_analises = max(1, max_analises)
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS analises ("
+                " id TEXT PRIMARY KEY, dados TEXT NOT NULL,"
+                " criado_em REAL NOT NULL, atualizado_em REAL NOT NULL)"
+            )
+            conexao.execute("CREATE INDEX IF NOT EXISTS idx_criado ON analises (criado_em)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        # ``with conexao`` só faz commit/rollback; quem chama fecha com ``closing``
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def salvar(self, analise_id: str, dados: Dict[str, object]) -> None:
+        agora = time.time()
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute(
+                "INSERT INTO analises (id, dados, criado_em, atualizado_em) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET dados = excluded.dados, atualizado_em = excluded.atualizado_em",
+                (analise_id, codificar(dados).decode("utf-8"), agora, agora),
+            )
+            conexao.execute(
+                "DELETE FROM analises WHERE id IN ("
+                " SELECT id FROM analises ORDER BY criado_em DESC LIMIT -1 OFFSET ?)",
+                (self.max_analises,),
+            )
+
+    def atualizar(self, analise_id: str, campos: Dict[str, object]) -> None:
+        conexao = self._conectar()
+        try:
+            # Leitura e escrita na mesma transação para não perder atualizações de outro worker
+            conexao.execute("BEGIN IMMEDIATE")
+            linha = conexao.execute("SELECT dados FROM analises WHERE id = ?", (analise_id,)).fetchone()
+            if linha is not None:
+                dados = json.loads(linha[0])
+                dados.update(campos)
+                conexao.execute(
+                    "UPDATE analises SET dados = ?, atualizado_em = ? WHERE id = ?",
+                    (codificar(dados).decode("utf-8"), time.time(), analise_id),
+                )
+            conexao.commit()
+        finally:
+            conexao.close()
+
+    def obter_json(self, analise_id: str) -> Optional[bytes]:
+        with closing(self._conectar()) as conexao, conexao:
+            linha = conexao.execute("SELECT dados FROM analises WHERE id = ?", (analise_id,)).fetchone()
+        return linha[0].encode("utf-8") if linha else None
+
+    def ultima_json(self) -> Optional[bytes]:
+        with closing(self._conectar()) as conexao, conexao:
+            linha = conexao.execute("SELECT dados FROM analises ORDER BY criado_em DESC LIMIT 1").fetchone()
+        return linha[0].encode("utf-8") if linha else None
+
+    def obter(self, analise_id: str) -> Optional[Dict[str, object]]:
+        codificado = self.obter_json(analise_id)
+        return json.loads(codificado) if codificado is not None else None
+
+    def ultima(self) -> Optional[Tuple[str, Dict[str, object]]]:
+        with closing(self._conectar()) as conexao, conexao:
+            linha = conexao.execute(
+                "SELECT id, dados FROM analises ORDER BY criado_em DESC LIMIT 1"
+            ).fetchone()
+        return (linha[0], json.loads(linha[1])) if linha else None
+
+    def estatisticas(self) -> Dict[str, object]:
+        with closing(self._conectar()) as conexao, conexao:
+            total = conexao.execute("SELECT COUNT(*) FROM analises").fetchone()[0]
+        return {"backend": "sqlite", "analises": total, "caminho": self.caminho}
+
+
+def criar_armazenamento():
+    backend = os.getenv("ANALISES_BACKEND", "memoria").lower()
+    max_analises = int(os.getenv("ANALISES_MAX", 500))
+    if backend == "sqlite":
+        return ArmazenamentoSQLite(os.getenv("ANALISES_SQLITE_PATH", "dados/analises.sqlite3"), max_analises)
+    if backend != "memoria":
+        raise ValueError(f"ANALISES_BACKEND inválido: {backend}. Use um de: {', '.join(BACKENDS_ANALISES)}")
+    return ArmazenamentoMemoria(max_analises)
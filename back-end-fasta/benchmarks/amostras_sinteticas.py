@@ -0,0 +1,166 @@
+"""Gerador de amostras sintéticas do PKD1 a partir de ``ref/ref.fasta``.
+
+Uso (a partir de back-end-fasta/):
+
+    python benchmarks/amostras_sinteticas.py --saida amostra.fasta \\
+        [--comprimento 10000] [--truncamento 0.5] [--registros 5] [--reverso] [--sem-rotulo]
+
+Cada arquivo tem um registro do PKD1 (janela da referência centrada no
+exon29, com SNPs/indels sorteados em taxas próprias dentro e fora do exon)
+e, opcionalmente, registros-isca de DNA aleatório do mesmo tamanho. Tudo é
+determinístico para a mesma ``--seed``.
+"""
+import argparse
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from referencia import EXON29_FIM_REF, EXON29_INICIO_REF, obter_referencia  # noqa: E402
+
+COMPLEMENTO = str.maketrans("ACGTN", "TGCAN")
+LARGURA_LINHA = 70
+
+
+def mutar(rng: random.Random, seq: str, taxa_snp: float, taxa_indel: float) -> str:
+    saida = []
+    for base in seq:
+        sorteio = rng.random()
+        if sorteio < taxa_indel / 2:
+            continue
+        if sorteio < taxa_indel:
+            saida.append(base + rng.choice("ACGT"))
+            continue
+        if rng.random() < taxa_snp:
+            saida.append(rng.choice([b for b in "ACGT" if b != base]))
+        else:
+            saida.append(base)
+    return "".join(saida)
+
+
+def reverso_complementar(seq: str) -> str:
+    return seq.translate(COMPLEMENTO)[::-1]
+
+
+def janela_amostra(tamanho_referencia: int, comprimento: int = 0, truncamento: float = 0.0) -> Tuple[int, int]:
+    """Trecho ``[inicio, fim)`` da referência coberto pela amostra.
+
+    ``comprimento`` <= 0 usa o gene inteiro; senão a janela é centrada no
+    exon29. ``truncamento`` (0 a 1) é a fração final do exon29 que fica de
+    fora: a amostra termina dentro do exon.
+    """
+    if comprimento <= 0 or comprimento >= tamanho_referencia:
+        inicio, fim = 0, tamanho_referencia
+    else:
+        centro = (EXON29_INICIO_REF + EXON29_FIM_REF) // 2
+        inicio = min(max(0, centro - comprimento // 2), tamanho_referencia - comprimento)
+        fim = inicio + comprimento
+    if truncamento > 0:
+        corte = EXON29_FIM_REF - int(round(truncamento * (EXON29_FIM_REF - EXON29_INICIO_REF)))
+        fim = max(inicio + 1, min(fim, corte))
+    return inicio, fim
+
+
+def gerar_amostra(
+    rng: random.Random,
+    referencia: str,
+    comprimento: int = 0,
+    truncamento: float = 0.0,
+    taxa_snp: float = 0.002,
+    taxa_indel: float = 0.0005,
+    taxa_snp_exon: float = 0.02,
+    taxa_indel_exon: float = 0.01,
+) -> str:
+    """Sequência do PKD1 mutada, com taxas diferentes dentro e fora do exon29."""
+    inicio, fim = janela_amostra(len(referencia), comprimento, truncamento)
+    exon_inicio = min(max(inicio, EXON29_INICIO_REF), fim)
+    exon_fim = min(max(exon_inicio, EXON29_FIM_REF), fim)
+    return (
+        mutar(rng, referencia[inicio:exon_inicio], taxa_snp, taxa_indel)
+        + mutar(rng, referencia[exon_inicio:exon_fim], taxa_snp_exon, taxa_indel_exon)
+        + mutar(rng, referencia[exon_fim:fim], taxa_snp, taxa_indel)
+    )
+
+
+def _formatar_registro(cabecalho: str, seq: str) -> str:
+    linhas = [f">{cabecalho}"]
+    linhas.extend(seq[i:i + LARGURA_LINHA] for i in range(0, len(seq), LARGURA_LINHA))
+    return "\n".join(linhas) + "\n"
+
+
+def gerar_fasta(
+    rng: random.Random,
+    referencia: str,
+    registros: int = 1,
+    reverso: bool = False,
+    rotulado: bool = True,
+    **parametros_amostra,
+) -> Tuple[str, Dict[str, object]]:
+    """FASTA com uma amostra do PKD1 e ``registros - 1`` iscas aleatórias.
+
+    ``reverso`` grava a amostra como reverso-complementar; com
+    ``rotulado=False`` nenhum cabeçalho menciona o PKD1 (força a
+    identificação por k-mers/alinhamento). Retorna ``(texto, descricao)``.
+    """
+    amostra = gerar_amostra(rng, referencia, **parametros_amostra)
+    if reverso:
+        amostra = reverso_complementar(amostra)
+
+    registros = max(1, registros)
+    posicao_alvo = rng.randrange(registros)
+    partes: List[str] = []
+    for i in range(registros):
+        if i == posicao_alvo:
+            cabecalho = f"amostra_sintetica PKD1 fita={'-' if reverso else '+'}" if rotulado else f"registro_{i + 1}"
+            partes.append(_formatar_registro(cabecalho, amostra))
+        else:
+            isca = "".join(rng.choices("ACGT", k=len(amostra)))
+            partes.append(_formatar_registro(f"registro_{i + 1}", isca))
+
+    return "".join(partes), {
+        "tamanho_amostra": len(amostra),
+        "registros": registros,
+        "posicao_alvo": posicao_alvo,
+        "reverso": reverso,
+        "rotulado": rotulado,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saida", required=True, help="Arquivo FASTA gerado")
+    parser.add_argument("--comprimento", type=int, default=0, help="nt da janela (0 = gene completo)")
+    parser.add_argument("--truncamento", type=float, default=0.0, help="Fração final do exon29 removida")
+    parser.add_argument("--taxa-snp", type=float, default=0.002)
+    parser.add_argument("--taxa-indel", type=float, default=0.0005)
+    parser.add_argument("--taxa-snp-exon", type=float, default=0.02)
+    parser.add_argument("--taxa-indel-exon", type=float, default=0.01)
+    parser.add_argument("--registros", type=int, default=1)
+    parser.add_argument("--reverso", action="store_true", help="Grava a amostra como reverso-complementar")
+    parser.add_argument("--sem-rotulo", action="store_true", help="Cabeçalhos sem menção ao PKD1")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--ref", default="ref/ref.fasta")
+    args = parser.parse_args()
+
+    texto, descricao = gerar_fasta(
+        random.Random(args.seed),
+        obter_referencia(args.ref).sequencia,
+        registros=args.registros,
+        reverso=args.reverso,
+        rotulado=not args.sem_rotulo,
+        comprimento=args.comprimento,
+        truncamento=args.truncamento,
+        taxa_snp=args.taxa_snp,
+        taxa_indel=args.taxa_indel,
+        taxa_snp_exon=args.taxa_snp_exon,
+        taxa_indel_exon=args.taxa_indel_exon,
+    )
+    with open(args.saida, "w") as arquivo:
+        arquivo.write(texto)
+    print(f"{args.saida}: {descricao}")
+
+
+if __name__ == "__main__":
+    main()
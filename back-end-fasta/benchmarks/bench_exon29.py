@@ -0,0 +1,159 @@
+"""Compara a extração do exon29/identidade por base (antiga) com a vetorizada.
+
+Uso (a partir de back-end-fasta/):
+
+    python benchmarks/bench_exon29.py [--repeticoes 20] [--seed 7]
+
+Gera amostras sintéticas do PKD1 com SNPs/indels dentro e fora do exon29,
+alinha em modo "ancorado" e confere que as duas implementações produzem
+exatamente a mesma saída antes de medir o tempo de cada uma.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import (  # noqa: E402
+    EXON29_FIM_REF,
+    EXON29_INICIO_REF,
+    _analisar_exon29,
+    calcular_identidade_por_blocos,
+)
+from alinhamento_ancorado import alinhar_ancorado  # noqa: E402
+from referencia import obter_referencia  # noqa: E402
+from amostras_sinteticas import mutar  # noqa: E402
+
+
+def identidade_por_base(alinhamento, referencia, sequencia):
+    """Implementação anterior: laço Python por base em todos os blocos."""
+    matches = 0
+    length = 0
+    ref_blocks, query_blocks = alinhamento.aligned
+    for (r0, r1), (q0, q1) in zip(ref_blocks, query_blocks):
+        block_len = min(r1 - r0, q1 - q0)
+        for i in range(block_len):
+            if referencia[r0 + i] == sequencia[q0 + i]:
+                matches += 1
+        length += block_len
+    return (matches / length) * 100 if length > 0 else 0
+
+
+def exon29_por_base(alinhamento, referencia, sequencia_analisada) -> Tuple[str, List[Dict[str, object]], Dict[str, int]]:
+    """Implementação anterior: percorre o caminho inteiro base a base."""
+    coordenadas = alinhamento.coordinates
+    path = list(zip(coordenadas[0], coordenadas[1]))
+    if len(path) < 2:
+        return None, [], {"total_insercoes_nt": 0, "total_delecoes_nt": 0}
+
+    exon_seq: List[str] = []
+    variantes: List[Dict[str, object]] = []
+    total_ins_nt = 0
+    total_del_nt = 0
+
+    ref_pos, query_pos = (int(v) for v in path[0])
+    for idx in range(len(path) - 1):
+        prox_ref, prox_query = (int(v) for v in path[idx + 1])
+        while ref_pos < prox_ref or query_pos < prox_query:
+            dentro_exon = EXON29_INICIO_REF <= ref_pos < EXON29_FIM_REF
+            if ref_pos < prox_ref and query_pos < prox_query:
+                ref_base = referencia[ref_pos]
+                query_base = sequencia_analisada[query_pos]
+                if dentro_exon:
+                    exon_seq.append(query_base)
+                    if ref_base != query_base:
+                        variantes.append({
+                            "tipo": "substituicao",
+                            "posicao_genomica": ref_pos + 1,
+                            "posicao_exon": (ref_pos - EXON29_INICIO_REF) + 1,
+                            "ref": ref_base,
+                            "alt": query_base,
+                        })
+                ref_pos += 1
+                query_pos += 1
+            elif ref_pos < prox_ref:
+                if dentro_exon:
+                    variantes.append({
+                        "tipo": "delecao",
+                        "posicao_genomica": ref_pos + 1,
+                        "posicao_exon": (ref_pos - EXON29_INICIO_REF) + 1,
+                        "ref": referencia[ref_pos],
+                        "alt": "-",
+                        "tamanho": 1,
+                    })
+                    exon_seq.append("-")
+                    total_del_nt += 1
+                ref_pos += 1
+            else:
+                if dentro_exon:
+                    variantes.append({
+                        "tipo": "insercao",
+                        "posicao_genomica": ref_pos + 1,
+                        "posicao_exon": (ref_pos - EXON29_INICIO_REF) + 1,
+                        "ref": "-",
+                        "alt": sequencia_analisada[query_pos],
+                        "tamanho": 1,
+                    })
+                    exon_seq.append(sequencia_analisada[query_pos])
+                    total_ins_nt += 1
+                query_pos += 1
+
+    info = {"total_insercoes_nt": total_ins_nt, "total_delecoes_nt": total_del_nt}
+    return ("".join(exon_seq) if exon_seq else None), variantes, info
+
+
+def medir(funcao, repeticoes: int, *args) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(*args)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    ref = obter_referencia("ref/ref.fasta")
+    referencia = ref.sequencia
+    rng = random.Random(args.seed)
+
+    cenarios = [
+        ("gene completo", 0, len(referencia)),
+        ("10 kb ao redor do exon29", EXON29_INICIO_REF - 5000, EXON29_FIM_REF + 5000),
+        ("fragmento 1 kb", EXON29_INICIO_REF - 400, EXON29_FIM_REF + 400),
+    ]
+
+    print(f"{'cenário':<28}{'tamanho':>9}{'ident. antiga':>15}{'ident. nova':>13}{'exon antiga':>13}{'exon nova':>11}")
+    for nome, inicio, fim in cenarios:
+        amostra = (
+            mutar(rng, referencia[inicio:EXON29_INICIO_REF], 0.002, 0.0005)
+            + mutar(rng, referencia[EXON29_INICIO_REF:EXON29_FIM_REF], 0.02, 0.01)
+            + mutar(rng, referencia[EXON29_FIM_REF:fim], 0.002, 0.0005)
+        )
+        alinhamento = alinhar_ancorado(
+            ref.aligner_alinhamento, referencia, amostra, indice=ref.indice,
+            janela_protegida=(EXON29_INICIO_REF, EXON29_FIM_REF),
+        )
+
+        assert exon29_por_base(alinhamento, referencia, amostra) == _analisar_exon29(alinhamento, referencia, amostra)
+        assert abs(
+            identidade_por_base(alinhamento, referencia, amostra)
+            - calcular_identidade_por_blocos(alinhamento, referencia, amostra)
+        ) < 1e-9
+
+        tempos = [
+            medir(identidade_por_base, args.repeticoes, alinhamento, referencia, amostra),
+            medir(calcular_identidade_por_blocos, args.repeticoes, alinhamento, ref.bytes, amostra),
+            medir(exon29_por_base, args.repeticoes, alinhamento, referencia, amostra),
+            medir(_analisar_exon29, args.repeticoes, alinhamento, referencia, amostra, ref.bytes),
+        ]
+        print(f"{nome:<28}{len(amostra):>9}" + "".join(f"{t:>12.3f}ms" for t in tempos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Confere e mede o alinhamento completo em ladrilhos contra o serial.
+
+Uso (a partir de back-end-fasta/):
+
+    python benchmarks/bench_paralelo.py [--workers 4] [--comprimentos 3000 8000 12000]
+        [--truncamentos 0 0.5] [--amostras 2] [--ganho-minimo 1.0] [--seed 7]
+
+Gera amostras sintéticas do PKD1 (mesmos parâmetros do ``bench_pipeline``),
+executa ``realizar_alinhamento_grande`` no modo "completo" em série e com
+``paralelo=True`` e exige resultados idênticos (tudo menos ``estrategia``)
+e ganho de pelo menos ``--ganho-minimo`` sempre que os ladrilhos foram
+usados. Como a soma dos ladrilhos custa menos células de DP que o serial, o
+ganho aparece mesmo com um único núcleo. ``--comprimentos 0`` (gene
+inteiro) custa minutos por amostra no serial.
+
+Depois confere o ``motivo`` de cada retorno ao serial: ``workers<2``,
+``sem_ancoras``, ``ancoras_insuficientes``, ``custo_serial_menor`` (numa
+referência curta) e ``pool_quebrado`` (workers mortos durante a rodada).
+Sai com código 1 se algo divergir.
+"""
+import argparse
+import itertools
+import os
+import random
+import signal
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amostras_sinteticas import gerar_amostra  # noqa: E402
+
+
+def comparar_tempos(args, referencia, realizar_alinhamento_grande) -> int:
+    rng = random.Random(args.seed)
+    falhas = 0
+    print(f"{'comprimento':>11} {'trunc':>5} {'#':>2} {'serial ms':>10} {'paralelo ms':>11} {'ganho':>7}  ladrilhos")
+    for comprimento, truncamento in itertools.product(args.comprimentos, args.truncamentos):
+        for numero in range(args.amostras):
+            amostra = gerar_amostra(rng, referencia, comprimento=comprimento, truncamento=truncamento)
+
+            inicio = time.perf_counter()
+            serial = realizar_alinhamento_grande(amostra, ref_path=args.ref, paralelo=False)
+            serial_ms = (time.perf_counter() - inicio) * 1000
+
+            inicio = time.perf_counter()
+            paralelo = realizar_alinhamento_grande(amostra, ref_path=args.ref, paralelo=True)
+            paralelo_ms = (time.perf_counter() - inicio) * 1000
+
+            detalhes = paralelo.get("estrategia", {}).get("paralelo", {})
+            serial.pop("estrategia", None)
+            paralelo.pop("estrategia", None)
+            ganho = serial_ms / paralelo_ms
+            problemas = []
+            if serial != paralelo:
+                problemas.append("DIVERGENTE")
+            if "motivo" not in detalhes and ganho < args.ganho_minimo:
+                problemas.append("SEM GANHO")
+            falhas += bool(problemas)
+            print(
+                f"{comprimento:>11} {truncamento:>5} {numero:>2} {serial_ms:>10.1f} {paralelo_ms:>11.1f} "
+                f"{ganho:>6.2f}x  {detalhes.get('motivo', detalhes.get('ladrilhos'))}"
+                + "".join(f"  {p}" for p in problemas)
+            )
+    return falhas
+
+
+def conferir_motivos(args, referencia, realizar_alinhamento_grande) -> int:
+    import alinhamento_paralelo
+    from referencia import obter_referencia
+
+    rng = random.Random(args.seed)
+    aligner = obter_referencia(args.ref).aligner_alinhamento
+    casos = []
+
+    def motivo_servico(amostra):
+        resultado = realizar_alinhamento_grande(amostra, ref_path=args.ref, paralelo=True)
+        return resultado.get("estrategia", {}).get("paralelo", {}).get("motivo")
+
+    os.environ["ALINHAMENTO_WORKERS"] = "0"
+    casos.append(("workers<2", motivo_servico(gerar_amostra(rng, referencia, comprimento=2000))))
+    os.environ["ALINHAMENTO_WORKERS"] = str(max(2, args.workers))
+
+    aleatoria = "".join(rng.choice("ACGT") for _ in range(500))
+    casos.append(("sem_ancoras", alinhamento_paralelo.alinhar_em_ladrilhos(
+        aligner, args.ref, referencia, aleatoria)[1].get("motivo")))
+
+    # Um SNP a cada ~4 nt: só sobram âncoras curtas demais para um corte
+    mutada = gerar_amostra(rng, referencia, comprimento=2000, taxa_snp=0.25, taxa_snp_exon=0.25)
+    casos.append(("ancoras_insuficientes", alinhamento_paralelo.alinhar_em_ladrilhos(
+        aligner, args.ref, referencia, mutada)[1].get("motivo")))
+
+    # Referência de 400 nt: a DP serial inteira custa menos que o envio dos ladrilhos
+    with tempfile.TemporaryDirectory() as pasta:
+        curta = referencia[20000:20400]
+        caminho = os.path.join(pasta, "curta.fasta")
+        with open(caminho, "w") as arquivo:
+            arquivo.write(f">curta\n{curta}\n")
+        casos.append(("custo_serial_menor", alinhamento_paralelo.alinhar_em_ladrilhos(
+            aligner, caminho, curta, curta[50:350])[1].get("motivo")))
+
+    def matar_workers():
+        time.sleep(0.3)
+        executor = alinhamento_paralelo.pool._executor
+        for pid in list(getattr(executor, "_processes", {}) or {}):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    alinhamento_paralelo.pool.obter()
+    assassino = threading.Thread(target=matar_workers)
+    assassino.start()
+    casos.append(("pool_quebrado", motivo_servico(gerar_amostra(rng, referencia, comprimento=12000))))
+    assassino.join()
+
+    print(f"\n{'motivo esperado':<24} obtido")
+    falhas = 0
+    for esperado, obtido in casos:
+        falhas += esperado != obtido
+        print(f"{esperado:<24} {obtido}" + ("" if esperado == obtido else "  ERRADO"))
+    return falhas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 2))
+    parser.add_argument("--comprimentos", type=int, nargs="+", default=[3000, 8000, 12000])
+    parser.add_argument("--truncamentos", type=float, nargs="+", default=[0.0, 0.5])
+    parser.add_argument("--amostras", type=int, default=2, help="Amostras por cenário")
+    parser.add_argument("--ganho-minimo", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--ref", default="ref/ref.fasta")
+    args = parser.parse_args()
+
+    # O pool lê ALINHAMENTO_WORKERS na criação
+    os.environ["ALINHAMENTO_WORKERS"] = str(max(2, args.workers))
+    from referencia import obter_referencia
+    from services import realizar_alinhamento_grande
+
+    referencia = obter_referencia(args.ref).sequencia
+    falhas = comparar_tempos(args, referencia, realizar_alinhamento_grande)
+    falhas += conferir_motivos(args, referencia, realizar_alinhamento_grande)
+
+    print(f"\n{falhas} falha(s)")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""Benchmark reprodutível das etapas do pipeline sobre amostras sintéticas.
+
+Uso (a partir de back-end-fasta/):
+
+    python benchmarks/bench_pipeline.py [--saida resultados.json] [--comparar anterior.json]
+        [--comprimentos 2000 10000 0] [--truncamentos 0 0.5] [--registros 1 10]
+        [--fitas direta reversa] [--rotulos com sem] [--modos ancorado exon]
+        [--taxas-snp 0.002] [--taxas-indel 0.0005] [--taxas-snp-exon 0.02] [--taxas-indel-exon 0.01]
+        [--repeticoes 5] [--seed 7]
+
+Para cada combinação da grade gera um FASTA (``amostras_sinteticas``) e mede:
+
+  - ``buscar_gene_pkd1`` sobre o arquivo inteiro;
+  - ``realizar_alinhamento_grande`` em cada modo pedido;
+  - ``_analisar_exon29`` sobre o alinhamento ancorado da amostra;
+  - ``extrair_features`` do serviço ``ia`` com o resultado do alinhamento.
+
+Roda sem rede. O JSON de saída traz o ambiente (commit, versões) e, por
+cenário, min/mediana/média/máx em ms de cada etapa; ``--comparar`` imprime a
+razão entre as medianas deste e de outro resultado (ex.: de outro commit).
+O modo "completo" sobre o gene inteiro leva mais de um minuto por repetição.
+"""
+import argparse
+import importlib.util
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import Bio  # noqa: E402
+import numpy as np  # noqa: E402
+
+from alinhamento_ancorado import alinhar_ancorado  # noqa: E402
+from amostras_sinteticas import gerar_fasta  # noqa: E402
+from referencia import EXON29_FIM_REF, EXON29_INICIO_REF, obter_referencia  # noqa: E402
+from services import _analisar_exon29, buscar_gene_pkd1, realizar_alinhamento_grande  # noqa: E402
+
+UTILS_IA = os.path.join(os.path.dirname(RAIZ), "ia", "utils.py")
+
+
+def carregar_utils_ia():
+    # Carregado pelo caminho: o pacote "ia" não é instalável e tem módulos com nomes iguais aos daqui
+    spec = importlib.util.spec_from_file_location("ia_utils", UTILS_IA)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def medir(funcao: Callable[[], object], repeticoes: int) -> Dict[str, float]:
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "min_ms": round(min(tempos), 3),
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "media_ms": round(statistics.fmean(tempos), 3),
+        "max_ms": round(max(tempos), 3),
+        "repeticoes": repeticoes,
+    }
+
+
+def commit_atual() -> Optional[str]:
+    try:
+        saida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+def id_cenario(parametros: Dict[str, object]) -> str:
+    return "_".join(f"{chave}={valor}" for chave, valor in parametros.items())
+
+
+def executar_cenario(ref, utils_ia, parametros: Dict[str, object], modos: List[str], repeticoes: int, seed: int):
+    rng = random.Random(f"{seed}:{id_cenario(parametros)}")
+    texto, descricao = gerar_fasta(
+        rng,
+        ref.sequencia,
+        registros=parametros["registros"],
+        reverso=parametros["fita"] == "reversa",
+        rotulado=parametros["rotulo"] == "com",
+        comprimento=parametros["comprimento"],
+        truncamento=parametros["truncamento"],
+        taxa_snp=parametros["taxa_snp"],
+        taxa_indel=parametros["taxa_indel"],
+        taxa_snp_exon=parametros["taxa_snp_exon"],
+        taxa_indel_exon=parametros["taxa_indel_exon"],
+    )
+    dados = texto.encode("ascii")
+    cenario = {"id": id_cenario(parametros), "parametros": parametros, "amostra": descricao, "etapas": {}}
+    etapas = cenario["etapas"]
+
+    etapas["buscar_gene_pkd1"] = medir(lambda: buscar_gene_pkd1(io.BytesIO(dados)), repeticoes)
+    gene_info = buscar_gene_pkd1(io.BytesIO(dados))
+    if "error" in gene_info:
+        cenario["erro"] = gene_info["error"]
+        return cenario
+    sequencia = gene_info["sequencia"]
+    cenario["identificacao"] = gene_info["metadados"]["metodo_identificacao"]
+
+    resultado = None
+    cenario["alinhamento"] = {}
+    for modo in modos:
+        etapas[f"realizar_alinhamento_grande[{modo}]"] = medir(
+            lambda: realizar_alinhamento_grande(sequencia, modo=modo), repeticoes
+        )
+        saida = realizar_alinhamento_grande(sequencia, modo=modo)
+        if "error" in saida:
+            cenario["alinhamento"][modo] = {"erro": saida["error"]}
+            continue
+        cenario["alinhamento"][modo] = {
+            "identidade_pct": saida["melhor_alinhamento"].get("identidade_pct"),
+            "cobertura_exon29_pct": saida.get("metricas_exon29", {}).get("cobertura_pct"),
+            "variantes_exon29": len(saida.get("variantes_exon29", [])),
+        }
+        resultado = resultado or saida
+
+    alinhamento = alinhar_ancorado(
+        ref.aligner_alinhamento, ref.sequencia, sequencia, indice=ref.indice,
+        janela_protegida=(EXON29_INICIO_REF, EXON29_FIM_REF),
+    )
+    if alinhamento is not None:
+        etapas["_analisar_exon29"] = medir(lambda: _analisar_exon29(alinhamento, ref.sequencia, sequencia, ref.bytes), repeticoes)
+
+    if resultado is not None and resultado.get("exon29_amostra"):
+        etapas["extrair_features"] = medir(
+            lambda: utils_ia.extrair_features(
+                resultado["exon29_amostra"],
+                referencia=resultado.get("exon29_referencia"),
+                variantes=resultado.get("variantes_exon29", []),
+                identidade=resultado["melhor_alinhamento"].get("identidade_pct"),
+                metricas=resultado.get("metricas_exon29", {}),
+            ),
+            repeticoes,
+        )
+    return cenario
+
+
+def comparar(atual: Dict[str, object], anterior: Dict[str, object]) -> None:
+    anteriores = {c["id"]: c["etapas"] for c in anterior["cenarios"]}
+    print(f"\nComparação com {anterior['ambiente'].get('commit') or 'resultado anterior'} (mediana atual / anterior):")
+    for cenario in atual["cenarios"]:
+        etapas_anteriores = anteriores.get(cenario["id"])
+        if etapas_anteriores is None:
+            continue
+        print(f"  {cenario['id']}")
+        for etapa, medida in cenario["etapas"].items():
+            if etapa in etapas_anteriores:
+                base = etapas_anteriores[etapa]["mediana_ms"]
+                razao = medida["mediana_ms"] / base if base else float("inf")
+                print(f"    {etapa:<40}{medida['mediana_ms']:>12.3f}ms{base:>12.3f}ms{razao:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comprimentos", type=int, nargs="+", default=[2000, 10000, 0],
+                        help="nt da amostra (0 = gene completo)")
+    parser.add_argument("--truncamentos", type=float, nargs="+", default=[0.0])
+    parser.add_argument("--taxas-snp", type=float, nargs="+", default=[0.002], help="SNPs por nt fora do exon29")
+    parser.add_argument("--taxas-indel", type=float, nargs="+", default=[0.0005], help="Indels por nt fora do exon29")
+    parser.add_argument("--taxas-snp-exon", type=float, nargs="+", default=[0.02])
+    parser.add_argument("--taxas-indel-exon", type=float, nargs="+", default=[0.01])
+    parser.add_argument("--registros", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--fitas", nargs="+", choices=["direta", "reversa"], default=["direta"])
+    parser.add_argument("--rotulos", nargs="+", choices=["com", "sem"], default=["com", "sem"])
+    parser.add_argument("--modos", nargs="+", choices=["completo", "ancorado", "exon"], default=["ancorado", "exon"])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--ref", default="ref/ref.fasta")
+    parser.add_argument("--saida", help="Grava os resultados em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    ref = obter_referencia(args.ref)
+    utils_ia = carregar_utils_ia()
+
+    grade = [
+        dict(zip(
+            (
+                "comprimento", "truncamento", "taxa_snp", "taxa_indel", "taxa_snp_exon", "taxa_indel_exon",
+                "registros", "fita", "rotulo",
+            ),
+            combinacao,
+        ))
+        for combinacao in itertools.product(
+            args.comprimentos, args.truncamentos, args.taxas_snp, args.taxas_indel,
+            args.taxas_snp_exon, args.taxas_indel_exon,
+            args.registros, args.fitas, args.rotulos,
+        )
+    ]
+
+    cenarios = []
+    for numero, parametros in enumerate(grade, 1):
+        print(f"[{numero}/{len(grade)}] {id_cenario(parametros)}", flush=True)
+        cenario = executar_cenario(ref, utils_ia, parametros, args.modos, args.repeticoes, args.seed)
+        for etapa, medida in cenario["etapas"].items():
+            print(f"    {etapa:<40}{medida['mediana_ms']:>12.3f}ms")
+        if "erro" in cenario:
+            print(f"    erro: {cenario['erro']}")
+        cenarios.append(cenario)
+
+    resultado = {
+        "ambiente": {
+            "commit": commit_atual(),
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "numpy": np.__version__,
+            "biopython": Bio.__version__,
+            "referencia_sha256": ref.sha256,
+        },
+        "parametros": {
+            "modos": args.modos,
+            "repeticoes": args.repeticoes,
+            "seed": args.seed,
+        },
+        "cenarios": cenarios,
+    }
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(resultado, json.load(arquivo))
+
+
+if __name__ == "__main__":
+    main()
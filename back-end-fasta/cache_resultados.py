@@ -0,0 +1,226 @@
+"""Cache endereçado por conteúdo dos resultados de alinhamento.
+
+A chave é o SHA-256 de (sequência normalizada, SHA-256 da referência,
+parâmetros do aligner, opções de alinhamento, SHA-256 da tabela de regiões),
+então qualquer mudança em um desses itens gera outra chave e nenhuma
+invalidação manual é necessária. A classificação da IA fica de fora: o
+modelo é de outro serviço e não entra na chave.
+
+Duas camadas:
+  - memória: LRU por número de entradas, por processo;
+  - disco: SQLite (compartilhado entre processos/workers) com despejo das
+    entradas menos acessadas quando o total passa de ``CACHE_DISCO_MAX_MB``.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import closing
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from Bio.Align import PairwiseAligner
+
+from referencia import REF_PADRAO, obter_referencia
+from regioes import REGIOES_PADRAO, obter_tabela_regioes
+from serializacao import codificar
+from services import REGIAO_EXON29
+
+# Incrementar quando o formato do resultado mudar
+VERSAO_CACHE = 1
+
+CAMADA_MEMORIA = "memoria"
+CAMADA_DISCO = "disco"
+
+
+def descrever_aligner(aligner: PairwiseAligner) -> str:
+    """Parâmetros do aligner em texto estável (a matriz entra pelo hash do conteúdo)."""
+    descricao = str(aligner)
+    matriz = aligner.substitution_matrix
+    if matriz is not None:
+        assinatura = hashlib.sha256(
+            matriz.alphabet.encode() + np.ascontiguousarray(matriz, dtype=np.float64).tobytes()
+        ).hexdigest()
+        descricao = re.sub(r"<Array object at 0x[0-9a-f]+>", f"matriz:{assinatura}", descricao)
+    return descricao
+
+
+def chave_analise(
+    sequencia: str,
+    opcoes: Dict[str, object],
+    ref_path: str = REF_PADRAO,
+    regioes_path: str = REGIOES_PADRAO,
+) -> str:
+    ref = obter_referencia(ref_path)
+    tabela = obter_tabela_regioes(regioes_path, padrao=REGIAO_EXON29)
+    h = hashlib.sha256()
+    h.update(f"v{VERSAO_CACHE}\n{ref.sha256}\n{tabela.sha256}\n".encode())
+    h.update(descrever_aligner(ref.aligner_alinhamento).encode())
+    h.update(json.dumps(opcoes, sort_keys=True).encode())
+    h.update(b"\n")
+    h.update("".join(sequencia.split()).upper().encode("ascii", errors="replace"))
+    return h.hexdigest()
+
+
+class CacheResultados:
+    def __init__(self, max_memoria: int, caminho_disco: Optional[str], max_bytes_disco: int):
+        self.max_memoria = max(0, max_memoria)
+        self.caminho_disco = caminho_disco or None
+        self.max_bytes_disco = max_bytes_disco
+        self._memoria: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disco_pronto = False
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.faltas = 0
+        self.gravacoes = 0
+        self.despejos_disco = 0
+        self.erros_disco = 0
+
+    # --- disco -----------------------------------------------------------
+    def _conectar(self) -> sqlite3.Connection:
+        if not self._disco_pronto:
+            # O sqlite3 não cria a pasta: sem isso toda leitura/gravação falha num checkout limpo
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho_disco)), exist_ok=True)
+        # ``with conexao`` só faz commit/rollback; quem chama fecha com ``closing``
+        conexao = sqlite3.connect(self.caminho_disco, timeout=5)
+        if not self._disco_pronto:
+            try:
+                conexao.execute("PRAGMA journal_mode=WAL")
+                conexao.execute(
+                    "CREATE TABLE IF NOT EXISTS resultados ("
+                    " chave TEXT PRIMARY KEY, valor BLOB NOT NULL,"
+                    " tamanho INTEGER NOT NULL, acessado_em REAL NOT NULL)"
+                )
+                conexao.execute("CREATE INDEX IF NOT EXISTS idx_acessado ON resultados (acessado_em)")
+                conexao.commit()
+            except sqlite3.Error:
+                conexao.close()
+                raise
+            self._disco_pronto = True
+        return conexao
+
+    def _registrar_erro_disco(self, erro: Exception) -> None:
+        with self._lock:
+            self.erros_disco += 1
+            primeiro = self.erros_disco == 1
+        if primeiro:
+            # Só o primeiro é impresso; os seguintes aparecem em erros_disco
+            print(f"\n⚠️ Cache em disco indisponível ({self.caminho_disco}): {erro}")
+
+    def _ler_disco(self, chave: str) -> Optional[bytes]:
+        with closing(self._conectar()) as conexao, conexao:
+            linha = conexao.execute("SELECT valor FROM resultados WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return None
+            conexao.execute("UPDATE resultados SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+        return zlib.decompress(linha[0])
+
+    def _gravar_disco(self, chave: str, dados: bytes) -> None:
+        comprimido = zlib.compress(dados, 6)
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute(
+                "INSERT OR REPLACE INTO resultados (chave, valor, tamanho, acessado_em) VALUES (?, ?, ?, ?)",
+                (chave, comprimido, len(comprimido), time.time()),
+            )
+            total = conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM resultados").fetchone()[0]
+            if total > self.max_bytes_disco:
+                # Despeja as menos acessadas até voltar a 90% do limite
+                excesso = total - int(self.max_bytes_disco * 0.9)
+                liberado = 0
+                for antiga, tamanho in conexao.execute(
+                    "SELECT chave, tamanho FROM resultados WHERE chave != ? ORDER BY acessado_em", (chave,)
+                ).fetchall():
+                    if liberado >= excesso:
+                        break
+                    conexao.execute("DELETE FROM resultados WHERE chave = ?", (antiga,))
+                    liberado += tamanho
+                    self.despejos_disco += 1
+
+    # --- API -------------------------------------------------------------
+    def _guardar_memoria(self, chave: str, dados: bytes) -> None:
+        if self.max_memoria == 0:
+            return
+        with self._lock:
+            self._memoria[chave] = dados
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+
+    def obter(self, chave: str) -> Tuple[Optional[Dict[str, object]], Optional[str]]:
+        """Retorna ``(valor, camada)``; ``(None, None)`` em caso de falta."""
+        with self._lock:
+            dados = self._memoria.get(chave)
+            if dados is not None:
+                self._memoria.move_to_end(chave)
+                self.acertos_memoria += 1
+                return json.loads(dados), CAMADA_MEMORIA
+
+        if self.caminho_disco:
+            try:
+                dados = self._ler_disco(chave)
+            except (sqlite3.Error, OSError) as e:
+                self._registrar_erro_disco(e)
+                dados = None
+            if dados is not None:
+                self._guardar_memoria(chave, dados)
+                with self._lock:
+                    self.acertos_disco += 1
+                return json.loads(dados), CAMADA_DISCO
+
+        with self._lock:
+            self.faltas += 1
+        return None, None
+
+    def gravar(self, chave: str, valor: Dict[str, object]) -> None:
+        dados = codificar(valor)
+        self._guardar_memoria(chave, dados)
+        if self.caminho_disco:
+            try:
+                self._gravar_disco(chave, dados)
+            except (sqlite3.Error, OSError) as e:
+                self._registrar_erro_disco(e)
+        with self._lock:
+            self.gravacoes += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._memoria.clear()
+        if self.caminho_disco and os.path.exists(self.caminho_disco):
+            with closing(self._conectar()) as conexao, conexao:
+                conexao.execute("DELETE FROM resultados")
+
+    def estatisticas(self) -> Dict[str, object]:
+        bytes_disco = entradas_disco = None
+        if self.caminho_disco and os.path.exists(self.caminho_disco):
+            try:
+                with closing(self._conectar()) as conexao, conexao:
+                    entradas_disco, bytes_disco = conexao.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM resultados"
+                    ).fetchone()
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            return {
+                "acertos_memoria": self.acertos_memoria,
+                "acertos_disco": self.acertos_disco,
+                "faltas": self.faltas,
+                "gravacoes": self.gravacoes,
+                "entradas_memoria": len(self._memoria),
+                "entradas_disco": entradas_disco,
+                "bytes_disco": bytes_disco,
+                "despejos_disco": self.despejos_disco,
+                "erros_disco": self.erros_disco,
+            }
+
+
+cache_resultados = CacheResultados(
+    max_memoria=int(os.getenv("CACHE_MEMORIA_MAX", 128)),
+    caminho_disco=os.getenv("CACHE_DISCO_PATH", "cache/resultados.sqlite3"),
+    max_bytes_disco=int(float(os.getenv("CACHE_DISCO_MAX_MB", 256)) * 1024 * 1024),
+)
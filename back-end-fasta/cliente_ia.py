@@ -0,0 +1,231 @@
+"""Cliente do classificador do exon29 (serviço ``ia``).
+
+Usa uma ``requests.Session`` com pool de conexões keep-alive, timeouts de
+conexão e de leitura, novas tentativas limitadas com jitter e um disjuntor
+(circuit breaker): depois de ``limite_falhas`` falhas seguidas as chamadas
+são recusadas na hora por ``tempo_aberto`` segundos, e então uma única
+chamada de teste decide se o circuito volta a fechar.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from serializacao import codificar
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+# Respostas que indicam falha passageira do serviço (vale tentar de novo)
+STATUS_TRANSITORIOS = (502, 503, 504)
+CABECALHOS_JSON = {"Content-Type": "application/json"}
+
+
+class ClassificacaoIndisponivel(Exception):
+    """A classificação não pôde ser obtida (erro HTTP, timeout, resposta inválida ou circuito aberto)."""
+
+    def __init__(self, motivo: str, status: Optional[int] = None, detalhe: Optional[str] = None):
+        super().__init__(detalhe or motivo)
+        self.motivo = motivo
+        self.status = status
+        self.detalhe = detalhe
+
+    def como_dict(self) -> Dict[str, object]:
+        return {"motivo": self.motivo, "status": self.status, "detalhe": self.detalhe}
+
+
+class Disjuntor:
+    def __init__(self, limite_falhas: int, tempo_aberto: float):
+        self.limite_falhas = max(1, limite_falhas)
+        self.tempo_aberto = tempo_aberto
+        self.estado = FECHADO
+        self.falhas_seguidas = 0
+        self.aberto_em = 0.0
+        self.aberturas = 0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        with self._lock:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO and time.monotonic() - self.aberto_em >= self.tempo_aberto:
+                self.estado = MEIO_ABERTO
+            if self.estado == MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            return False
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self.estado = FECHADO
+            self.falhas_seguidas = 0
+            self._teste_em_andamento = False
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self.falhas_seguidas += 1
+            self._teste_em_andamento = False
+            if self.estado == MEIO_ABERTO or self.falhas_seguidas >= self.limite_falhas:
+                if self.estado != ABERTO:
+                    self.aberturas += 1
+                self.estado = ABERTO
+                self.aberto_em = time.monotonic()
+
+
+class ClienteIA:
+    def __init__(
+        self,
+        url: str,
+        timeout_conexao: float = 2.0,
+        timeout_leitura: float = 10.0,
+        tentativas: int = 3,
+        espera_base: float = 0.2,
+        limite_falhas: int = 5,
+        tempo_aberto: float = 30.0,
+        tamanho_pool: int = 10,
+        janela_latencias: int = 1000,
+    ):
+        self.url = url
+        self.timeout = (timeout_conexao, timeout_leitura)
+        self.tentativas = max(1, tentativas)
+        self.espera_base = espera_base
+        self.disjuntor = Disjuntor(limite_falhas, tempo_aberto)
+
+        self._sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamanho_pool, max_retries=0)
+        self._sessao.mount("http://", adaptador)
+        self._sessao.mount("https://", adaptador)
+
+        self._lock = threading.Lock()
+        self._latencias_ms: Deque[float] = deque(maxlen=janela_latencias)
+        self.chamadas = 0
+        self.sucessos = 0
+        self.falhas = 0
+        self.recusadas = 0
+        self.novas_tentativas = 0
+
+    def _registrar(self, inicio: float, sucesso: bool) -> float:
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self._latencias_ms.append(latencia_ms)
+            if sucesso:
+                self.sucessos += 1
+            else:
+                self.falhas += 1
+        return latencia_ms
+
+    def _esperar(self, tentativa: int) -> None:
+        # Backoff exponencial com jitter completo
+        time.sleep(random.uniform(0, self.espera_base * (2 ** tentativa)))
+
+    def classificar(self, alinhamento_result: Dict[str, object]) -> Dict[str, object]:
+        """Envia o resultado do alinhamento e devolve a resposta da IA.
+
+        A latência da chamada (somando as tentativas) vai em ``latencia_ms``.
+        Levanta ``ClassificacaoIndisponivel`` em qualquer falha.
+        """
+        with self._lock:
+            self.chamadas += 1
+        if not self.disjuntor.permitir():
+            with self._lock:
+                self.recusadas += 1
+            raise ClassificacaoIndisponivel("circuito_aberto", detalhe="Classificação indisponível (circuito aberto)")
+
+        inicio = time.perf_counter()
+        sucesso = False
+        # O serviço respondeu (200 ou erro do pedido): não conta para abrir o circuito
+        servico_respondeu = False
+        try:
+            # Codificado depois do disjuntor: chamadas recusadas não pagam a serialização
+            corpo = codificar({"alinhamento_result": alinhamento_result})
+            inicio = time.perf_counter()
+            erro: Optional[ClassificacaoIndisponivel] = None
+            for tentativa in range(self.tentativas):
+                if tentativa:
+                    with self._lock:
+                        self.novas_tentativas += 1
+                    self._esperar(tentativa - 1)
+                try:
+                    resposta = self._sessao.post(self.url, data=corpo, headers=CABECALHOS_JSON, timeout=self.timeout)
+                except requests.Timeout as e:
+                    erro = ClassificacaoIndisponivel("timeout", detalhe=str(e))
+                    continue
+                except requests.ConnectionError as e:
+                    erro = ClassificacaoIndisponivel("conexao", detalhe=str(e))
+                    continue
+                except requests.RequestException as e:
+                    erro = ClassificacaoIndisponivel("requisicao", detalhe=str(e))
+                    continue
+
+                if resposta.status_code == 200:
+                    try:
+                        resultado = resposta.json()
+                    except ValueError as e:
+                        raise ClassificacaoIndisponivel("resposta_invalida", status=200, detalhe=str(e)) from e
+                    if not isinstance(resultado, dict):
+                        raise ClassificacaoIndisponivel("resposta_invalida", status=200, detalhe=resposta.text[:600])
+                    servico_respondeu = sucesso = True
+                    resultado["latencia_ms"] = round(self._registrar(inicio, True), 2)
+                    return resultado
+
+                erro = ClassificacaoIndisponivel("http", status=resposta.status_code, detalhe=resposta.text[:600])
+                if resposta.status_code not in STATUS_TRANSITORIOS:
+                    # Erro do pedido (4xx/500): não adianta repetir nem é sinal de serviço fora do ar
+                    servico_respondeu = True
+                    raise erro
+            raise erro
+        finally:
+            # Sempre informa o disjuntor, senão a chamada de teste do meio-aberto nunca termina
+            if not sucesso:
+                self._registrar(inicio, False)
+            if servico_respondeu:
+                self.disjuntor.registrar_sucesso()
+            else:
+                self.disjuntor.registrar_falha()
+
+    def estatisticas(self) -> Dict[str, object]:
+        with self._lock:
+            latencias = np.array(self._latencias_ms, dtype=np.float64)
+            dados = {
+                "chamadas": self.chamadas,
+                "sucessos": self.sucessos,
+                "falhas": self.falhas,
+                "recusadas_circuito": self.recusadas,
+                "novas_tentativas": self.novas_tentativas,
+            }
+        dados["circuito"] = {
+            "estado": self.disjuntor.estado,
+            "falhas_seguidas": self.disjuntor.falhas_seguidas,
+            "aberturas": self.disjuntor.aberturas,
+        }
+        if latencias.size:
+            p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+            dados["latencia_ms"] = {
+                "p50": round(float(p50), 2),
+                "p95": round(float(p95), 2),
+                "p99": round(float(p99), 2),
+                "max": round(float(latencias.max()), 2),
+                "amostras": int(latencias.size),
+            }
+        return dados
+
+
+def criar_cliente_ia() -> ClienteIA:
+    ia_host = os.getenv("IA_HOST", "ia")  # usar nome do serviço no docker compose
+    return ClienteIA(
+        os.getenv("IA_URL", f"http://{ia_host}:6000/classificar-exon29"),
+        timeout_conexao=float(os.getenv("IA_TIMEOUT_CONEXAO", 2)),
+        timeout_leitura=float(os.getenv("IA_TIMEOUT_LEITURA", 10)),
+        tentativas=int(os.getenv("IA_TENTATIVAS", 3)),
+        limite_falhas=int(os.getenv("IA_DISJUNTOR_FALHAS", 5)),
+        tempo_aberto=float(os.getenv("IA_DISJUNTOR_SEGUNDOS", 30)),
+        tamanho_pool=int(os.getenv("IA_POOL", 10)),
+    )
@@ -0,0 +1,45 @@
+"""Converte um FASTA de referência para o formato compacto ``.catref``.
+
+Uso (a partir de back-end-fasta/):
+
+    python ferramentas/converter_referencia.py ref/ref.fasta [ref/ref.catref] [--k 15]
+
+e, no serviço:
+
+    REF_PATH=ref/ref.catref python app.py
+
+O arquivo é gravado ao lado e renomeado no fim, então pode ser regerado com
+o serviço no ar (os processos que já o mapearam continuam com a versão antiga
+até o registro de referências perceber a mudança).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kmers import ESCALA_ESBOCO_PADRAO, K_PADRAO  # noqa: E402
+from referencia_compacta import EXTENSAO, converter_fasta  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fasta")
+    parser.add_argument("saida", nargs="?", help=f"Padrão: o FASTA com extensão {EXTENSAO}")
+    parser.add_argument("--k", type=int, default=K_PADRAO)
+    parser.add_argument("--escala", type=int, default=ESCALA_ESBOCO_PADRAO)
+    args = parser.parse_args()
+
+    saida = args.saida or os.path.splitext(args.fasta)[0] + EXTENSAO
+    inicio = time.perf_counter()
+    cabecalho = converter_fasta(args.fasta, saida, k=args.k, escala=args.escala)
+    print(
+        f"{saida}: {cabecalho['tamanho_nt']} nt, {os.path.getsize(saida)} bytes, "
+        f"{'sem perdas' if cabecalho['sem_perdas'] else 'bases fora de ACGTN viraram N'} "
+        f"({time.perf_counter() - inicio:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
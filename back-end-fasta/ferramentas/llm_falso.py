@@ -0,0 +1,67 @@
+"""Endpoint LLM falso (formato ``generateContent`` do Gemini) para testes locais.
+
+Uso (a partir de back-end-fasta/):
+
+    python ferramentas/llm_falso.py [--porta 7000] [--atraso 2.0] [--falhar-a-cada 0]
+
+e, no serviço:
+
+    ENABLE_LLM=true LLM_URL=http://localhost:7000/generateContent python app.py
+
+Responde com um relatório fixo que inclui o início do prompt recebido, depois
+de ``--atraso`` segundos (simula a latência do LLM). ``--falhar-a-cada N``
+devolve HTTP 503 em uma de cada N chamadas. ``GET /chamadas`` informa quantas
+chamadas foram recebidas (útil para conferir a memorização dos resumos).
+"""
+import argparse
+import hashlib
+import itertools
+import threading
+import time
+
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+_contador = itertools.count(1)
+_lock = threading.Lock()
+_estado = {"chamadas": 0}
+_config = {"atraso": 2.0, "falhar_a_cada": 0}
+
+
+@app.route("/generateContent", methods=["POST"])
+@app.route("/v1beta/models/<modelo>:generateContent", methods=["POST"])
+def gerar(modelo=None):
+    with _lock:
+        numero = next(_contador)
+        _estado["chamadas"] = numero
+    time.sleep(_config["atraso"])
+    if _config["falhar_a_cada"] and numero % _config["falhar_a_cada"] == 0:
+        return jsonify({"error": "indisponível"}), 503
+
+    prompt = request.get_json(force=True)["contents"][0]["parts"][0]["text"]
+    assinatura = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+    texto = (
+        f"Relatório de teste #{numero} (prompt {assinatura}).\n\n"
+        "1) Visão Geral\n- Resumo gerado pelo LLM falso.\n\n"
+        f"Dados recebidos:\n{prompt.split('Dados:', 1)[-1].strip()[:600]}"
+    )
+    return jsonify({"candidates": [{"content": {"parts": [{"text": texto}]}}]})
+
+
+@app.route("/chamadas", methods=["GET"])
+def chamadas():
+    return jsonify(_estado)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=7000)
+    parser.add_argument("--atraso", type=float, default=2.0)
+    parser.add_argument("--falhar-a-cada", type=int, default=0)
+    args = parser.parse_args()
+    _config.update(atraso=args.atraso, falhar_a_cada=args.falhar_a_cada)
+    app.run(host="0.0.0.0", port=args.porta, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Detecção da fita de amostras enviadas como reverso-complementar.
+
+Cada k-mer da amostra e do seu reverso-complementar vota na fita em que
+aparece no índice da referência. A contagem é uma busca no índice por k-mer
+(custo linear no tamanho da amostra, em lotes para limitar a memória), então
+a orientação nunca exige dois alinhamentos completos.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+from kmers import BASE_INVALIDA, MAX_OCORRENCIAS_PADRAO, IndiceKmers, codificar_sequencia, codigos_kmers
+
+FITA_DIRETA = "direta"
+FITA_REVERSA = "reversa"
+
+# Bases codificadas por vez na votação
+LOTE_VOTACAO_NT = 1 << 20
+
+_COMPLEMENTO = str.maketrans("ACGTRYKMBDHVNacgtrykmbdhvn", "TGCAYRMKVHDBNtgcayrmkvhdbn")
+
+
+def reverso_complementar(sequencia: str) -> str:
+    return sequencia.translate(_COMPLEMENTO)[::-1]
+
+
+def _acertos(indice: IndiceKmers, codigos: np.ndarray, max_ocorrencias: int) -> int:
+    if codigos.size == 0:
+        return 0
+    contagens = (
+        np.searchsorted(indice.codigos, codigos, side="right")
+        - np.searchsorted(indice.codigos, codigos, side="left")
+    )
+    return int(np.count_nonzero((contagens > 0) & (contagens <= max_ocorrencias)))
+
+
+def votar_fita(
+    indice: IndiceKmers,
+    sequencia: str,
+    max_ocorrencias: int = MAX_OCORRENCIAS_PADRAO,
+) -> Dict[str, int]:
+    """K-mers da amostra (``direta``) e do reverso-complementar (``reversa``) presentes na referência."""
+    k = indice.k
+    votos = {FITA_DIRETA: 0, FITA_REVERSA: 0}
+    for inicio in range(0, max(1, len(sequencia) - k + 1), LOTE_VOTACAO_NT):
+        codificada = codificar_sequencia(sequencia[inicio:inicio + LOTE_VOTACAO_NT + k - 1])
+        # Complemento em 2 bits é 3 - código; N continua inválido
+        complementar = np.where(codificada == BASE_INVALIDA, BASE_INVALIDA, 3 - codificada)[::-1]
+        votos[FITA_DIRETA] += _acertos(indice, codigos_kmers(codificada, k)[0], max_ocorrencias)
+        votos[FITA_REVERSA] += _acertos(indice, codigos_kmers(complementar, k)[0], max_ocorrencias)
+    return votos
+
+
+def orientar(indice: IndiceKmers, sequencia: str) -> Tuple[str, Dict[str, object]]:
+    """Devolve a amostra na fita da referência e ``{"fita", "votos"}``.
+
+    Só inverte quando o reverso-complementar tem mais votos; empate (inclusive
+    sem nenhum k-mer em comum) mantém a fita enviada.
+    """
+    votos = votar_fita(indice, sequencia)
+    if votos[FITA_REVERSA] > votos[FITA_DIRETA]:
+        return reverso_complementar(sequencia), {"fita": FITA_REVERSA, "votos": votos}
+    return sequencia, {"fita": FITA_DIRETA, "votos": votos}
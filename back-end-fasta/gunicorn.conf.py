@@ -0,0 +1,29 @@
+"""Configuração do gunicorn para o back-end-fasta.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Variáveis de ambiente: ``GUNICORN_WORKERS`` (processos, padrão: número de
+CPUs), ``GUNICORN_THREADS`` (threads por processo, padrão 4),
+``GUNICORN_TIMEOUT`` (segundos, padrão 600: o alinhamento completo de uma
+amostra grande leva minutos) e ``PORT`` (padrão 5000).
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = max(1, int(os.getenv("GUNICORN_WORKERS", os.cpu_count() or 1)))
+threads = max(1, int(os.getenv("GUNICORN_THREADS", 4)))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 600))
+graceful_timeout = 30
+keepalive = 5
+
+# Carrega a aplicação (referência, índice, aligners) no mestre antes do fork
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+# Com vários workers, /dados-analise e /jobs/<id> precisam enxergar análises e
+# jobs de qualquer um deles (o registro de jobs segue ANALISES_BACKEND)
+if workers > 1:
+    os.environ.setdefault("ANALISES_BACKEND", "sqlite")
@@ -0,0 +1,251 @@
+"""Fila de jobs assíncronos com pool limitado de workers.
+
+O ``POST`` registra o job e devolve o ID na hora; um ``ThreadPoolExecutor``
+com ``JOBS_WORKERS`` threads executa os jobs e cada um publica estado,
+fração de progresso e mensagem da etapa, consultáveis por ``GET /jobs/<id>``.
+Quando há ``JOBS_FILA_MAX`` jobs aguardando ou em execução a submissão é
+recusada (``FilaCheia``, respondida com 429 pela API).
+
+O job roda no processo que o recebeu, mas com vários workers do gunicorn o
+``GET`` pode cair em outro. Com ``ANALISES_BACKEND=sqlite`` (o padrão do
+``gunicorn.conf.py`` com mais de um worker) o resumo de cada job é publicado
+em ``JOBS_SQLITE_PATH`` a cada mudança de estado ou de etapa, e qualquer
+worker responde a consulta.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Callable, Dict, Optional
+
+from serializacao import codificar
+
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+# Progresso: (fração entre 0 e 1, mensagem da etapa)
+Progresso = Callable[[float, Optional[str]], None]
+
+
+class FilaCheia(Exception):
+    """A fila atingiu o limite de jobs pendentes."""
+
+
+class Job:
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.estado = NA_FILA
+        self.progresso = 0.0
+        self.etapa = "Aguardando na fila"
+        self.resultado = None
+        self.status_http = None
+        self.erro: Optional[str] = None
+        self.criado_em = time.time()
+        self.iniciado_em: Optional[float] = None
+        self.concluido_em: Optional[float] = None
+
+    @property
+    def finalizado(self) -> bool:
+        return self.estado in (CONCLUIDO, ERRO)
+
+    def atualizar(self, progresso: float, etapa: Optional[str] = None) -> None:
+        self.progresso = max(self.progresso, min(1.0, float(progresso)))
+        if etapa:
+            self.etapa = etapa
+
+    def resumo(self) -> Dict[str, object]:
+        dados = {
+            "job_id": self.id,
+            "estado": self.estado,
+            "progresso": round(self.progresso, 4),
+            "etapa": self.etapa,
+            "criado_em": self.criado_em,
+            "iniciado_em": self.iniciado_em,
+            "concluido_em": self.concluido_em,
+        }
+        if self.estado == CONCLUIDO:
+            dados["status_http"] = self.status_http
+            dados["resultado"] = self.resultado
+        elif self.estado == ERRO:
+            dados["erro"] = self.erro
+        return dados
+
+
+class RegistroJobsSQLite:
+    """Resumo JSON dos jobs em um arquivo compartilhado pelos workers."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, dados TEXT NOT NULL, concluido_em REAL)"
+            )
+
+    def _conectar(self) -> sqlite3.Connection:
+        # ``with conexao`` só faz commit/rollback; quem chama fecha com ``closing``
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def publicar(self, job: Job) -> None:
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute(
+                "INSERT INTO jobs (id, dados, concluido_em) VALUES (?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET dados = excluded.dados, concluido_em = excluded.concluido_em",
+                (job.id, codificar(job.resumo()).decode("utf-8"), job.concluido_em),
+            )
+
+    def obter_json(self, job_id: str) -> Optional[bytes]:
+        with closing(self._conectar()) as conexao, conexao:
+            linha = conexao.execute("SELECT dados FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return linha[0].encode("utf-8") if linha else None
+
+    def expurgar(self, concluidos_antes_de: float) -> None:
+        with closing(self._conectar()) as conexao, conexao:
+            conexao.execute("DELETE FROM jobs WHERE concluido_em < ?", (concluidos_antes_de,))
+
+
+class FilaJobs:
+    """Executa jobs em um pool de threads limitado, com contrapressão."""
+
+    def __init__(
+        self,
+        workers: int,
+        limite_fila: int,
+        ttl_segundos: float,
+        registro: Optional[RegistroJobsSQLite] = None,
+    ):
+        self.workers = max(1, workers)
+        self.limite_fila = max(1, limite_fila)
+        self.ttl_segundos = ttl_segundos
+        self.registro = registro
+        self._jobs: Dict[str, Job] = {}
+        self._pendentes = 0
+        self._recusados = 0
+        self._erros_registro = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        # Criado só no primeiro job, depois de um eventual fork do servidor
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def _expurgar(self, agora: float) -> None:
+        expirados = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finalizado and agora - job.concluido_em > self.ttl_segundos
+        ]
+        for job_id in expirados:
+            del self._jobs[job_id]
+
+    def _publicar(self, job: Job) -> None:
+        if self.registro is None:
+            return
+        try:
+            self.registro.publicar(job)
+        except (sqlite3.Error, OSError) as e:
+            # O job continua; só a consulta a partir de outros workers fica desatualizada
+            with self._lock:
+                self._erros_registro += 1
+                primeiro = self._erros_registro == 1
+            if primeiro:
+                print(f"\n⚠️ Registro de jobs indisponível ({self.registro.caminho}): {e}")
+
+    def submeter(self, tarefa: Callable[[Progresso], tuple]) -> Job:
+        """Agenda ``tarefa(progresso)``, que deve devolver ``(resultado, status_http)``."""
+        with self._lock:
+            self._expurgar(time.time())
+            if self._pendentes >= self.limite_fila:
+                self._recusados += 1
+                raise FilaCheia(f"Fila cheia ({self._pendentes} jobs pendentes)")
+            job = Job(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+            self._pendentes += 1
+            executor = self._obter_executor()
+        if self.registro is not None:
+            try:
+                self.registro.expurgar(job.criado_em - self.ttl_segundos)
+            except (sqlite3.Error, OSError):
+                pass
+        self._publicar(job)
+        executor.submit(self._executar, job, tarefa)
+        return job
+
+    def _executar(self, job: Job, tarefa: Callable[[Progresso], tuple]) -> None:
+        job.estado = EXECUTANDO
+        job.iniciado_em = time.time()
+        job.etapa = "Iniciando"
+        self._publicar(job)
+
+        def progresso(fracao: float, etapa: Optional[str] = None) -> None:
+            job.atualizar(fracao, etapa)
+            self._publicar(job)
+
+        try:
+            job.resultado, job.status_http = tarefa(progresso)
+            job.progresso = 1.0
+            job.etapa = "Concluído"
+            job.estado = CONCLUIDO
+        except Exception as e:
+            job.erro = str(e)
+            job.etapa = "Falhou"
+            job.estado = ERRO
+        finally:
+            job.concluido_em = time.time()
+            self._publicar(job)
+            with self._lock:
+                self._pendentes -= 1
+
+    def obter(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def obter_json(self, job_id: str) -> Optional[bytes]:
+        """Resumo codificado do job, inclusive dos recebidos por outro worker."""
+        job = self.obter(job_id)
+        if job is not None:
+            return codificar(job.resumo())
+        if self.registro is None:
+            return None
+        try:
+            return self.registro.obter_json(job_id)
+        except (sqlite3.Error, OSError):
+            return None
+
+    def estatisticas(self) -> Dict[str, object]:
+        with self._lock:
+            estados: Dict[str, int] = {}
+            for job in self._jobs.values():
+                estados[job.estado] = estados.get(job.estado, 0) + 1
+            return {
+                "workers": self.workers,
+                "limite_fila": self.limite_fila,
+                "pendentes": self._pendentes,
+                "recusados": self._recusados,
+                "por_estado": estados,
+                "registro": self.registro.caminho if self.registro is not None else None,
+                "erros_registro": self._erros_registro,
+            }
+
+
+def criar_registro_jobs() -> Optional[RegistroJobsSQLite]:
+    # Segue o backend das análises: compartilhado sempre que elas são
+    if os.getenv("ANALISES_BACKEND", "memoria").lower() != "sqlite":
+        return None
+    return RegistroJobsSQLite(os.getenv("JOBS_SQLITE_PATH", "dados/jobs.sqlite3"))
+
+
+fila_jobs = FilaJobs(
+    workers=int(os.getenv("JOBS_WORKERS", 2)),
+    limite_fila=int(os.getenv("JOBS_FILA_MAX", 16)),
+    ttl_segundos=float(os.getenv("JOBS_TTL", 3600)),
+    registro=criar_registro_jobs(),
+)
@@ -0,0 +1,219 @@
+"""Índice de k-mers, sementes para alinhamentos ancorados e esboços.
+
+As sequências são codificadas em 2 bits por base (A=0, C=1, G=2, T=3) e os
+k-mers viram inteiros de 64 bits. O índice guarda os códigos ordenados junto
+das posições na referência, de modo que a busca de sementes é feita com
+``np.searchsorted`` sem nenhum laço Python por base.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+K_PADRAO = 15
+MAX_OCORRENCIAS_PADRAO = 8
+ESCALA_ESBOCO_PADRAO = 8
+BASE_INVALIDA = 4
+# Bases codificadas por vez no esboço
+LOTE_ESBOCO_NT = 1 << 20
+_LIMIAR_MAXIMO = np.iinfo(np.uint64).max
+
+_TABELA_CODIFICACAO = np.full(256, BASE_INVALIDA, dtype=np.uint8)
+for _codigo, _base in enumerate("ACGT"):
+    _TABELA_CODIFICACAO[ord(_base)] = _codigo
+    _TABELA_CODIFICACAO[ord(_base.lower())] = _codigo
+
+# Âncora: (inicio_query, inicio_ref, tamanho)
+Ancora = Tuple[int, int, int]
+
+
+def codificar_sequencia(seq: str) -> np.ndarray:
+    """Converte a sequência em códigos uint8 (bases fora de ACGT viram 4)."""
+    dados = np.frombuffer(seq.encode("ascii", errors="replace"), dtype=np.uint8)
+    return _TABELA_CODIFICACAO[dados]
+
+
+def codigos_kmers(codificada: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Calcula os códigos de todos os k-mers válidos (sem N) da sequência.
+
+    Retorna ``(codigos, posicoes)``, onde ``posicoes`` é o início de cada
+    k-mer na sequência original.
+    """
+    if k < 1 or k > 31:
+        raise ValueError("k deve estar entre 1 e 31")
+    total = len(codificada) - k + 1
+    if total <= 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+
+    invalidas = np.concatenate(([0], np.cumsum(codificada == BASE_INVALIDA)))
+    validos = (invalidas[k:] - invalidas[:-k]) == 0
+
+    bases = np.where(codificada == BASE_INVALIDA, 0, codificada).astype(np.uint64)
+    codigos = np.zeros(total, dtype=np.uint64)
+    for deslocamento in range(k):
+        codigos = (codigos << np.uint64(2)) | bases[deslocamento:deslocamento + total]
+
+    posicoes = np.nonzero(validos)[0]
+    return codigos[posicoes], posicoes.astype(np.int64)
+
+
+class IndiceKmers:
+    """Índice ordenado de k-mers de uma sequência de referência."""
+
+    def __init__(self, codigos: np.ndarray, posicoes: np.ndarray, k: int, tamanho_referencia: int):
+        self.codigos = codigos
+        self.posicoes = posicoes
+        self.k = k
+        self.tamanho_referencia = tamanho_referencia
+
+    @classmethod
+    def construir(cls, referencia: str, k: int = K_PADRAO) -> "IndiceKmers":
+        codigos, posicoes = codigos_kmers(codificar_sequencia(referencia), k)
+        ordem = np.argsort(codigos, kind="stable")
+        return cls(codigos[ordem], posicoes[ordem], k, len(referencia))
+
+    def buscar(
+        self,
+        codigos_query: np.ndarray,
+        posicoes_query: np.ndarray,
+        max_ocorrencias: int = MAX_OCORRENCIAS_PADRAO,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Retorna os pares ``(posicao_query, posicao_ref)`` de k-mers em comum.
+
+        K-mers com mais de ``max_ocorrencias`` cópias na referência são
+        ignorados, pois em regiões repetitivas só geram sementes ambíguas.
+        """
+        inicio = np.searchsorted(self.codigos, codigos_query, side="left")
+        fim = np.searchsorted(self.codigos, codigos_query, side="right")
+        contagens = fim - inicio
+        uteis = (contagens > 0) & (contagens <= max_ocorrencias)
+        inicio, contagens = inicio[uteis], contagens[uteis]
+        query_uteis = posicoes_query[uteis]
+
+        total = int(contagens.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        deslocamentos = np.arange(total) - np.repeat(np.cumsum(contagens) - contagens, contagens)
+        indices_ref = np.repeat(inicio, contagens) + deslocamentos
+        # Posições podem vir como uint32 de uma referência compacta
+        return np.repeat(query_uteis, contagens), self.posicoes[indices_ref].astype(np.int64, copy=False)
+
+
+def buscar_ancoras(
+    indice: IndiceKmers,
+    sequencia: str,
+    max_ocorrencias: int = MAX_OCORRENCIAS_PADRAO,
+) -> List[Ancora]:
+    """Localiza sementes exatas e as funde em âncoras maximais por diagonal."""
+    codigos, posicoes = codigos_kmers(codificar_sequencia(sequencia), indice.k)
+    pos_query, pos_ref = indice.buscar(codigos, posicoes, max_ocorrencias)
+    if len(pos_query) == 0:
+        return []
+
+    diagonais = pos_ref - pos_query
+    ordem = np.lexsort((pos_query, diagonais))
+    pos_query, diagonais = pos_query[ordem], diagonais[ordem]
+
+    quebras = np.ones(len(pos_query), dtype=bool)
+    quebras[1:] = (diagonais[1:] != diagonais[:-1]) | (pos_query[1:] != pos_query[:-1] + 1)
+    inicios = np.nonzero(quebras)[0]
+    fins = np.append(inicios[1:], len(pos_query)) - 1
+
+    ancoras = [
+        (int(pos_query[i]), int(pos_query[i] + diagonais[i]), int(pos_query[f] - pos_query[i]) + indice.k)
+        for i, f in zip(inicios, fins)
+    ]
+    ancoras.sort()
+    return ancoras
+
+
+def encadear_ancoras(
+    ancoras: List[Ancora],
+    distancia_maxima: int = 5000,
+    predecessores_max: int = 50,
+) -> List[Ancora]:
+    """Escolhe a cadeia colinear de âncoras com maior pontuação.
+
+    Programação dinâmica ao estilo minimap2: cada âncora soma seu tamanho e
+    paga pela diferença entre os saltos na query e na referência. Âncoras que
+    se sobrepõem ao predecessor são aparadas no início.
+    """
+    if not ancoras:
+        return []
+
+    n = len(ancoras)
+    pontuacoes = [float(a[2]) for a in ancoras]
+    anteriores = [-1] * n
+    aparos = [0] * n
+
+    for i in range(n):
+        q_i, r_i, tam_i = ancoras[i]
+        for j in range(max(0, i - predecessores_max), i):
+            q_j, r_j, tam_j = ancoras[j]
+            fim_q_j, fim_r_j = q_j + tam_j, r_j + tam_j
+            if fim_q_j > q_i + tam_i or fim_r_j > r_i + tam_i or q_j >= q_i or r_j >= r_i:
+                continue
+            aparo = max(0, fim_q_j - q_i, fim_r_j - r_i)
+            if aparo >= tam_i:
+                continue
+            salto_q = q_i + aparo - fim_q_j
+            salto_r = r_i + aparo - fim_r_j
+            if max(salto_q, salto_r) > distancia_maxima:
+                continue
+            diferenca = abs(salto_q - salto_r)
+            custo = diferenca + (0.5 * math.log2(diferenca + 1) if diferenca else 0.0)
+            candidato = pontuacoes[j] + (tam_i - aparo) - custo
+            if candidato > pontuacoes[i]:
+                pontuacoes[i] = candidato
+                anteriores[i] = j
+                aparos[i] = aparo
+
+    atual: Optional[int] = max(range(n), key=lambda idx: pontuacoes[idx])
+    cadeia: List[Ancora] = []
+    while atual is not None and atual >= 0:
+        q, r, tam = ancoras[atual]
+        aparo = aparos[atual]
+        cadeia.append((q + aparo, r + aparo, tam - aparo))
+        atual = anteriores[atual]
+    cadeia.reverse()
+    return cadeia
+
+
+def _misturar(codigos: np.ndarray) -> np.ndarray:
+    """Hash splitmix64 vetorizado (espalha os códigos de k-mer em 64 bits)."""
+    with np.errstate(over="ignore"):
+        x = codigos + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def esboco_kmers(sequencia: str, k: int = K_PADRAO, escala: int = ESCALA_ESBOCO_PADRAO) -> np.ndarray:
+    """Esboço FracMinHash: hashes únicos dos k-mers abaixo de ``max / escala``.
+
+    Mantém ~1/``escala`` dos k-mers distintos e, ao contrário do MinHash de
+    tamanho fixo, permite estimar contenção entre sequências de tamanhos muito
+    diferentes (fragmento x gene completo x contig). A sequência é codificada
+    em lotes de ``LOTE_ESBOCO_NT`` bases (com ``k - 1`` de sobreposição), então
+    a memória fica limitada ao lote mais o próprio esboço.
+    """
+    limiar = np.uint64(_LIMIAR_MAXIMO // np.uint64(escala))
+    esboco = np.empty(0, dtype=np.uint64)
+    for inicio in range(0, max(1, len(sequencia) - k + 1), LOTE_ESBOCO_NT):
+        codigos, _ = codigos_kmers(codificar_sequencia(sequencia[inicio:inicio + LOTE_ESBOCO_NT + k - 1]), k)
+        hashes = _misturar(codigos)
+        esboco = np.union1d(esboco, hashes[hashes <= limiar])
+    return esboco
+
+
+def comparar_esbocos(esboco_referencia: np.ndarray, esboco: np.ndarray) -> Dict[str, float]:
+    """Estimativas de similaridade entre dois esboços da mesma escala."""
+    compartilhados = int(np.intersect1d(esboco_referencia, esboco, assume_unique=True).size)
+    uniao = esboco_referencia.size + esboco.size - compartilhados
+    return {
+        "compartilhados": compartilhados,
+        "contencao_referencia": compartilhados / esboco_referencia.size if esboco_referencia.size else 0.0,
+        "contencao_registro": compartilhados / esboco.size if esboco.size else 0.0,
+        "jaccard": compartilhados / uniao if uniao else 0.0,
+    }
@@ -0,0 +1,62 @@
+"""Leitura incremental de FASTA (texto puro, gzip ou BGZF).
+
+O upload é consumido como fluxo: os bytes são descomprimidos sob demanda e
+os registros são entregues um a um pelo ``SeqIO.parse``, sem montar o
+arquivo inteiro em memória nem a lista de todos os registros.
+"""
+import gzip
+import io
+from typing import IO, Iterable, Iterator, Union
+
+from Bio import SeqIO
+from Bio.SeqRecord import SeqRecord
+
+ASSINATURA_GZIP = b"\x1f\x8b"
+
+
+class _FluxoComPrefixo(io.RawIOBase):
+    """Devolve ``prefixo`` e depois o restante de ``fluxo``.
+
+    Permite inspecionar os primeiros bytes (assinatura gzip) de fluxos que
+    não suportam ``seek``/``peek``, como o corpo de uma requisição.
+    """
+
+    def __init__(self, prefixo: bytes, fluxo: IO[bytes]):
+        self._prefixo = prefixo
+        self._fluxo = fluxo
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefixo:
+            n = min(len(buffer), len(self._prefixo))
+            buffer[:n] = self._prefixo[:n]
+            self._prefixo = self._prefixo[n:]
+            return n
+        dados = self._fluxo.read(len(buffer))
+        if not dados:
+            return 0
+        buffer[:len(dados)] = dados
+        return len(dados)
+
+
+def abrir_fluxo_fasta(fluxo: IO[bytes]) -> IO[str]:
+    """Abre um fluxo binário como texto, descomprimindo gzip/BGZF se preciso.
+
+    BGZF é uma sequência de membros gzip, que o ``GzipFile`` já lê em ordem.
+    """
+    prefixo = fluxo.read(len(ASSINATURA_GZIP))
+    bruto = io.BufferedReader(_FluxoComPrefixo(prefixo, fluxo))
+    if prefixo == ASSINATURA_GZIP:
+        bruto = gzip.GzipFile(fileobj=bruto, mode="rb")
+    return io.TextIOWrapper(bruto, encoding="utf-8", errors="replace")
+
+
+def iterar_registros(conteudo: Union[IO[bytes], Iterable[str]]) -> Iterator[SeqRecord]:
+    """Itera os registros FASTA de um fluxo binário ou de uma lista de linhas."""
+    if hasattr(conteudo, "read"):
+        handle = abrir_fluxo_fasta(conteudo)
+    else:
+        handle = io.StringIO("\n".join(conteudo))
+    yield from SeqIO.parse(handle, "fasta")
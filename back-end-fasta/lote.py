@@ -0,0 +1,110 @@
+"""Processamento de lotes de amostras em um pool de processos.
+
+Cada amostra passa por ``buscar_gene_pkd1`` + ``realizar_alinhamento_grande``
+em um processo do ``ProcessPoolExecutor``. Os workers pré-carregam a
+referência (e a tabela de regiões) no inicializador, de modo que nenhuma
+amostra paga pelo carregamento.
+"""
+import io
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Sequence, Tuple, Union
+
+from cache_resultados import cache_resultados, chave_analise
+from metricas import Cronometro, consultas_cache, identificacoes, registrar_etapas
+from pool_processos import PoolProcessos
+from referencia import REF_PADRAO, obter_referencia
+from regioes import REGIOES_PADRAO, obter_tabela_regioes
+from services import REGIAO_EXON29, buscar_gene_pkd1, realizar_alinhamento_grande
+
+# (nome da amostra, bytes do arquivo ou linhas FASTA)
+Amostra = Tuple[str, Union[bytes, List[str]]]
+
+
+def numero_workers() -> int:
+    return max(1, int(os.getenv("FASTA_WORKERS", os.cpu_count() or 1)))
+
+
+def _inicializar_worker(ref_path: str, regioes_path: str) -> None:
+    obter_referencia(ref_path)
+    obter_tabela_regioes(regioes_path, padrao=REGIAO_EXON29)
+
+
+pool = PoolProcessos(numero_workers, _inicializar_worker, (REF_PADRAO, REGIOES_PADRAO))
+
+
+def analisar_amostra(nome: str, conteudo: Union[bytes, List[str]], opcoes: Dict[str, object]) -> Dict[str, object]:
+    """Identificação + alinhamento de uma amostra (executado no worker)."""
+    inicio = time.perf_counter()
+    cronometro = Cronometro()
+    fonte = io.BytesIO(conteudo) if isinstance(conteudo, bytes) else conteudo
+    gene_info = buscar_gene_pkd1(fonte, cronometro=cronometro)
+    if "error" not in gene_info:
+        with cronometro.etapa("cache"):
+            chave = chave_analise(gene_info["sequencia"], opcoes)
+            em_cache, camada = cache_resultados.obter(chave)
+        gene_info["metadados"]["cache"] = {"acerto": em_cache is not None, "camada": camada, "chave": chave}
+        if em_cache is not None:
+            alinhamento_result = em_cache["alinhamento_result"]
+        else:
+            alinhamento_result = realizar_alinhamento_grande(
+                gene_info["sequencia"], cronometro=cronometro, paralelo=False, **opcoes
+            )
+            if "error" not in alinhamento_result:
+                cache_resultados.gravar(chave, {"alinhamento_result": alinhamento_result})
+        if "error" in alinhamento_result:
+            gene_info = {"cabecalho": gene_info.get("cabecalho"), **alinhamento_result}
+        else:
+            gene_info["alinhamento_result"] = alinhamento_result
+    return {
+        "nome": nome,
+        "pid": os.getpid(),
+        "tempo_ms": round((time.perf_counter() - inicio) * 1000, 2),
+        "timings_ms": cronometro.resumo(),
+        **gene_info,
+    }
+
+
+def _registrar_metricas(resultado: Dict[str, object]) -> None:
+    # As métricas dos processos do pool não chegam ao /metrics; registra aqui, no processo do servidor
+    metadados = resultado.get("metadados") or {}
+    identificacoes.inc(metodo=metadados.get("metodo_identificacao", "erro"))
+    if "cache" in metadados:
+        consultas_cache.inc(resultado=metadados["cache"]["camada"] or "falta")
+    registrar_etapas(resultado.get("timings_ms", {}))
+
+
+def processar_lote(amostras: Sequence[Amostra], opcoes: Dict[str, object]) -> Dict[str, object]:
+    """Distribui as amostras no pool e devolve os resultados na ordem de entrada."""
+    inicio = time.perf_counter()
+    futuros = [pool.submeter(analisar_amostra, nome, conteudo, opcoes) for nome, conteudo in amostras]
+
+    resultados = []
+    for (nome, _), (futuro, executor) in zip(amostras, futuros):
+        try:
+            resultados.append(futuro.result())
+            _registrar_metricas(resultados[-1])
+        except BrokenProcessPool as e:
+            # Um worker morreu (ex.: OOM): as amostras que estavam no pool falham e o próximo lote usa outro pool
+            pool.descartar(executor)
+            resultados.append({"nome": nome, "error": f"Falha no worker (processo encerrado): {e}"})
+        except Exception as e:
+            resultados.append({"nome": nome, "error": f"Falha no worker: {e}"})
+
+    tempo_total = (time.perf_counter() - inicio) * 1000
+    tempos = [r["tempo_ms"] for r in resultados if "tempo_ms" in r]
+    falhas = sum(1 for r in resultados if "error" in r)
+    return {
+        "amostras": resultados,
+        "resumo": {
+            "total_amostras": len(resultados),
+            "sucesso": len(resultados) - falhas,
+            "falhas": falhas,
+            "workers": pool.workers,
+            "tempo_total_ms": round(tempo_total, 2),
+            "tempo_cpu_amostras_ms": round(sum(tempos), 2),
+            "tempo_medio_amostra_ms": round(sum(tempos) / len(tempos), 2) if tempos else 0.0,
+            "amostras_por_segundo": round(len(resultados) / (tempo_total / 1000), 3) if tempo_total > 0 else 0.0,
+        },
+    }
@@ -0,0 +1,144 @@
+"""Perfil opcional de requisições, gravado em arquivo para análise posterior.
+
+Configurado por variáveis de ambiente lidas na importação:
+
+  - ``PERFIL``: ``cabecalho`` (só as requisições que trazem ``X-Perfil: 1``),
+    ``sempre`` (toda requisição das rotas decoradas) ou ``desligado``. Sem a
+    variável vale ``cabecalho`` no ``python app.py`` de desenvolvimento; o
+    ``wsgi.py`` do gunicorn (produção) fixa ``desligado`` antes de importar o
+    app, então lá o cabeçalho só tem efeito com ``PERFIL=cabecalho`` explícito;
+  - ``PERFIL_FORMATO``: ``prof`` (cProfile determinístico, abre no snakeviz
+    ou ``python -m pstats``) ou ``folded`` (amostragem das pilhas em formato
+    colapsado, para flamegraph.pl/speedscope);
+  - ``PERFIL_DIR`` / ``PERFIL_MAX_ARQUIVOS``: diretório e quantos arquivos
+    manter (os mais antigos são apagados);
+  - ``PERFIL_INTERVALO_MS``: intervalo da amostragem no formato ``folded``.
+
+Com ``desligado``, ``perfilar_rota`` devolve a própria view sem envolvê-la
+(custo zero, e ``X-Perfil`` é ignorado).
+
+Este arquivo existe igual em ``back-end-fasta/`` e ``ia/``: cada serviço é
+uma imagem Docker com contexto de build próprio e não enxerga o outro
+diretório. Alterações devem ser feitas nas duas cópias.
+"""
+import cProfile
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable
+
+from flask import make_response, request
+
+MODOS_PERFIL = ("desligado", "sempre", "cabecalho")
+FORMATOS_PERFIL = ("prof", "folded")
+CABECALHO_PERFIL = "X-Perfil"
+CABECALHO_ARQUIVO = "X-Perfil-Arquivo"
+
+MODO = os.getenv("PERFIL", "cabecalho").lower()
+FORMATO = os.getenv("PERFIL_FORMATO", "prof").lower()
+DIRETORIO = os.getenv("PERFIL_DIR", "perfis")
+MAX_ARQUIVOS = int(os.getenv("PERFIL_MAX_ARQUIVOS", 50))
+INTERVALO_MS = float(os.getenv("PERFIL_INTERVALO_MS", 5))
+
+if MODO not in MODOS_PERFIL:
+    raise ValueError(f"PERFIL inválido: {MODO}. Use um de: {', '.join(MODOS_PERFIL)}")
+if FORMATO not in FORMATOS_PERFIL:
+    raise ValueError(f"PERFIL_FORMATO inválido: {FORMATO}. Use um de: {', '.join(FORMATOS_PERFIL)}")
+
+_lock_diretorio = threading.Lock()
+
+
+class AmostradorPilhas:
+    """Amostra a pilha de uma thread a cada ``intervalo`` segundos (numa thread à parte)."""
+
+    def __init__(self, thread_id: int, intervalo: float):
+        self.thread_id = thread_id
+        self.intervalo = intervalo
+        self.pilhas: Counter = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="amostrador-perfil", daemon=True)
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            frame = sys._current_frames().get(self.thread_id)
+            pilha = []
+            while frame is not None:
+                codigo = frame.f_code
+                pilha.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                frame = frame.f_back
+            if pilha:
+                self.pilhas[";".join(reversed(pilha))] += 1
+
+    def __enter__(self) -> "AmostradorPilhas":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._parar.set()
+        self._thread.join()
+
+    def gravar(self, caminho: str) -> None:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for pilha, contagem in self.pilhas.most_common():
+                arquivo.write(f"{pilha} {contagem}\n")
+
+
+def _podar_diretorio() -> None:
+    arquivos = [os.path.join(DIRETORIO, nome) for nome in os.listdir(DIRETORIO)]
+    arquivos = sorted((c for c in arquivos if os.path.isfile(c)), key=os.path.getmtime)
+    for antigo in arquivos[:max(0, len(arquivos) - MAX_ARQUIVOS)]:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass
+
+
+def _novo_caminho(nome_rota: str) -> str:
+    carimbo = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(DIRETORIO, f"{carimbo}_{nome_rota}_{uuid.uuid4().hex[:8]}.{FORMATO}")
+
+
+def _deve_perfilar() -> bool:
+    if MODO == "sempre":
+        return True
+    return request.headers.get(CABECALHO_PERFIL, "").lower() in ("1", "true", "sim")
+
+
+def perfilar_rota(nome_rota: str) -> Callable[[Callable], Callable]:
+    """Decorador de view: grava o perfil da requisição e informa o arquivo em ``X-Perfil-Arquivo``."""
+
+    def decorador(view: Callable) -> Callable:
+        if MODO == "desligado":
+            return view
+
+        @functools.wraps(view)
+        def perfilada(*args, **kwargs):
+            if not _deve_perfilar():
+                return view(*args, **kwargs)
+
+            caminho = _novo_caminho(nome_rota)
+            if FORMATO == "prof":
+                perfil = cProfile.Profile()
+                resultado = perfil.runcall(view, *args, **kwargs)
+                gravar = perfil.dump_stats
+            else:
+                with AmostradorPilhas(threading.get_ident(), INTERVALO_MS / 1000) as amostrador:
+                    resultado = view(*args, **kwargs)
+                gravar = amostrador.gravar
+
+            with _lock_diretorio:
+                os.makedirs(DIRETORIO, exist_ok=True)
+                gravar(caminho)
+                _podar_diretorio()
+
+            resposta = make_response(resultado)
+            resposta.headers[CABECALHO_ARQUIVO] = os.path.basename(caminho)
+            return resposta
+
+        return perfilada
+
+    return decorador
@@ -0,0 +1,65 @@
+"""Pool de processos por módulo, criado sob demanda e recriado quando quebra.
+
+Se um worker morre (por exemplo, morto pelo kernel por falta de memória numa
+montagem grande), o ``ProcessPoolExecutor`` fica quebrado para sempre: todo
+``submit`` seguinte levanta ``BrokenProcessPool``. ``PoolProcessos`` descarta o
+pool quebrado e cria outro na próxima submissão, de modo que só as tarefas
+que estavam no pool naquele momento falham.
+"""
+import atexit
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Sequence, Tuple
+
+
+class PoolProcessos:
+    def __init__(self, numero_workers: Callable[[], int], inicializador: Callable[..., None], args_inicializador: Sequence):
+        self._numero_workers = numero_workers
+        self._inicializador = inicializador
+        self._args_inicializador = tuple(args_inicializador)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.workers = 0
+        self.recriacoes = 0
+        atexit.register(self.encerrar)
+
+    def obter(self) -> ProcessPoolExecutor:
+        """Cria o pool sob demanda (depois de um eventual fork do servidor)."""
+        with self._lock:
+            if self._executor is None:
+                self.workers = max(1, self._numero_workers())
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=self._inicializador,
+                    initargs=self._args_inicializador,
+                )
+            return self._executor
+
+    def descartar(self, quebrado: ProcessPoolExecutor) -> None:
+        """Encerra ``quebrado``; o próximo ``obter`` cria um pool novo."""
+        with self._lock:
+            if self._executor is quebrado:
+                self._executor = None
+                self.recriacoes += 1
+        quebrado.shutdown(wait=False, cancel_futures=True)
+
+    def submeter(self, funcao: Callable, *args) -> Tuple[Future, ProcessPoolExecutor]:
+        """``submit`` que recria o pool uma vez se ele já estiver quebrado.
+
+        Retorna também o executor usado: se o futuro falhar com
+        ``BrokenProcessPool``, é ele que deve ir para ``descartar``.
+        """
+        executor = self.obter()
+        try:
+            return executor.submit(funcao, *args), executor
+        except BrokenProcessPool:
+            self.descartar(executor)
+            executor = self.obter()
+            return executor.submit(funcao, *args), executor
+
+    def encerrar(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,210 @@
+"""Registro de referências carregadas uma única vez por processo.
+
+Ler ``ref/ref.fasta`` com ``SeqIO``, montar os ``PairwiseAligner`` e carregar
+a matriz NUC.4.4 a cada requisição custava mais que boa parte das análises
+curtas. O registro guarda, por caminho de arquivo, a sequência já
+normalizada e todos os artefatos derivados dela; a entrada só é refeita quando
+o arquivo muda (mtime/tamanho diferentes e hash SHA-256 diferente).
+
+O caminho também pode apontar para uma referência compacta (``.catref``, ver
+``referencia_compacta``): nesse caso índice, esboço e bases vêm do ``mmap``
+e só eles são compartilhados pelo cache de páginas. ``trecho`` decodifica do
+``mmap`` apenas a janela pedida (é o que os ladrilhos do alinhamento paralelo
+usam). Limitação: o alinhamento completo serial, o ancorado, a identificação
+e as regiões trabalham sobre a referência inteira em texto, então o primeiro
+uso de ``sequencia``/``bytes`` decodifica tudo em memória privada do
+processo. Para o PKD1 (~44 kb) isso é irrelevante; para referências do
+tamanho de um cromossomo esses modos ainda não servem.
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from functools import cached_property
+from typing import Dict, Optional
+
+import numpy as np
+from Bio import SeqIO
+from Bio.Align import PairwiseAligner
+from Bio.Align import substitution_matrices
+
+from kmers import ESCALA_ESBOCO_PADRAO, IndiceKmers, esboco_kmers
+from referencia_compacta import ReferenciaCompacta, e_referencia_compacta
+
+# Coordenadas aproximadas do exon29 no gene PKD1 de referência (em nucleotídeos)
+EXON29_INICIO_REF = 9950
+EXON29_FIM_REF = 10150
+
+# FASTA ou .catref usado quando o chamador não indica outro
+REF_PADRAO = os.getenv("REF_PATH", "ref/ref.fasta")
+
+
+def criar_matriz_dna():
+    """Obtém uma matriz de substituição padrão para DNA.
+
+    Observação: Evita APIs antigas/obsoletas criando a matriz via
+    substitution_matrices.load("NUC.4.4").
+    """
+    try:
+        return substitution_matrices.load("NUC.4.4")
+    except Exception:
+        # Fallback simples caso o load falhe no ambiente: usa escore match/mismatch
+        # diretamente configurado no PairwiseAligner via match/mismatch_score
+        return None
+
+
+def criar_aligner_alinhamento() -> PairwiseAligner:
+    """Aligner local (NUC.4.4) usado no alinhamento contra a referência."""
+    aligner = PairwiseAligner()
+    aligner.mode = 'local'
+    matriz = criar_matriz_dna()
+    if matriz is not None:
+        aligner.substitution_matrix = matriz
+    else:
+        # Fallback: define escores simples direto no aligner
+        aligner.match_score = 5
+        aligner.mismatch_score = -4
+    aligner.open_gap_score = -7
+    aligner.extend_gap_score = -2
+    return aligner
+
+
+def criar_aligner_identificacao() -> PairwiseAligner:
+    """Aligner local simplificado usado para escolher o registro do PKD1."""
+    aligner = PairwiseAligner()
+    aligner.mode = "local"
+    aligner.match_score = 2
+    aligner.mismatch_score = -1
+    aligner.open_gap_score = -5
+    aligner.extend_gap_score = -1
+    return aligner
+
+
+class ReferenciaPreparada:
+    """Sequência de referência e artefatos pré-calculados a partir dela."""
+
+    def __init__(self, caminho: str, conteudo: Optional[bytes], mtime_ns: int, tamanho_arquivo: int):
+        self.caminho = caminho
+        self.mtime_ns = mtime_ns
+        self.tamanho_arquivo = tamanho_arquivo
+        self.carregada_em = time.time()
+        self.aligner_alinhamento = criar_aligner_alinhamento()
+        self.aligner_identificacao = criar_aligner_identificacao()
+        self.compacta: Optional[ReferenciaCompacta] = None
+
+        if conteudo is None:
+            # Referência compacta: nada é lido além do cabeçalho
+            self.compacta = ReferenciaCompacta(caminho)
+            self.sha256 = self.compacta.sha256
+            self.descricao = self.compacta.descricao
+            self.tamanho_nt = self.compacta.tamanho_nt
+            self.indice = self.compacta.indice
+            self.esboco = self.compacta.esboco
+            self.escala_esboco = self.compacta.escala_esboco
+            return
+
+        self.sha256 = hashlib.sha256(conteudo).hexdigest()
+        registro = SeqIO.read(io.StringIO(conteudo.decode("utf-8")), "fasta")
+        self.descricao = registro.description
+        self.sequencia = str(registro.seq).upper()
+        self.tamanho_nt = len(self.sequencia)
+        self.bytes = np.frombuffer(self.sequencia.encode("ascii", errors="replace"), dtype=np.uint8)
+        self.indice = IndiceKmers.construir(self.sequencia)
+        self.escala_esboco = ESCALA_ESBOCO_PADRAO
+        self.esboco = esboco_kmers(self.sequencia, self.indice.k, self.escala_esboco)
+        self.exon29 = self.sequencia[EXON29_INICIO_REF:EXON29_FIM_REF]
+
+    def trecho(self, inicio: int, fim: int) -> str:
+        """``[inicio, fim)`` da referência; na compacta só essa janela sai do mmap."""
+        if self.compacta is None or "sequencia" in self.__dict__:
+            return self.sequencia[inicio:fim]
+        return self.compacta.trecho(inicio, fim)
+
+    # Na referência compacta os atributos abaixo são decodificados do mmap no primeiro uso
+    @cached_property
+    def sequencia(self) -> str:
+        return self.compacta.trecho()
+
+    @cached_property
+    def bytes(self) -> np.ndarray:
+        return np.frombuffer(self.sequencia.encode("ascii"), dtype=np.uint8)
+
+    @cached_property
+    def exon29(self) -> str:
+        return self.compacta.trecho(EXON29_INICIO_REF, EXON29_FIM_REF)
+
+    def resumo(self) -> Dict[str, object]:
+        return {
+            "caminho": self.caminho,
+            "descricao": self.descricao,
+            "sha256": self.sha256,
+            "tamanho_nt": self.tamanho_nt,
+            "formato": "catref" if self.compacta is not None else "fasta",
+            "carregada_em": self.carregada_em,
+        }
+
+
+class RegistroReferencias:
+    """Cache de ``ReferenciaPreparada`` por caminho, com invalidação por arquivo."""
+
+    def __init__(self):
+        self._entradas: Dict[str, ReferenciaPreparada] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.invalidacoes = 0
+
+    def obter(self, ref_path: str) -> ReferenciaPreparada:
+        caminho = os.path.abspath(ref_path)
+        info = os.stat(caminho)
+
+        with self._lock:
+            entrada = self._entradas.get(caminho)
+            if entrada is not None and (entrada.mtime_ns, entrada.tamanho_arquivo) == (info.st_mtime_ns, info.st_size):
+                self.acertos += 1
+                return entrada
+
+            if e_referencia_compacta(caminho):
+                if entrada is not None:
+                    self.invalidacoes += 1
+                self.faltas += 1
+                entrada = ReferenciaPreparada(caminho, None, info.st_mtime_ns, info.st_size)
+                self._entradas[caminho] = entrada
+                return entrada
+
+            with open(caminho, "rb") as handle:
+                conteudo = handle.read()
+            if entrada is not None and hashlib.sha256(conteudo).hexdigest() == entrada.sha256:
+                # Arquivo tocado sem mudar o conteúdo: só atualiza a assinatura
+                entrada.mtime_ns, entrada.tamanho_arquivo = info.st_mtime_ns, info.st_size
+                self.acertos += 1
+                return entrada
+
+            if entrada is not None:
+                self.invalidacoes += 1
+            self.faltas += 1
+            entrada = ReferenciaPreparada(caminho, conteudo, info.st_mtime_ns, info.st_size)
+            self._entradas[caminho] = entrada
+            return entrada
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def estatisticas(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "invalidacoes": self.invalidacoes,
+                "referencias": [e.resumo() for e in self._entradas.values()],
+            }
+
+
+registro_referencias = RegistroReferencias()
+
+
+def obter_referencia(ref_path: str, registro: Optional[RegistroReferencias] = None) -> ReferenciaPreparada:
+    """Atalho para o registro global do processo."""
+    return (registro or registro_referencias).obter(ref_path)
@@ -0,0 +1,176 @@
+"""Formato compacto da referência (``.catref``), aberto com ``mmap``.
+
+Conteúdo do arquivo, depois de um cabeçalho JSON:
+
+  - bases empacotadas em 2 bits (4 por byte, A=0 C=1 G=2 T=3);
+  - trechos de N (``[inicio, fim)``), que no empacotamento viram A;
+  - índice de k-mers já ordenado (códigos e posições) e o esboço FracMinHash.
+
+Abrir o arquivo não lê nem calcula nada: os arrays são visões do ``mmap``,
+então os workers do gunicorn e os processos do lote compartilham a mesma
+cópia no cache de páginas do sistema e a inicialização é imediata mesmo para
+referências do tamanho de um cromossomo. Bases fora de ACGTN (IUPAC) viram N.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from Bio import SeqIO
+
+from kmers import BASE_INVALIDA, ESCALA_ESBOCO_PADRAO, K_PADRAO, IndiceKmers, codificar_sequencia, esboco_kmers
+
+MAGICO = b"CATBREF1"
+EXTENSAO = ".catref"
+VERSAO_FORMATO = 1
+# Início de cada array alinhado para leitura direta como uint64
+ALINHAMENTO = 64
+
+_ASCII = np.frombuffer(b"ACGTN", dtype=np.uint8)
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + ALINHAMENTO - 1) // ALINHAMENTO * ALINHAMENTO
+
+
+def empacotar_bases(codificada: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Códigos 0-4 -> (bytes com 4 bases cada, trechos de N como array (m, 2))."""
+    invalidas = codificada == BASE_INVALIDA
+    bordas = np.diff(np.concatenate(([0], invalidas.astype(np.int8), [0])))
+    trechos_n = np.stack([np.nonzero(bordas == 1)[0], np.nonzero(bordas == -1)[0]], axis=1).astype(np.int64)
+
+    bases = np.where(invalidas, 0, codificada).astype(np.uint8)
+    bases = np.concatenate([bases, np.zeros(-len(bases) % 4, dtype=np.uint8)]).reshape(-1, 4)
+    empacotadas = (bases[:, 0] << 6) | (bases[:, 1] << 4) | (bases[:, 2] << 2) | bases[:, 3]
+    return empacotadas.astype(np.uint8), trechos_n
+
+
+def e_referencia_compacta(caminho: str) -> bool:
+    with open(caminho, "rb") as handle:
+        return handle.read(len(MAGICO)) == MAGICO
+
+
+class ReferenciaCompacta:
+    """Visões (somente leitura) dos arrays de um arquivo ``.catref``."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        with open(caminho, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGICO)] != MAGICO:
+            raise ValueError(f"{caminho} não é uma referência compacta")
+        (tamanho_cabecalho,) = struct.unpack_from("<Q", self._mmap, len(MAGICO))
+        inicio_cabecalho = len(MAGICO) + 8
+        self.cabecalho: Dict[str, object] = json.loads(self._mmap[inicio_cabecalho:inicio_cabecalho + tamanho_cabecalho])
+        if self.cabecalho["versao"] != VERSAO_FORMATO:
+            raise ValueError(f"Versão do formato não suportada: {self.cabecalho['versao']}")
+
+        inicio_dados = _alinhar(inicio_cabecalho + tamanho_cabecalho)
+        self._arrays: Dict[str, np.ndarray] = {}
+        for nome, descricao in self.cabecalho["arrays"].items():
+            tipo = np.dtype(descricao["dtype"])
+            forma = tuple(descricao["forma"])
+            quantidade = int(np.prod(forma))
+            if quantidade == 0:
+                self._arrays[nome] = np.empty(forma, dtype=tipo)
+                continue
+            self._arrays[nome] = np.frombuffer(
+                self._mmap, dtype=tipo, count=quantidade, offset=inicio_dados + descricao["offset"]
+            ).reshape(forma)
+
+        self.descricao: str = self.cabecalho["descricao"]
+        self.tamanho_nt: int = self.cabecalho["tamanho_nt"]
+        self.indice = IndiceKmers(
+            self._arrays["kmers_codigos"], self._arrays["kmers_posicoes"], self.cabecalho["k"], self.tamanho_nt
+        )
+        self.esboco: np.ndarray = self._arrays["esboco"]
+        self.escala_esboco: int = self.cabecalho["escala_esboco"]
+
+    @property
+    def sha256(self) -> str:
+        """Hash do FASTA de origem quando a conversão não perdeu nada (mesmas chaves de cache)."""
+        if self.cabecalho["sem_perdas"]:
+            return self.cabecalho["sha256_origem"]
+        return self.cabecalho["sha256_sequencia"]
+
+    def codigos(self, inicio: int = 0, fim: Optional[int] = None) -> np.ndarray:
+        """Códigos 0-4 (N=4) das bases em ``[inicio, fim)``, desempacotando só esse trecho."""
+        fim = self.tamanho_nt if fim is None else min(fim, self.tamanho_nt)
+        inicio = max(0, min(inicio, fim))
+        empacotadas = self._arrays["bases"][inicio // 4:(fim + 3) // 4]
+        bases = np.stack(
+            [(empacotadas >> 6) & 3, (empacotadas >> 4) & 3, (empacotadas >> 2) & 3, empacotadas & 3], axis=1
+        ).reshape(-1)
+        deslocamento = inicio % 4
+        bases = bases[deslocamento:deslocamento + (fim - inicio)].copy()
+
+        trechos_n = self._arrays["trechos_n"]
+        primeiro = int(np.searchsorted(trechos_n[:, 1], inicio, side="right")) if len(trechos_n) else 0
+        for n_ini, n_fim in trechos_n[primeiro:]:
+            if n_ini >= fim:
+                break
+            bases[max(n_ini, inicio) - inicio:min(n_fim, fim) - inicio] = BASE_INVALIDA
+        return bases
+
+    def trecho(self, inicio: int = 0, fim: Optional[int] = None) -> str:
+        return _ASCII[self.codigos(inicio, fim)].tobytes().decode("ascii")
+
+
+def converter_fasta(
+    caminho_fasta: str,
+    caminho_saida: str,
+    k: int = K_PADRAO,
+    escala: int = ESCALA_ESBOCO_PADRAO,
+) -> Dict[str, object]:
+    """Gera o ``.catref`` de um FASTA de registro único. Retorna o cabeçalho gravado."""
+    with open(caminho_fasta, "rb") as handle:
+        conteudo = handle.read()
+    registro = SeqIO.read(caminho_fasta, "fasta")
+    sequencia = str(registro.seq).upper()
+
+    codificada = codificar_sequencia(sequencia)
+    empacotadas, trechos_n = empacotar_bases(codificada)
+    indice = IndiceKmers.construir(sequencia, k)
+    normalizada = _ASCII[codificada].tobytes()
+
+    arrays = {
+        "bases": empacotadas,
+        "trechos_n": trechos_n,
+        "kmers_codigos": indice.codigos.astype("<u8"),
+        "kmers_posicoes": indice.posicoes.astype("<u4" if len(sequencia) < 2 ** 32 else "<i8"),
+        "esboco": esboco_kmers(sequencia, k, escala).astype("<u8"),
+    }
+    descritores = {}
+    offset = 0
+    for nome, array in arrays.items():
+        descritores[nome] = {"dtype": array.dtype.str, "forma": list(array.shape), "offset": offset}
+        offset = _alinhar(offset + array.nbytes)
+
+    cabecalho = {
+        "versao": VERSAO_FORMATO,
+        "descricao": registro.description,
+        "tamanho_nt": len(sequencia),
+        "k": k,
+        "escala_esboco": escala,
+        "sha256_origem": hashlib.sha256(conteudo).hexdigest(),
+        "sha256_sequencia": hashlib.sha256(normalizada).hexdigest(),
+        "sem_perdas": normalizada == sequencia.encode("ascii", errors="replace"),
+        "arrays": descritores,
+    }
+    dados_cabecalho = json.dumps(cabecalho, ensure_ascii=False).encode("utf-8")
+
+    # Grava ao lado e troca de uma vez: processos com o arquivo antigo mapeado não são afetados
+    temporario = f"{caminho_saida}.tmp"
+    with open(temporario, "wb") as saida:
+        saida.write(MAGICO)
+        saida.write(struct.pack("<Q", len(dados_cabecalho)))
+        saida.write(dados_cabecalho)
+        inicio_dados = _alinhar(saida.tell())
+        for nome, array in arrays.items():
+            saida.write(b"\0" * (inicio_dados + descritores[nome]["offset"] - saida.tell()))
+            saida.write(np.ascontiguousarray(array).tobytes())
+    os.replace(temporario, caminho_saida)
+    return cabecalho
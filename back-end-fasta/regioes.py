@@ -0,0 +1,215 @@
+"""Tabela de regiões anotadas (formato BED) e análise de várias regiões por alinhamento.
+
+Cada linha do BED é ``cromossomo  inicio  fim  nome`` com coordenadas
+0-based, semiabertas e relativas à sequência de referência. A tabela fica
+ordenada por início com o máximo acumulado dos fins, o que permite achar as
+regiões que se sobrepõem a um intervalo por busca binária. Com isso uma única
+varredura dos segmentos de um alinhamento produz sequência, cobertura e
+variantes de todas as regiões de uma vez.
+"""
+import bisect
+import hashlib
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from Bio.Align import Alignment
+
+REGIOES_PADRAO = "ref/regioes.bed"
+
+
+class Regiao(NamedTuple):
+    nome: str
+    inicio: int
+    fim: int
+
+
+class TabelaRegioes:
+    """Índice de intervalos sobre arrays ordenados."""
+
+    def __init__(self, regioes: List[Regiao], sha256: str = ""):
+        self.regioes = sorted(regioes, key=lambda r: (r.inicio, r.fim))
+        self.sha256 = sha256
+        self._inicios = [r.inicio for r in self.regioes]
+        self._fim_maximo: List[int] = []
+        maior = -1
+        for regiao in self.regioes:
+            maior = max(maior, regiao.fim)
+            self._fim_maximo.append(maior)
+
+        # União das regiões, para descartar de forma vetorizada o que não toca nenhuma
+        uniao: List[List[int]] = []
+        for regiao in self.regioes:
+            if uniao and regiao.inicio <= uniao[-1][1]:
+                uniao[-1][1] = max(uniao[-1][1], regiao.fim)
+            else:
+                uniao.append([regiao.inicio, regiao.fim])
+        self._uniao_inicios = np.array([u[0] for u in uniao], dtype=np.int64)
+        self._uniao_fins = np.array([u[1] for u in uniao], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.regioes)
+
+    def sobrepostas(self, inicio: int, fim: int) -> List[Regiao]:
+        """Regiões que intersectam ``[inicio, fim)``; com ``inicio == fim``, as que contêm o ponto."""
+        primeiro = bisect.bisect_right(self._fim_maximo, inicio)
+        limite = bisect.bisect_left(self._inicios, max(fim, inicio + 1))
+        return [
+            r for r in self.regioes[primeiro:limite]
+            if r.fim > inicio and r.inicio < max(fim, inicio + 1)
+        ]
+
+    def tocam(self, inicios: np.ndarray, fins: np.ndarray) -> np.ndarray:
+        """Máscara vetorizada dos intervalos que tocam alguma região."""
+        fins_efetivos = np.maximum(fins, inicios + 1)
+        idx = np.searchsorted(self._uniao_fins, inicios, side="right")
+        validos = idx < len(self._uniao_inicios)
+        idx = np.minimum(idx, len(self._uniao_inicios) - 1)
+        return validos & (self._uniao_inicios[idx] < fins_efetivos)
+
+
+def ler_bed(caminho: str) -> TabelaRegioes:
+    with open(caminho, "rb") as handle:
+        conteudo = handle.read()
+    regioes: List[Regiao] = []
+    for numero, linha in enumerate(conteudo.decode("utf-8").splitlines(), start=1):
+        linha = linha.strip()
+        if not linha or linha.startswith(("#", "track", "browser")):
+            continue
+        campos = linha.split("\t") if "\t" in linha else linha.split()
+        if len(campos) < 3:
+            raise ValueError(f"Linha {numero} do BED inválida: {linha!r}")
+        inicio, fim = int(campos[1]), int(campos[2])
+        nome = campos[3] if len(campos) > 3 else f"regiao_{inicio}_{fim}"
+        if fim <= inicio:
+            raise ValueError(f"Região {nome} com fim <= início na linha {numero}")
+        if any(r.nome == nome for r in regioes):
+            raise ValueError(f"Nome de região repetido no BED: {nome}")
+        regioes.append(Regiao(nome, inicio, fim))
+    return TabelaRegioes(regioes, hashlib.sha256(conteudo).hexdigest())
+
+
+_cache_tabelas: Dict[str, tuple] = {}
+_lock_tabelas = threading.Lock()
+
+
+def obter_tabela_regioes(caminho: str = REGIOES_PADRAO, padrao: Optional[Regiao] = None) -> TabelaRegioes:
+    """Carrega a tabela uma vez por processo, recarregando se o arquivo mudar.
+
+    ``padrao`` é incluída quando o arquivo não existe ou não tem região com
+    o mesmo nome (o laudo sempre precisa do exon29).
+    """
+    caminho = os.path.abspath(caminho)
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return TabelaRegioes([padrao] if padrao else [])
+
+    assinatura = (info.st_mtime_ns, info.st_size, padrao)
+    with _lock_tabelas:
+        em_cache = _cache_tabelas.get(caminho)
+        if em_cache and em_cache[0] == assinatura:
+            return em_cache[1]
+        tabela = ler_bed(caminho)
+        if padrao and all(r.nome != padrao.nome for r in tabela.regioes):
+            tabela = TabelaRegioes(tabela.regioes + [padrao], tabela.sha256)
+        _cache_tabelas[caminho] = (assinatura, tabela)
+        return tabela
+
+
+def _resultado_vazio() -> Dict[str, object]:
+    return {"partes": [], "variantes": [], "total_insercoes_nt": 0, "total_delecoes_nt": 0}
+
+
+def analisar_regioes(
+    alinhamento: Alignment,
+    referencia: str,
+    sequencia: str,
+    tabela: TabelaRegioes,
+    ref_bytes: Optional[np.ndarray] = None,
+) -> Dict[str, Dict[str, object]]:
+    """Percorre o alinhamento uma vez e descreve cada região da tabela.
+
+    Para cada região devolve a sequência da amostra (com "-" nas deleções),
+    a sequência de referência, a cobertura, as variantes (uma por
+    nucleotídeo, como no laudo do exon29) e o total de inserções/deleções.
+    ``ref_bytes`` é a referência em bytes já pronta (``ReferenciaPreparada.bytes``);
+    sem ela a referência é convertida a cada chamada.
+    """
+    acumulado = {regiao.nome: _resultado_vazio() for regiao in tabela.regioes}
+    coordenadas = alinhamento.coordinates
+
+    if coordenadas.shape[1] >= 2 and len(tabela):
+        ref_ini, ref_fim = coordenadas[0, :-1], coordenadas[0, 1:]
+        query_ini, query_fim = coordenadas[1, :-1], coordenadas[1, 1:]
+        if ref_bytes is None:
+            ref_bytes = np.frombuffer(referencia.encode("ascii", errors="replace"), dtype=np.uint8)
+        query_bytes = np.frombuffer(sequencia.encode("ascii", errors="replace"), dtype=np.uint8)
+
+        for idx in np.nonzero(tabela.tocam(ref_ini, ref_fim))[0]:
+            r_a, r_b = int(ref_ini[idx]), int(ref_fim[idx])
+            q_a, q_b = int(query_ini[idx]), int(query_fim[idx])
+
+            for regiao in tabela.sobrepostas(r_a, r_b):
+                dados = acumulado[regiao.nome]
+                variantes = dados["variantes"]
+
+                if r_b > r_a and q_b > q_a:
+                    ini, fim = max(r_a, regiao.inicio), min(r_b, regiao.fim)
+                    q_ini = q_a + (ini - r_a)
+                    dados["partes"].append(sequencia[q_ini:q_ini + (fim - ini)])
+                    diferentes = np.nonzero(ref_bytes[ini:fim] != query_bytes[q_ini:q_ini + (fim - ini)])[0]
+                    for offset in diferentes:
+                        ref_pos = ini + int(offset)
+                        variantes.append({
+                            "tipo": "substituicao",
+                            "posicao_genomica": ref_pos + 1,
+                            "posicao_exon": (ref_pos - regiao.inicio) + 1,
+                            "ref": referencia[ref_pos],
+                            "alt": sequencia[q_ini + int(offset)],
+                        })
+                elif r_b > r_a:
+                    for ref_pos in range(max(r_a, regiao.inicio), min(r_b, regiao.fim)):
+                        variantes.append({
+                            "tipo": "delecao",
+                            "posicao_genomica": ref_pos + 1,
+                            "posicao_exon": (ref_pos - regiao.inicio) + 1,
+                            "ref": referencia[ref_pos],
+                            "alt": "-",
+                            "tamanho": 1,
+                        })
+                        dados["partes"].append("-")
+                        dados["total_delecoes_nt"] += 1
+                else:
+                    for query_pos in range(q_a, q_b):
+                        variantes.append({
+                            "tipo": "insercao",
+                            "posicao_genomica": r_a + 1,
+                            "posicao_exon": (r_a - regiao.inicio) + 1,
+                            "ref": "-",
+                            "alt": sequencia[query_pos],
+                            "tamanho": 1,
+                        })
+                        dados["partes"].append(sequencia[query_pos])
+                        dados["total_insercoes_nt"] += 1
+
+    resultado: Dict[str, Dict[str, object]] = {}
+    for regiao in tabela.regioes:
+        dados = acumulado[regiao.nome]
+        amostra = "".join(dados["partes"]) or None
+        tamanho = regiao.fim - regiao.inicio
+        bases_validas = len(amostra) - amostra.count("-") if amostra else 0
+        resultado[regiao.nome] = {
+            "inicio": regiao.inicio,
+            "fim": regiao.fim,
+            "sequencia_amostra": amostra,
+            "sequencia_referencia": referencia[regiao.inicio:regiao.fim],
+            "cobertura_pct": round((bases_validas / tamanho) * 100, 2) if tamanho > 0 else 0.0,
+            "disponivel": bool(amostra),
+            "variantes": dados["variantes"],
+            "total_variantes": len(dados["variantes"]),
+            "total_insercoes_nt": dados["total_insercoes_nt"],
+            "total_delecoes_nt": dados["total_delecoes_nt"],
+        }
+    return resultado
@@ -0,0 +1,205 @@
+"""Geração do relatório textual (LLM) fora do caminho crítico da requisição.
+
+``GeradorResumos.agendar`` devolve na hora: o texto já pronto (LLM
+desativado ou resumo memorizado) ou o status "pendente", enquanto um
+``ThreadPoolExecutor`` chama o LLM e entrega o texto a um callback (que o
+grava no armazenamento de análises).
+
+Os resumos são memorizados pelo hash das entradas do prompt (identidade,
+score, classificação, confiança e sequência do exon29): análises idênticas
+não pagam uma segunda chamada ao LLM. Análises idênticas simultâneas
+compartilham a mesma chamada em andamento.
+
+``LLM_URL`` troca o endpoint (formato ``generateContent`` do Gemini), o que
+permite testar com ``ferramentas/llm_falso.py``.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+from metricas import duracao_etapas, falhas_llm
+
+# Endpoint básico Gemini generative (v1beta) - model gemini-pro (ajustável via LLM_URL)
+URL_GEMINI = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+
+PENDENTE = "pendente"
+PRONTO = "pronto"
+
+
+class FalhaLLM(Exception):
+    """O LLM não devolveu um texto utilizável."""
+
+
+def sanitize_sequence(seq: str, max_len: int = 400):
+    if not seq:
+        return "(sequência vazia)"
+    seq = seq.strip().upper()
+    if len(seq) <= max_len:
+        return seq
+    return seq[:max_len] + f"... (total {len(seq)} nt)"
+
+
+def montar_prompt(dados: dict) -> str:
+    identidade = dados.get("identidade") or "N/D"
+    score = dados.get("score") or "N/D"
+    classificacao = dados.get("classificacao") or "N/D"
+    confianca = dados.get("confianca") or "N/D"
+    exon_seq = sanitize_sequence(dados.get("exon29_amostra"))
+
+    return f"""
+Você é um assistente especializado em genética veterinária.
+Gere um relatório clínico interpretativo em português claro sobre o gene PKD1 (exon29) para felinos.
+Inclua seções: 1) Visão Geral, 2) Interpretação do Alinhamento, 3) Classificação do Modelo, 4) Risco / Implicações, 5) Próximos Passos Recomendados.
+Use bullets quando apropriado. Evite prometer diagnóstico definitivo.
+
+Dados:
+- Identidade do alinhamento: {identidade}
+- Score bruto do alinhamento: {score}
+- Classificação do modelo (interno): {classificacao}
+- Confiança do modelo: {confianca}
+- Trecho exon29 analisado (parcial/truncado se grande): {exon_seq}
+
+Produza texto objetivo (máx ~450 palavras), mantendo tom profissional e acessível a veterinário.
+""".strip()
+
+
+def chave_resumo(dados: dict) -> str:
+    entradas = {
+        campo: dados.get(campo)
+        for campo in ("identidade", "score", "classificacao", "confianca", "exon29_amostra")
+    }
+    entradas["url"] = os.getenv("LLM_URL", URL_GEMINI)
+    return hashlib.sha256(json.dumps(entradas, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _motivo_desativado() -> Optional[str]:
+    if os.getenv("ENABLE_LLM", "false").lower() != "true":
+        return "Resumo LLM desativado (ENABLE_LLM != true)."
+    if not os.getenv("LLM_URL") and not os.getenv("GEMINI_API_KEY"):
+        return "Resumo LLM indisponível: GEMINI_API_KEY não configurada."
+    return None
+
+
+def chamar_llm(prompt: str, sessao: Optional[requests.Session] = None, timeout: float = 25) -> str:
+    """Envia o prompt e devolve o texto gerado; levanta ``FalhaLLM`` sem texto útil."""
+    url = os.getenv("LLM_URL", URL_GEMINI)
+    api_key = os.getenv("GEMINI_API_KEY")
+    if api_key:
+        url = f"{url}?key={api_key}"
+    headers = {"Content-Type": "application/json"}
+    payload = {
+        "contents": [
+            {"parts": [{"text": prompt}]}
+        ]
+    }
+
+    start = time.time()
+    try:
+        resp = (sessao or requests).post(url, headers=headers, data=json.dumps(payload), timeout=timeout)
+    except requests.RequestException as e:
+        raise FalhaLLM(f"Erro ao contatar LLM: {e}")
+    dur = time.time() - start
+    if resp.status_code != 200:
+        raise FalhaLLM(f"Falha ao gerar resumo LLM (HTTP {resp.status_code}) em {dur:.1f}s")
+    data = resp.json()
+    # Estrutura típica: data['candidates'][0]['content']['parts'][0]['text']
+    candidates = data.get('candidates') or []
+    if not candidates:
+        raise FalhaLLM("Resposta LLM vazia ou sem candidatos.")
+    parts = candidates[0].get('content', {}).get('parts') or []
+    if not parts:
+        raise FalhaLLM("Resposta LLM sem partes de texto.")
+    texto = parts[0].get('text', '').strip()
+    if not texto:
+        raise FalhaLLM("Resposta LLM vazia.")
+    return texto
+
+
+class GeradorResumos:
+    def __init__(self, workers: int = 2, max_memorizados: int = 256, timeout: float = 25):
+        self.workers = max(1, workers)
+        self.max_memorizados = max_memorizados
+        self.timeout = timeout
+        self._memorizados: "OrderedDict[str, str]" = OrderedDict()
+        self._em_andamento: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sessao = requests.Session()
+        self.acertos = 0
+        self.chamadas = 0
+        self.falhas = 0
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="llm")
+        return self._executor
+
+    def _gerar(self, chave: str, prompt: str) -> str:
+        inicio = time.perf_counter()
+        try:
+            texto = chamar_llm(prompt, self._sessao, self.timeout)
+        except Exception as e:
+            falhas_llm.inc()
+            with self._lock:
+                self.falhas += 1
+                self._em_andamento.pop(chave, None)
+            # Falhas não são memorizadas: a próxima análise igual tenta de novo
+            return str(e) if isinstance(e, FalhaLLM) else f"Erro ao contatar LLM: {e}"
+        finally:
+            duracao_etapas.observar(time.perf_counter() - inicio, etapa="llm")
+        with self._lock:
+            self._memorizados[chave] = texto
+            while len(self._memorizados) > self.max_memorizados:
+                self._memorizados.popitem(last=False)
+            self._em_andamento.pop(chave, None)
+        return texto
+
+    def agendar(self, dados: dict, ao_concluir: Callable[[str], None]) -> Tuple[str, Optional[str]]:
+        """Retorna ``(PRONTO, texto)`` ou ``(PENDENTE, None)``.
+
+        No segundo caso ``ao_concluir(texto)`` é chamado quando o texto (ou a
+        mensagem de falha) estiver disponível.
+        """
+        motivo = _motivo_desativado()
+        if motivo:
+            return PRONTO, motivo
+
+        chave = chave_resumo(dados)
+        with self._lock:
+            texto = self._memorizados.get(chave)
+            if texto is not None:
+                self._memorizados.move_to_end(chave)
+                self.acertos += 1
+                return PRONTO, texto
+            futuro = self._em_andamento.get(chave)
+            if futuro is None:
+                self.chamadas += 1
+                futuro = self._obter_executor().submit(self._gerar, chave, montar_prompt(dados))
+                self._em_andamento[chave] = futuro
+
+        futuro.add_done_callback(lambda f: ao_concluir(f.result()))
+        return PENDENTE, None
+
+    def estatisticas(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "memorizados": len(self._memorizados),
+                "em_andamento": len(self._em_andamento),
+                "acertos": self.acertos,
+                "chamadas": self.chamadas,
+                "falhas": self.falhas,
+            }
+
+
+gerador_resumos = GeradorResumos(
+    workers=int(os.getenv("LLM_WORKERS", 2)),
+    max_memorizados=int(os.getenv("LLM_MEMORIZADOS_MAX", 256)),
+    timeout=float(os.getenv("LLM_TIMEOUT", 25)),
+)
@@ -0,0 +1,100 @@
+"""Serialização JSON das respostas em uma única passada.
+
+``codificar`` usa o encoder padrão com um gancho ``default`` para escalares
+NumPy, conjuntos e afins: a estrutura é percorrida uma vez só, pelo próprio
+encoder, em vez de ser reconstruída antes de cada uso. Só quando aparece um
+NaN/infinito (inválido em JSON) o resultado passa pela conversão recursiva,
+que troca NaN por ``null`` como antes.
+
+``resposta_json`` monta a resposta Flask a partir do objeto ou de bytes já
+codificados e comprime com gzip quando o cliente aceita.
+"""
+import gzip
+import hashlib
+import json
+import math
+import numbers
+import threading
+from collections import OrderedDict
+from typing import Union
+
+from flask import Response, request
+
+# Respostas menores que isso não compensam a compressão
+TAMANHO_MINIMO_GZIP = 1024
+NIVEL_GZIP = 6
+MAX_COMPRIMIDOS = 64
+
+
+def para_tipos_nativos(value):
+    """Converte recursivamente valores para tipos compatíveis com JSON."""
+    if isinstance(value, dict):
+        return {str(k): para_tipos_nativos(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [para_tipos_nativos(v) for v in value]
+    if isinstance(value, numbers.Number):
+        coerced = value.item() if hasattr(value, "item") else value
+        if isinstance(coerced, float) and (math.isnan(coerced) or math.isinf(coerced)):
+            return None
+        return coerced
+    if isinstance(value, (str, bool)) or value is None:
+        return value
+    # Arrays antes de ``item``: ``item()`` de um array com mais de um elemento falha
+    if hasattr(value, "tolist"):
+        return para_tipos_nativos(value.tolist())
+    if hasattr(value, "item"):
+        return para_tipos_nativos(value.item())
+    # Fallback para tipos não suportados diretamente
+    return str(value)
+
+
+def _padrao(valor):
+    # ``tolist`` converte arrays e escalares NumPy; ``item()`` só serve para escalares
+    if hasattr(valor, "tolist"):
+        return valor.tolist()
+    if hasattr(valor, "item"):
+        return valor.item()
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    return str(valor)
+
+
+def codificar(valor) -> bytes:
+    """JSON (UTF-8) de ``valor`` em uma passada."""
+    try:
+        texto = json.dumps(valor, default=_padrao, allow_nan=False, ensure_ascii=False, separators=(",", ":"))
+    except ValueError:
+        texto = json.dumps(para_tipos_nativos(valor), ensure_ascii=False, separators=(",", ":"))
+    return texto.encode("utf-8")
+
+
+_comprimidos: "OrderedDict[bytes, bytes]" = OrderedDict()
+_lock_comprimidos = threading.Lock()
+
+
+def comprimir(dados: bytes) -> bytes:
+    """gzip de ``dados``, reaproveitado para conteúdos idênticos (ex.: polling de /dados-analise)."""
+    chave = hashlib.blake2b(dados, digest_size=16).digest()
+    with _lock_comprimidos:
+        comprimido = _comprimidos.get(chave)
+        if comprimido is not None:
+            _comprimidos.move_to_end(chave)
+            return comprimido
+    comprimido = gzip.compress(dados, compresslevel=NIVEL_GZIP, mtime=0)
+    with _lock_comprimidos:
+        _comprimidos[chave] = comprimido
+        while len(_comprimidos) > MAX_COMPRIMIDOS:
+            _comprimidos.popitem(last=False)
+    return comprimido
+
+
+def resposta_json(valor: Union[bytes, object], status: int = 200) -> Response:
+    """Resposta JSON a partir de um objeto ou de bytes já codificados."""
+    dados = valor if isinstance(valor, bytes) else codificar(valor)
+    resposta = Response(status=status, mimetype="application/json")
+    resposta.vary.add("Accept-Encoding")
+    if len(dados) >= TAMANHO_MINIMO_GZIP and request.accept_encodings.quality("gzip") > 0:
+        dados = comprimir(dados)
+        resposta.headers["Content-Encoding"] = "gzip"
+    resposta.set_data(dados)
+    return resposta
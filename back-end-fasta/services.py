@@ -1,17 +1,34 @@
-import io
-from typing import Dict, List, Tuple
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
 
-from Bio import SeqIO
+import numpy as np
 from Bio.Align import Alignment, PairwiseAligner
-from Bio.Align import substitution_matrices
 
-# Coordenadas aproximadas do exon29 no gene PKD1 de referência (em nucleotídeos)
-EXON29_INICIO_REF = 9950
-EXON29_FIM_REF = 10150
-
-def _carregar_referencia(ref_path: str) -> str:
-    with open(ref_path) as handle:
-        return str(SeqIO.read(handle, "fasta").seq).upper()
+from alinhamento_ancorado import alinhar_ancorado
+from alinhamento_exon import FOLGA_JANELA_PADRAO, MARGEM_PADRAO, alinhar_janela_exon
+from alinhamento_janelado import localizar_janela, precisa_recorte, reposicionar
+from alinhamento_paralelo import alinhar_em_ladrilhos, paralelo_habilitado
+from fita import orientar
+from kmers import comparar_esbocos, esboco_kmers
+from leitura_fasta import iterar_registros
+from metricas import Cronometro
+from referencia import (
+    EXON29_FIM_REF,
+    EXON29_INICIO_REF,
+    REF_PADRAO,
+    ReferenciaPreparada,
+    obter_referencia,
+)
+from regioes import REGIOES_PADRAO, Regiao, TabelaRegioes, analisar_regioes, obter_tabela_regioes
+
+MODOS_ALINHAMENTO = ("completo", "ancorado", "exon")
+
+# Quantos registros (ordenados pelo esboço de k-mers) recebem o alinhamento exato
+TOP_K_IDENTIFICACAO = 3
+# Fração mínima dos k-mers compartilhados pelo melhor candidato para ir ao alinhamento exato
+FRACAO_MINIMA_ESBOCO = 0.1
 
 def validar_sequencia(seq):
     """Valida sequências de DNA"""
@@ -19,209 +36,406 @@ def validar_sequencia(seq):
         raise ValueError("Sequência vazia")
     return seq.upper()
 
-def buscar_gene_pkd1(conteudo, ref_path: str = "ref/ref.fasta"):
+def buscar_gene_pkd1(
+    conteudo,
+    ref_path: str = REF_PADRAO,
+    top_k: int = TOP_K_IDENTIFICACAO,
+    cronometro: Optional[Cronometro] = None,
+):
     """Extrai sequência do gene PKD1 de arquivo FASTA.
 
+    ``conteudo`` pode ser uma lista de linhas ou um fluxo binário (texto puro,
+    gzip ou BGZF); os registros são lidos um a um, sem carregar o arquivo.
+
     Tenta identificar o gene primeiro pelo cabeçalho. Caso não encontre,
-    realiza um alinhamento rápido contra a referência para escolher o
-    candidato com melhor similaridade.
+    ordena os registros pela contenção estimada do esboço de k-mers da
+    referência (custo linear) e só executa o alinhamento local exato nos
+    ``top_k`` melhores candidatos. Durante a leitura só ficam em memória o
+    maior registro com "PKD1" no cabeçalho e os ``top_k`` candidatos.
+
+    Cada registro é orientado pelos votos de k-mers das duas fitas contra o
+    índice da referência (``fita.orientar``), então amostras enviadas como
+    reverso-complementar são identificadas e devolvidas na fita da
+    referência; a fita escolhida fica em ``metadados["fita"]``.
+
+    Os tempos das etapas (referência, leitura do FASTA e identificação) são
+    somados em ``cronometro`` e copiados para ``metadados["timings_ms"]``.
     """
+    cronometro = cronometro or Cronometro()
+
+    def concluir(resultado):
+        leitura_ms = cronometro.tempos_ms.get("leitura_fasta", 0.0) - leitura_antes_ms
+        cronometro.adicionar("identificacao", (time.perf_counter() - inicio) * 1000 - leitura_ms)
+        resultado["metadados"]["timings_ms"] = cronometro.resumo()
+        return resultado
+
     try:
-        fasta_io = io.StringIO("\n".join(conteudo))
-        registros = list(SeqIO.parse(fasta_io, "fasta"))
-        if not registros:
+        with cronometro.etapa("referencia"):
+            ref = obter_referencia(ref_path)
+        top_k = max(1, top_k)
+        inicio = time.perf_counter()
+        leitura_antes_ms = cronometro.tempos_ms.get("leitura_fasta", 0.0)
+
+        total_registros = 0
+        selecionado_pkd1 = None
+        candidatos: List[Tuple[int, int, Dict[str, float], str, str, Dict[str, object]]] = []
+
+        for registro in cronometro.iterar("leitura_fasta", iterar_registros(conteudo)):
+            total_registros += 1
+            descricao = registro.description
+            if "PKD1" in descricao.upper():
+                if selecionado_pkd1 is None or len(registro.seq) > len(selecionado_pkd1.seq):
+                    selecionado_pkd1 = registro
+                candidatos = []
+                continue
+            if selecionado_pkd1 is not None:
+                continue
+
+            try:
+                seq = validar_sequencia(str(registro.seq))
+            except ValueError:
+                continue
+            seq, orientacao = orientar(ref.indice, seq)
+            similaridade = comparar_esbocos(ref.esboco, esboco_kmers(seq, ref.indice.k, ref.escala_esboco))
+            # Heap mínimo de tamanho top_k; em empate vence o registro mais antigo
+            item = (similaridade["compartilhados"], -total_registros, similaridade, descricao, seq, orientacao)
+            if len(candidatos) < top_k:
+                heapq.heappush(candidatos, item)
+            else:
+                heapq.heappushpop(candidatos, item)
+
+        if total_registros == 0:
             return {"error": "Arquivo FASTA vazio ou inválido"}
 
-        registros_pkd1 = [r for r in registros if "PKD1" in r.description.upper()]
-        if registros_pkd1:
-            selecionado = max(registros_pkd1, key=lambda r: len(r.seq))
-            return {
-                "cabecalho": selecionado.description,
-                "sequencia": validar_sequencia(str(selecionado.seq)),
+        if selecionado_pkd1 is not None:
+            seq, orientacao = orientar(ref.indice, validar_sequencia(str(selecionado_pkd1.seq)))
+            return concluir({
+                "cabecalho": selecionado_pkd1.description,
+                "sequencia": seq,
                 "metadados": {
                     "metodo_identificacao": "descricao",
-                    "total_registros": len(registros),
+                    "fita": orientacao["fita"],
+                    "votos_fita": orientacao["votos"],
+                    "total_registros": total_registros,
                 },
-            }
+            })
 
-        referencia = _carregar_referencia(ref_path)
-        aligner = PairwiseAligner()
-        aligner.mode = "local"
-        aligner.match_score = 2
-        aligner.mismatch_score = -1
-        aligner.open_gap_score = -5
-        aligner.extend_gap_score = -1
+        if not candidatos:
+            return {"error": "Gene PKD1 não encontrado no arquivo"}
 
-        melhor_registro = None
-        melhor_score = float("-inf")
+        candidatos.sort(reverse=True)
+        melhor_compartilhados = candidatos[0][0]
+        if melhor_compartilhados > 0:
+            # Registros com fração desprezível dos k-mers do líder são ruído
+            corte = max(1, FRACAO_MINIMA_ESBOCO * melhor_compartilhados)
+            candidatos = [c for c in candidatos if c[0] >= corte]
 
-        for registro in registros:
-            try:
-                seq = validar_sequencia(str(registro.seq))
-            except ValueError:
-                continue
-            score = aligner.score(referencia, seq)
+        aligner = ref.aligner_identificacao
+        melhor = None
+        melhor_score = float("-inf")
+        avaliados = []
+        for _, _, similaridade, descricao, seq, orientacao in candidatos:
+            trecho = seq
+            if precisa_recorte(len(seq), ref.tamanho_nt):
+                # Contig/scaffold: pontua só a janela com mais k-mers do gene
+                janela = localizar_janela(ref.indice, seq, ref.tamanho_nt)
+                trecho = seq[janela["inicio"]:janela["fim"]] if janela else ""
+            score = aligner.score(ref.sequencia, trecho) if trecho else 0.0
+            avaliados.append({
+                "cabecalho": descricao,
+                "score_esboco": round(similaridade["contencao_referencia"], 4),
+                "score_identificacao": score,
+                "fita": orientacao["fita"],
+            })
             if score > melhor_score:
                 melhor_score = score
-                melhor_registro = registro
+                melhor = (similaridade, descricao, seq, orientacao)
 
-        if melhor_registro is None:
-            return {"error": "Gene PKD1 não encontrado no arquivo"}
-
-        return {
-            "cabecalho": melhor_registro.description,
-            "sequencia": validar_sequencia(str(melhor_registro.seq)),
+        melhor_esboco, melhor_descricao, melhor_seq, melhor_orientacao = melhor
+        return concluir({
+            "cabecalho": melhor_descricao,
+            "sequencia": melhor_seq,
             "metadados": {
                 "metodo_identificacao": "alinhamento",
+                "fita": melhor_orientacao["fita"],
+                "votos_fita": melhor_orientacao["votos"],
                 "score_identificacao": melhor_score,
-                "total_registros": len(registros),
+                "score_esboco": round(melhor_esboco["contencao_referencia"], 4),
+                "esboco": {chave: round(valor, 4) for chave, valor in melhor_esboco.items()},
+                "candidatos_avaliados": avaliados,
+                "total_registros": total_registros,
             },
-        }
+        })
 
     except Exception as e:
         return {"error": f"Erro ao buscar gene: {str(e)}"}
 
-def criar_matriz_dna():
-    """Obtém uma matriz de substituição padrão para DNA.
+def _como_bytes(seq) -> np.ndarray:
+    if isinstance(seq, np.ndarray):
+        return seq
+    return np.frombuffer(seq.encode("ascii", errors="replace"), dtype=np.uint8)
 
-    Observação: Evita APIs antigas/obsoletas criando a matriz via
-    substitution_matrices.load("NUC.4.4").
-    """
-    try:
-        return substitution_matrices.load("NUC.4.4")
-    except Exception:
-        # Fallback simples caso o load falhe no ambiente: usa escore match/mismatch
-        # diretamente configurado no PairwiseAligner via match/mismatch_score
-        return None
 
 def calcular_identidade_por_blocos(alinhamento, referencia, sequencia):
-    """Calcula a identidade (%) percorrendo os blocos alinhados.
+    """Calcula a identidade (%) comparando os blocos alinhados de forma vetorizada.
 
     Evita depender de atributos potencialmente obsoletos (como target/query strings),
     usando as coordenadas em alinhamento.aligned contra as sequências originais.
+    ``referencia``/``sequencia`` podem ser ``str`` ou arrays uint8 (ASCII).
     """
-    matches = 0
-    length = 0
     ref_blocks, query_blocks = alinhamento.aligned
-    for (r0, r1), (q0, q1) in zip(ref_blocks, query_blocks):
-        # Tamanho do bloco é igual em ref e query para alinhamento local sem gaps internos no bloco
-        block_len = min(r1 - r0, q1 - q0)
-        for i in range(block_len):
-            if referencia[r0 + i] == sequencia[q0 + i]:
-                matches += 1
-        length += block_len
-    return (matches / length) * 100 if length > 0 else 0
+    if len(ref_blocks) == 0:
+        return 0
+    r0 = np.asarray(ref_blocks)[:, 0]
+    q0 = np.asarray(query_blocks)[:, 0]
+    # Tamanho do bloco é igual em ref e query para alinhamento local sem gaps internos no bloco
+    tamanhos = np.minimum(np.asarray(ref_blocks)[:, 1] - r0, np.asarray(query_blocks)[:, 1] - q0)
+    length = int(tamanhos.sum())
+    if length <= 0:
+        return 0
+
+    deslocamentos = np.arange(length) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    indices_ref = np.repeat(r0, tamanhos) + deslocamentos
+    indices_query = np.repeat(q0, tamanhos) + deslocamentos
+    matches = int(np.count_nonzero(_como_bytes(referencia)[indices_ref] == _como_bytes(sequencia)[indices_query]))
+    return (matches / length) * 100
+
+REGIAO_EXON29 = Regiao("exon29", EXON29_INICIO_REF, EXON29_FIM_REF)
+
+
+def _exon29_de_regioes(regioes: Dict[str, Dict[str, object]]) -> Tuple[str, List[Dict[str, object]], Dict[str, int]]:
+    exon29 = regioes[REGIAO_EXON29.nome]
+    return exon29["sequencia_amostra"], exon29["variantes"], {
+        "total_insercoes_nt": exon29["total_insercoes_nt"],
+        "total_delecoes_nt": exon29["total_delecoes_nt"],
+    }
+
 
 def _analisar_exon29(
     alinhamento: Alignment,
     referencia: str,
     sequencia_analisada: str,
+    ref_bytes: Optional[np.ndarray] = None,
 ) -> Tuple[str, List[Dict[str, object]], Dict[str, int]]:
     """Deriva sequência do exon29 na amostra e descreve variantes."""
+    regioes = analisar_regioes(
+        alinhamento, referencia, sequencia_analisada, TabelaRegioes([REGIAO_EXON29]), ref_bytes
+    )
+    return _exon29_de_regioes(regioes)
 
-    path = alinhamento.path
-    if not path or len(path) < 2:
-        return None, [], {
-            "total_insercoes_nt": 0,
-            "total_delecoes_nt": 0,
-        }
 
-    exon_seq: List[str] = []
-    variantes: List[Dict[str, object]] = []
-    total_ins_nt = 0
-    total_del_nt = 0
-
-    ref_pos, query_pos = path[0]
-    for idx in range(len(path) - 1):
-        prox_ref, prox_query = path[idx + 1]
-
-        while ref_pos < prox_ref or query_pos < prox_query:
-            dentro_exon = EXON29_INICIO_REF <= ref_pos < EXON29_FIM_REF
-
-            if ref_pos < prox_ref and query_pos < prox_query:
-                ref_base = referencia[ref_pos]
-                query_base = sequencia_analisada[query_pos]
-                if dentro_exon:
-                    exon_seq.append(query_base)
-                    if ref_base != query_base:
-                        variantes.append({
-                            "tipo": "substituicao",
-                            "posicao_genomica": ref_pos + 1,
-                            "posicao_exon": (ref_pos - EXON29_INICIO_REF) + 1,
-                            "ref": ref_base,
-                            "alt": query_base,
-                        })
-                ref_pos += 1
-                query_pos += 1
-            elif ref_pos < prox_ref:
-                if dentro_exon:
-                    variantes.append({
-                        "tipo": "delecao",
-                        "posicao_genomica": ref_pos + 1,
-                        "posicao_exon": (ref_pos - EXON29_INICIO_REF) + 1,
-                        "ref": referencia[ref_pos],
-                        "alt": "-",
-                        "tamanho": 1,
-                    })
-                    exon_seq.append("-")
-                    total_del_nt += 1
-                ref_pos += 1
-            else:
-                if dentro_exon:
-                    variantes.append({
-                        "tipo": "insercao",
-                        "posicao_genomica": ref_pos + 1,
-                        "posicao_exon": (ref_pos - EXON29_INICIO_REF) + 1,
-                        "ref": "-",
-                        "alt": sequencia_analisada[query_pos],
-                        "tamanho": 1,
-                    })
-                    exon_seq.append(sequencia_analisada[query_pos])
-                    total_ins_nt += 1
-                query_pos += 1
-
-    if not exon_seq:
-        return None, variantes, {
-            "total_insercoes_nt": total_ins_nt,
-            "total_delecoes_nt": total_del_nt,
-        }
+def _alinhar_completo(
+    aligner: PairwiseAligner,
+    referencia: str,
+    sequencia: str,
+    alternativas: int = 0,
+) -> Tuple[Optional[Alignment], List[Alignment]]:
+    """Smith-Waterman completo da amostra contra toda a referência.
+
+    Nunca enumera todos os alinhamentos co-ótimos: em regiões repetitivas do
+    PKD1 o número deles cresce combinatorialmente. O escore vem pronto da DP
+    e só a primeira reconstrução (traceback) é extraída, de forma preguiçosa.
+    ``alternativas`` limita quantos caminhos co-ótimos extras são devolvidos.
+    """
+    alinhamentos = aligner.align(referencia, sequencia)
+    if alinhamentos.score <= 0:
+        return None, []
+    iterador = iter(alinhamentos)
+    melhor = next(iterador, None)
+    extras = list(itertools.islice(iterador, max(0, alternativas)))
+    return melhor, extras
+
 
-    return "".join(exon_seq), variantes, {
-        "total_insercoes_nt": total_ins_nt,
-        "total_delecoes_nt": total_del_nt,
+def _coordenadas_alinhamento(alinhamento: Alignment) -> Dict[str, int]:
+    """Deriva inícios/fins a partir dos blocos alinhados."""
+    ref_blocks, query_blocks = alinhamento.aligned
+    return {
+        "inicio_ref": int(ref_blocks[0][0]) if len(ref_blocks) > 0 else 0,
+        "fim_ref": int(ref_blocks[-1][1]) if len(ref_blocks) > 0 else 0,
+        "inicio_query": int(query_blocks[0][0]) if len(query_blocks) > 0 else 0,
+        "fim_query": int(query_blocks[-1][1]) if len(query_blocks) > 0 else 0,
     }
 
 
-def realizar_alinhamento_grande(sequencia, ref_path="ref/ref.fasta", progress_callback=None):
-    """Executa alinhamento local com a referência completa"""
-    try:
-        sequencia = validar_sequencia(sequencia)
-        if progress_callback:
-            progress_callback(0.1, "Validando sequência...")
+def _montar_resultado(
+    melhor: Alignment,
+    ref: ReferenciaPreparada,
+    sequencia: str,
+    estrategia: Dict[str, object],
+    tabela: TabelaRegioes,
+) -> Dict[str, object]:
+    referencia = ref.sequencia
+    # Uma única varredura do alinhamento cobre todas as regiões anotadas
+    regioes = analisar_regioes(melhor, referencia, sequencia, tabela, ref.bytes)
+    exon29_amostra, variantes, info_variantes = _exon29_de_regioes(regioes)
+    exon29_referencia = ref.exon29
+    if exon29_amostra:
+        cobertura = regioes[REGIAO_EXON29.nome]["cobertura_pct"]
+        exon29_amostra_str = exon29_amostra
+    else:
+        cobertura = 0.0
+        exon29_amostra_str = "Não foi possível localizar o exon29 na amostra analisada"
+
+    # Calcula identidade sem usar atributos obsoletos
+    identidade = calcular_identidade_por_blocos(melhor, ref.bytes, sequencia)
+
+    return {
+        "sucesso": True,
+        "melhor_alinhamento": {
+            "score": float(melhor.score),
+            "identidade": f"{identidade:.2f}%",
+            "identidade_pct": float(identidade),
+            **_coordenadas_alinhamento(melhor),
+        },
+        "tamanhos": {
+            "consulta": len(sequencia),
+            "referencia": len(referencia)
+        },
+        "exon29_amostra": exon29_amostra_str,
+        "exon29_referencia": exon29_referencia,
+        "variantes_exon29": variantes,
+        "metricas_exon29": {
+            "cobertura_pct": round(cobertura, 2),
+            "total_variantes": len(variantes),
+            "exon_disponivel": bool(exon29_amostra),
+            **info_variantes,
+        },
+        "regioes": regioes,
+        "estrategia": estrategia,
+    }
 
-        referencia = _carregar_referencia(ref_path)
 
-        aligner = PairwiseAligner()
-        aligner.mode = 'local'
-        matriz = criar_matriz_dna()
-        if matriz is not None:
-            aligner.substitution_matrix = matriz
-        else:
-            # Fallback: define escores simples direto no aligner
-            aligner.match_score = 5
-            aligner.mismatch_score = -4
-        aligner.open_gap_score = -7
-        aligner.extend_gap_score = -2
+def realizar_alinhamento_grande(
+    sequencia,
+    ref_path=REF_PADRAO,
+    progress_callback=None,
+    modo: str = "completo",
+    folga_janela: int = FOLGA_JANELA_PADRAO,
+    margem: int = MARGEM_PADRAO,
+    alternativas: int = 0,
+    regioes_path: str = REGIOES_PADRAO,
+    cronometro: Optional[Cronometro] = None,
+    paralelo: Optional[bool] = None,
+):
+    """Executa alinhamento local com a referência completa.
+
+    ``modo`` seleciona o motor de alinhamento:
+      - "completo": Smith-Waterman sobre toda a referência (exato);
+      - "ancorado": semente-e-extensão por k-mers, com DP apenas entre
+        âncoras e ao redor do exon29. Sem âncoras, recorre ao "completo";
+      - "exon": alinhamento local da janela do exon29 (``margem`` nt de cada
+        lado) contra o trecho da amostra na diagonal estimada, com
+        ``folga_janela`` nt de folga. Escore e coordenadas ficam restritos à
+        janela (``estrategia["escopo"] == "janela"``); se a janela da amostra
+        não comporta o alinhamento, recorre ao "completo".
+
+    ``alternativas`` (apenas no alinhamento completo) devolve até N caminhos
+    co-ótimos adicionais em ``alinhamentos_alternativos``.
+
+    ``paralelo`` distribui o alinhamento completo por ladrilhos da cadeia de
+    âncoras em um pool de processos (ver ``alinhamento_paralelo``); ``None``
+    segue ``ALINHAMENTO_WORKERS``. O serial continua sendo usado com
+    ``alternativas`` e quando o modo não se aplica ou sai mais caro
+    (``estrategia["paralelo"]["motivo"]``).
+
+    ``regioes_path`` aponta para o BED de regiões anotadas; todas são
+    descritas em ``regioes`` a partir do mesmo alinhamento.
+
+    A amostra é orientada antes de tudo pelos votos de k-mers das duas fitas
+    (custo linear); se veio como reverso-complementar, as coordenadas do
+    resultado se referem à fita da referência e ``estrategia["fita"]``
+    registra a escolha.
+
+    Amostras muito maiores que a referência (contigs, scaffolds) passam antes
+    por um recorte linear por k-mers e só a janela do gene é alinhada; as
+    coordenadas devolvidas continuam relativas à amostra inteira e a janela
+    usada fica em ``estrategia["recorte"]``.
+
+    Com ``cronometro`` os tempos das etapas (referência, recorte, alinhamento
+    e extração do exon29/regiões) são somados nele.
+    """
+    cronometro = cronometro or Cronometro()
+    try:
+        if modo not in MODOS_ALINHAMENTO:
+            raise ValueError(f"Modo de alinhamento desconhecido: {modo}")
 
+        sequencia = validar_sequencia(sequencia)
         if progress_callback:
-            progress_callback(0.3, "Executando alinhamento completo...")
-
-        # Materializa imediatamente todos os alinhamentos em lista para evitar comportamento
-        # especial de objeto que causa ambiguidade em avaliação booleana.
-        alignments = list(aligner.align(referencia, sequencia))
-        total_aligns = len(alignments)
+            progress_callback(0.1, "Validando sequência...")
 
-        if total_aligns == 0:
+        with cronometro.etapa("referencia"):
+            ref = obter_referencia(ref_path)
+        referencia = ref.sequencia
+        aligner = ref.aligner_alinhamento
+        estrategia: Dict[str, object] = {"modo": modo, "fallback": False}
+
+        with cronometro.etapa("fita"):
+            sequencia, orientacao = orientar(ref.indice, sequencia)
+        estrategia["fita"] = orientacao
+
+        consulta, deslocamento = sequencia, 0
+        if precisa_recorte(len(sequencia), ref.tamanho_nt):
+            if progress_callback:
+                progress_callback(0.2, "Localizando o gene na amostra...")
+            with cronometro.etapa("recorte"):
+                janela = localizar_janela(ref.indice, sequencia, ref.tamanho_nt)
+            if janela is None:
+                return {
+                    "error": "Nenhum trecho da amostra compartilha k-mers suficientes com a referência",
+                    "tamanhos": {"consulta": len(sequencia), "referencia": ref.tamanho_nt},
+                }
+            estrategia["recorte"] = janela
+            consulta, deslocamento = sequencia[janela["inicio"]:janela["fim"]], janela["inicio"]
+
+        melhor = None
+        extras: List[Alignment] = []
+        inicio_alinhamento = time.perf_counter()
+        if modo == "ancorado":
+            if progress_callback:
+                progress_callback(0.3, "Executando alinhamento ancorado...")
+            melhor = alinhar_ancorado(
+                aligner,
+                referencia,
+                consulta,
+                indice=ref.indice,
+                janela_protegida=(EXON29_INICIO_REF, EXON29_FIM_REF),
+            )
+            if melhor is None:
+                estrategia.update({"fallback": True, "motivo": "sem_ancoras"})
+        elif modo == "exon":
+            if progress_callback:
+                progress_callback(0.3, "Executando alinhamento na janela do exon29...")
+            melhor, detalhes = alinhar_janela_exon(
+                aligner,
+                referencia,
+                consulta,
+                ref.indice,
+                (EXON29_INICIO_REF, EXON29_FIM_REF),
+                folga_janela=folga_janela,
+                margem=margem,
+            )
+            if deslocamento and "janela_query" in detalhes:
+                detalhes["janela_query"] = [p + deslocamento for p in detalhes["janela_query"]]
+                detalhes["diagonal_estimada"] = [d - deslocamento for d in detalhes["diagonal_estimada"]]
+            estrategia.update(detalhes)
+            if melhor is None:
+                estrategia["fallback"] = True
+
+        if melhor is None and alternativas <= 0 and (paralelo_habilitado() if paralelo is None else paralelo):
+            if progress_callback:
+                progress_callback(0.3, "Executando alinhamento completo em paralelo...")
+            melhor, detalhes_paralelo = alinhar_em_ladrilhos(aligner, ref.caminho, referencia, consulta, ref.indice)
+            estrategia["paralelo"] = detalhes_paralelo
+        if melhor is None:
+            if progress_callback:
+                progress_callback(0.3, "Executando alinhamento completo...")
+            melhor, extras = _alinhar_completo(aligner, referencia, consulta, alternativas)
+        if melhor is not None and deslocamento:
+            melhor = reposicionar(melhor, referencia, sequencia, deslocamento)
+            extras = [reposicionar(extra, referencia, sequencia, deslocamento) for extra in extras]
+        cronometro.adicionar("alinhamento", (time.perf_counter() - inicio_alinhamento) * 1000)
+
+        if melhor is None:
             return {
                 "error": "Nenhum alinhamento significativo encontrado",
                 "tamanhos": {
@@ -230,58 +444,19 @@ def realizar_alinhamento_grande(sequencia, ref_path="ref/ref.fasta", progress_ca
                 }
             }
 
-        # Seleciona melhor alinhamento diretamente (já é lista)
-        melhor = max(alignments, key=lambda x: x.score)
-
-        exon29_amostra, variantes, info_variantes = _analisar_exon29(melhor, referencia, sequencia)
-        exon29_referencia = referencia[EXON29_INICIO_REF:EXON29_FIM_REF]
-        exon_len = len(exon29_referencia)
-        if exon29_amostra:
-            bases_validas_exon = [b for b in exon29_amostra if b not in {"-", ""}]
-            cobertura = (len(bases_validas_exon) / exon_len) * 100 if exon_len > 0 else 0.0
-            exon29_amostra_str = exon29_amostra
-        else:
-            cobertura = 0.0
-            exon29_amostra_str = "Não foi possível localizar o exon29 na amostra analisada"
+        with cronometro.etapa("extracao_exon29"):
+            tabela = obter_tabela_regioes(regioes_path, padrao=REGIAO_EXON29)
+            resultado = _montar_resultado(melhor, ref, sequencia, estrategia, tabela)
+            if alternativas > 0:
+                resultado["alinhamentos_alternativos"] = [
+                    {"score": float(extra.score), **_coordenadas_alinhamento(extra)}
+                    for extra in extras
+                ]
 
         if progress_callback:
             progress_callback(1.0, "Concluído")
 
-        # Calcula identidade sem usar atributos obsoletos
-        identidade = calcular_identidade_por_blocos(melhor, referencia, sequencia)
-
-        # Deriva inícios/fins a partir dos blocos alinhados
-        ref_blocks, query_blocks = melhor.aligned
-        inicio_ref = int(ref_blocks[0][0]) if len(ref_blocks) > 0 else 0
-        fim_ref = int(ref_blocks[-1][1]) if len(ref_blocks) > 0 else 0
-        inicio_query = int(query_blocks[0][0]) if len(query_blocks) > 0 else 0
-        fim_query = int(query_blocks[-1][1]) if len(query_blocks) > 0 else 0
-
-        return {
-            "sucesso": True,
-            "melhor_alinhamento": {
-                "score": float(melhor.score),
-                "identidade": f"{identidade:.2f}%",
-                "identidade_pct": float(identidade),
-                "inicio_ref": inicio_ref,
-                "fim_ref": fim_ref,
-                "inicio_query": inicio_query,
-                "fim_query": fim_query,
-            },
-            "tamanhos": {
-                "consulta": len(sequencia),
-                "referencia": len(referencia)
-            },
-            "exon29_amostra": exon29_amostra_str,
-            "exon29_referencia": exon29_referencia,
-            "variantes_exon29": variantes,
-            "metricas_exon29": {
-                "cobertura_pct": round(cobertura, 2),
-                "total_variantes": len(variantes),
-                "exon_disponivel": bool(exon29_amostra),
-                **info_variantes,
-            },
-        }
+        return resultado
 
     except Exception as e:
         return {
@@ -0,0 +1,29 @@
+"""Ponto de entrada WSGI do back-end-fasta (gunicorn, ver ``gunicorn.conf.py``).
+
+Com ``preload_app`` este módulo é importado uma única vez no processo mestre:
+a referência (índice de k-mers, esboço e aligners) e a tabela de regiões são
+carregadas antes do fork e os workers as compartilham, sem recarregar nada
+por worker. A sequência em texto de uma referência ``.catref`` não é
+decodificada aqui: cada processo decodifica o que usar (ver ``referencia``).
+
+Em produção o perfilador fica desligado salvo ``PERFIL`` explícito (ver
+``perfilador``).
+"""
+import gc
+import os
+
+os.environ.setdefault("PERFIL", "desligado")
+
+from app import app  # noqa: E402
+from referencia import REF_PADRAO, obter_referencia  # noqa: E402
+from regioes import REGIOES_PADRAO, obter_tabela_regioes  # noqa: E402
+from services import REGIAO_EXON29  # noqa: E402
+
+obter_referencia(REF_PADRAO)
+obter_tabela_regioes(REGIOES_PADRAO, padrao=REGIAO_EXON29)
+
+# Objetos já carregados saem do rastreamento do GC; senão cada coleta nos
+# workers tocaria seus cabeçalhos e copiaria as páginas compartilhadas
+gc.freeze()
+
+application = app
@@ -1,8 +1,10 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import joblib
 from utils import extrair_features
+from inferencia import Classificador, carregar_ordem_features
+from perfilador import perfilar_rota
+from metricas import TIPO_CONTEUDO, Cronometro, classificacoes, erros, registrar_etapas, registro_metricas
 import os
-import pandas as pd
 
 app = Flask(__name__)
 
@@ -12,25 +14,44 @@ if not os.path.exists(modelo_path):
     raise FileNotFoundError("Modelo treinado não encontrado. Rode o train_model.py primeiro.")
 
 modelo = joblib.load(modelo_path)
+classificador = Classificador(modelo, carregar_ordem_features(modelo))
 
-@app.route("/classificar-exon29", methods=["POST"])
-def classificar():
-    data = request.get_json()
+# Amostras aceitas por chamada de /classificar-exon29/lote
+MAX_AMOSTRAS_LOTE = int(os.getenv("MAX_AMOSTRAS_LOTE", "1000"))
 
-    if not data:
-        return jsonify({"error": "Nenhum dado JSON fornecido."}), 400
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Histogramas de duração por etapa e contadores no formato texto do Prometheus."""
+    return Response(registro_metricas.exportar(), content_type=TIPO_CONTEUDO)
 
-    alinhamento_result = data.get("alinhamento_result")
+@app.route("/classificar-exon29", methods=["POST"])
+@perfilar_rota("classificar-exon29")
+def classificar():
+    cronometro = Cronometro()
+    with cronometro.etapa("total"):
+        corpo, status = _classificar(request.get_json(silent=True), cronometro)
+    registrar_etapas(cronometro.tempos_ms)
+    if status == 200:
+        corpo["timings_ms"] = cronometro.resumo()
+    return jsonify(corpo), status
+
+def _features_amostra(alinhamento_result):
+    """Valida um ``alinhamento_result`` e extrai suas features.
+
+    Retorna ``(features, None, None)`` ou ``(None, corpo_erro, status)``.
+    """
     if not isinstance(alinhamento_result, dict):
-        return jsonify({
+        erros.inc(tipo="requisicao_invalida")
+        return None, {
             "error": "JSON inválido. Esperado chave 'alinhamento_result' com objeto."
-        }), 400
+        }, 400
 
     sequencia = alinhamento_result.get("exon29_amostra")
     if not sequencia or "Não foi possível" in sequencia:
-        return jsonify({
+        erros.inc(tipo="exon29_indisponivel")
+        return None, {
             "error": "Exon29 indisponível na amostra. Não foi possível classificar."
-        }), 422
+        }, 422
 
     referencia = alinhamento_result.get("exon29_referencia")
     variantes = alinhamento_result.get("variantes_exon29", [])
@@ -48,36 +69,113 @@ def classificar():
                 except ValueError:
                     identidade_pct = None
 
+    features = extrair_features(
+        sequencia,
+        referencia=referencia,
+        variantes=variantes,
+        identidade=identidade_pct,
+        metricas=metricas,
+    )
+    return features, None, None
+
+def _resultado(classe, prob):
+    return {
+        "classificacao": int(classe),
+        "confianca": f"{float(prob)*100:.2f}%",
+        "confianca_float": float(prob),
+    }
+
+def _classificar(data, cronometro):
+    if not data:
+        erros.inc(tipo="requisicao_invalida")
+        return {"error": "Nenhum dado JSON fornecido."}, 400
+
     try:
+        with cronometro.etapa("extracao_features"):
+            features, erro, status = _features_amostra(data.get("alinhamento_result"))
+        if erro:
+            return erro, status
+
         print("\n📥 Sequência recebida para classificação:")
-        print(sequencia)
-
-        features = extrair_features(
-            sequencia,
-            referencia=referencia,
-            variantes=variantes,
-            identidade=identidade_pct,
-            metricas=metricas,
-        )
-        features_df = pd.DataFrame([features])
-        pred = modelo.predict(features_df)[0]
-        prob = modelo.predict_proba(features_df)[0].max()
-
-        resultado = {
-            "classificacao": int(pred),
-            "confianca": f"{float(prob)*100:.2f}%",
-            "confianca_float": float(prob),
-        }
+        print(data["alinhamento_result"]["exon29_amostra"])
+
+        with cronometro.etapa("predicao"):
+            pred, prob = classificador.classificar(features)
+
+        resultado = _resultado(pred, prob)
 
         print("\n✅ Resultado da classificação:")
         print(f"📌 Classificação: {resultado['classificacao']}")
         print(f"📊 Confiança: {resultado['confianca']}")
 
-        return jsonify(resultado)
+        classificacoes.inc(classe=resultado["classificacao"])
+        return resultado, 200
 
     except Exception as e:
         print(f"\n❌ Erro ao classificar: {e}")
-        return jsonify({"error": str(e)}), 500
+        erros.inc(tipo="excecao")
+        return {"error": str(e)}, 500
+
+@app.route("/classificar-exon29/lote", methods=["POST"])
+@perfilar_rota("classificar-exon29-lote")
+def classificar_lote():
+    """Classifica vários ``alinhamento_result`` com uma única chamada ao modelo.
+
+    Corpo: ``{"alinhamentos": [alinhamento_result, ...]}``. A resposta traz
+    ``resultados`` na mesma ordem; amostras inválidas recebem ``error`` e
+    ``status`` sem impedir a classificação das demais.
+    """
+    cronometro = Cronometro()
+    with cronometro.etapa("total"):
+        corpo, status = _classificar_lote(request.get_json(silent=True), cronometro)
+    registrar_etapas(cronometro.tempos_ms)
+    if status == 200:
+        corpo["timings_ms"] = cronometro.resumo()
+    return jsonify(corpo), status
+
+def _classificar_lote(data, cronometro):
+    alinhamentos = data.get("alinhamentos") if isinstance(data, dict) else None
+    if not isinstance(alinhamentos, list) or not alinhamentos:
+        erros.inc(tipo="requisicao_invalida")
+        return {"error": "JSON inválido. Esperado chave 'alinhamentos' com lista de objetos."}, 400
+    if len(alinhamentos) > MAX_AMOSTRAS_LOTE:
+        erros.inc(tipo="requisicao_invalida")
+        return {"error": f"Lote com {len(alinhamentos)} amostras; o máximo é {MAX_AMOSTRAS_LOTE}."}, 413
+
+    try:
+        resultados = [None] * len(alinhamentos)
+        linhas, posicoes = [], []
+        with cronometro.etapa("extracao_features"):
+            for posicao, alinhamento_result in enumerate(alinhamentos):
+                features, erro, status = _features_amostra(alinhamento_result)
+                if erro:
+                    resultados[posicao] = {**erro, "status": status}
+                else:
+                    linhas.append(features)
+                    posicoes.append(posicao)
+
+        if linhas:
+            with cronometro.etapa("predicao"):
+                # Uma única passada da floresta pela matriz inteira
+                classes, confiancas = classificador.classificar_lote(linhas)
+            for posicao, classe, prob in zip(posicoes, classes, confiancas):
+                resultados[posicao] = _resultado(classe, prob)
+                classificacoes.inc(classe=resultados[posicao]["classificacao"])
+
+        print(f"\n✅ Lote classificado: {len(linhas)}/{len(alinhamentos)} amostras")
+        return {
+            "resultados": resultados,
+            "resumo": {
+                "total": len(alinhamentos),
+                "classificadas": len(linhas),
+                "falhas": len(alinhamentos) - len(linhas),
+            },
+        }, 200
+
+    except Exception as e:
+        print(f"\n❌ Erro ao classificar lote: {e}")
+        erros.inc(tipo="excecao")
+        return {"error": str(e)}, 500
 
 if __name__ == "__main__":
     print("Servidor IA rodando em http://localhost:6000/classificar-exon29")
@@ -0,0 +1,123 @@
+"""Latência p50/p99 de ``/classificar-exon29`` e da etapa de predição.
+
+Uso (a partir de ia/):
+
+    python benchmarks/bench_latencia.py [--requisicoes 500] [--aquecimento 20] [--seed 7]
+
+Monta ``alinhamento_result`` a partir das sequências de
+``model/pkd1_exon29_variants.csv`` (variantes já calculadas, como o
+back-end-fasta envia) e mede, sem rede:
+
+  - a rota ``/classificar-exon29`` pelo cliente de teste do Flask;
+  - a predição antiga (``DataFrame`` de uma linha + ``predict`` +
+    ``predict_proba``) e o caminho rápido (``Classificador.classificar``),
+    conferindo antes que as duas dão a mesma classe e confiança.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from utils import _alinhar_para_variantes, extrair_features, load_exon29_reference  # noqa: E402
+
+
+def percentis(tempos_ms: List[float]) -> Dict[str, float]:
+    ordenados = sorted(tempos_ms)
+    indice = lambda fracao: ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]  # noqa: E731
+    return {
+        "p50": round(indice(0.5), 3),
+        "p99": round(indice(0.99), 3),
+        "media": round(statistics.fmean(ordenados), 3),
+        "max": round(ordenados[-1], 3),
+    }
+
+
+def medir(funcao: Callable[[object], object], entradas: List[object], aquecimento: int) -> Dict[str, float]:
+    for entrada in entradas[:aquecimento]:
+        funcao(entrada)
+    tempos = []
+    for entrada in entradas:
+        inicio = time.perf_counter()
+        funcao(entrada)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return percentis(tempos)
+
+
+def predicao_antiga(modelo, features: Dict[str, float]):
+    """Implementação anterior: DataFrame de uma linha e a floresta avaliada duas vezes."""
+    features_df = pd.DataFrame([features])
+    pred = modelo.predict(features_df)[0]
+    prob = modelo.predict_proba(features_df)[0].max()
+    return int(pred), float(prob)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=500)
+    parser.add_argument("--aquecimento", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app import app, classificador, modelo
+
+    referencia = load_exon29_reference()
+    sequencias = list(pd.read_csv("model/pkd1_exon29_variants.csv")["sequence"])
+    rng = random.Random(args.seed)
+    alinhamentos = []
+    for sequencia in (rng.choice(sequencias) for _ in range(args.requisicoes)):
+        variantes, identidade, _ = _alinhar_para_variantes(referencia, sequencia)
+        # Posições vêm como inteiros NumPy; o back-end-fasta as envia já em JSON
+        variantes = json.loads(json.dumps(variantes, default=int))
+        alinhamentos.append({
+            "exon29_amostra": sequencia,
+            "exon29_referencia": referencia,
+            "variantes_exon29": variantes,
+            "melhor_alinhamento": {"identidade_pct": identidade},
+        })
+    lista_features = [
+        extrair_features(
+            a["exon29_amostra"],
+            referencia=a["exon29_referencia"],
+            variantes=a["variantes_exon29"],
+            identidade=a["melhor_alinhamento"]["identidade_pct"],
+        )
+        for a in alinhamentos
+    ]
+
+    for features in lista_features:
+        classe, prob = classificador.classificar(features)
+        if (int(classe), prob) != predicao_antiga(modelo, features):
+            print("Caminho rápido diverge da predição antiga")
+            return 1
+
+    cliente = app.test_client()
+    with contextlib.redirect_stdout(io.StringIO()):
+        rota = medir(lambda a: cliente.post("/classificar-exon29", json={"alinhamento_result": a}),
+                     alinhamentos, args.aquecimento)
+    resultados = {
+        "rota /classificar-exon29": rota,
+        "predicao antiga": medir(lambda f: predicao_antiga(modelo, f), lista_features, args.aquecimento),
+        "predicao rapida": medir(classificador.classificar, lista_features, args.aquecimento),
+    }
+
+    print(f"{args.requisicoes} requisições ({len(classificador.ordem)} features, "
+          f"{len(modelo.estimators_)} árvores)\n")
+    print(f"{'medida':<26} {'p50 ms':>8} {'p99 ms':>8} {'média':>8} {'máx':>8}")
+    for nome, valores in resultados.items():
+        print(f"{nome:<26} {valores['p50']:>8} {valores['p99']:>8} {valores['media']:>8} {valores['max']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
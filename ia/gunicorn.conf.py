@@ -0,0 +1,23 @@
+"""Configuração do gunicorn para o serviço de IA.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Variáveis de ambiente: ``GUNICORN_WORKERS`` (processos, padrão: número de
+CPUs), ``GUNICORN_THREADS`` (threads por processo, padrão 2),
+``GUNICORN_TIMEOUT`` (segundos, padrão 30) e ``PORT`` (padrão 6000).
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '6000')}"
+workers = max(1, int(os.getenv("GUNICORN_WORKERS", os.cpu_count() or 1)))
+threads = max(1, int(os.getenv("GUNICORN_THREADS", 2)))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 15
+keepalive = 5
+
+# Carrega o modelo no mestre antes do fork
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
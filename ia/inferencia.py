@@ -0,0 +1,87 @@
+"""Caminho rápido de inferência do Random Forest.
+
+As features chegam como dicionário (``utils.extrair_features``); aqui elas
+são copiadas, na ordem fixa de ``model/feature_order.json``, para uma linha
+NumPy pré-alocada (uma por thread) ou para a matriz do lote. Cada chamada faz
+um único ``predict_proba`` e a classe sai do argmax sobre ``classes_`` — o
+mesmo que ``predict`` faria, sem percorrer a floresta de novo.
+
+Quando o modelo foi treinado com nomes de colunas (``feature_names_in_``), a
+linha vai para o ``predict_proba`` embrulhada em um ``DataFrame`` sem cópia,
+com esses nomes, e o sklearn confere a ordem em vez de avisar.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+ORDEM_FEATURES_PATH = "model/feature_order.json"
+VERSAO_ORDEM_FEATURES = 1
+
+
+def salvar_ordem_features(features: Sequence[str], path: str = ORDEM_FEATURES_PATH) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"versao": VERSAO_ORDEM_FEATURES, "features": list(features)}, handle, indent=2)
+        handle.write("\n")
+
+
+def carregar_ordem_features(modelo, path: str = ORDEM_FEATURES_PATH) -> List[str]:
+    """Lê a ordem versionada das features e confere com a do modelo treinado."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Ordem das features não encontrada em {path}. Rode o train_model.py.")
+    with open(path, encoding="utf-8") as handle:
+        dados = json.load(handle)
+    if dados.get("versao") != VERSAO_ORDEM_FEATURES:
+        raise ValueError(f"Versão de {path} não suportada: {dados.get('versao')}")
+
+    ordem = list(dados["features"])
+    treinadas = getattr(modelo, "feature_names_in_", None)
+    if treinadas is not None and list(treinadas) != ordem:
+        raise ValueError(f"{path} não corresponde às features do modelo: {list(treinadas)}")
+    return ordem
+
+
+class Classificador:
+    """Modelo + ordem das features, com a linha de entrada pré-alocada."""
+
+    def __init__(self, modelo, ordem: Sequence[str]):
+        self.modelo = modelo
+        self.ordem = list(ordem)
+        self.classes = modelo.classes_
+        self._com_nomes = getattr(modelo, "feature_names_in_", None) is not None
+        self._local = threading.local()
+
+    def _linha(self) -> np.ndarray:
+        linha = getattr(self._local, "linha", None)
+        if linha is None:
+            linha = self._local.linha = np.zeros((1, len(self.ordem)), dtype=np.float64)
+        return linha
+
+    def _preencher(self, destino: np.ndarray, features: Dict[str, float]) -> None:
+        for coluna, nome in enumerate(self.ordem):
+            destino[coluna] = features[nome]
+
+    def _probabilidades(self, matriz: np.ndarray) -> np.ndarray:
+        if self._com_nomes:
+            return self.modelo.predict_proba(pd.DataFrame(matriz, columns=self.ordem, copy=False))
+        return self.modelo.predict_proba(matriz)
+
+    def classificar(self, features: Dict[str, float]) -> Tuple[object, float]:
+        """``(classe, probabilidade da classe)`` de uma amostra."""
+        linha = self._linha()
+        self._preencher(linha[0], features)
+        probabilidades = self._probabilidades(linha)[0]
+        indice = int(probabilidades.argmax())
+        return self.classes[indice], float(probabilidades[indice])
+
+    def classificar_lote(self, lista_features: Sequence[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Classes e probabilidades de N amostras com um único ``predict_proba``."""
+        matriz = np.empty((len(lista_features), len(self.ordem)), dtype=np.float64)
+        for linha, features in zip(matriz, lista_features):
+            self._preencher(linha, features)
+        probabilidades = self._probabilidades(matriz)
+        indices = probabilidades.argmax(axis=1)
+        return self.classes[indices], probabilidades[np.arange(len(indices)), indices]
@@ -0,0 +1,161 @@
+"""Métricas no formato texto do Prometheus (``/metrics``) e cronômetro por etapa.
+
+Implementação mínima de contadores e histogramas com rótulos, sem
+dependências externas. Os valores são do processo: com vários workers do
+gunicorn cada um exporta os seus.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Limites (segundos) dos histogramas de duração: a classificação leva de décimos de ms a alguns segundos
+LIMITES_DURACAO = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LE_INFINITO = 'le="+Inf"'
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _rotulos(nomes: Sequence[str], valores: Tuple[str, ...], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class Contador:
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, quantidade: float = 1, **rotulos: str) -> None:
+        chave = tuple(str(rotulos[nome]) for nome in self.rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + quantidade
+
+    def exportar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            for chave, valor in sorted(self._valores.items()):
+                linhas.append(f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}")
+        return linhas
+
+
+class Histograma:
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), limites: Sequence[float] = LIMITES_DURACAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.limites = tuple(sorted(limites))
+        # chave -> (contagens por faixa, soma, total)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **rotulos: str) -> None:
+        chave = tuple(str(rotulos[nome]) for nome in self.rotulos)
+        faixa = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * len(self.limites), 0.0, 0]
+            if faixa < len(self.limites):
+                serie[0][faixa] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exportar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            for chave, (contagens, soma, total) in sorted(self._series.items()):
+                acumulado = 0
+                for limite, contagem in zip(self.limites, contagens):
+                    acumulado += contagem
+                    le = _rotulos(self.rotulos, chave, f'le="{_numero(limite)}"')
+                    linhas.append(f"{self.nome}_bucket{le} {acumulado}")
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, chave, LE_INFINITO)} {total}")
+                linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {repr(soma)}")
+                linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas: List[object] = []
+
+    def contador(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()) -> Contador:
+        metrica = Contador(nome, ajuda, rotulos)
+        self._metricas.append(metrica)
+        return metrica
+
+    def histograma(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), limites: Sequence[float] = LIMITES_DURACAO) -> Histograma:
+        metrica = Histograma(nome, ajuda, rotulos, limites)
+        self._metricas.append(metrica)
+        return metrica
+
+    def exportar(self) -> str:
+        linhas: List[str] = []
+        for metrica in self._metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Cronometro:
+    """Acumula a duração de cada etapa de uma requisição, em milissegundos."""
+
+    def __init__(self):
+        self.tempos_ms: Dict[str, float] = {}
+
+    @contextmanager
+    def etapa(self, nome: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.adicionar(nome, (time.perf_counter() - inicio) * 1000)
+
+    def adicionar(self, nome: str, ms: float) -> None:
+        self.tempos_ms[nome] = self.tempos_ms.get(nome, 0.0) + ms
+
+    def incorporar(self, tempos_ms: Dict[str, float]) -> None:
+        for nome, ms in tempos_ms.items():
+            self.adicionar(nome, ms)
+
+    def resumo(self) -> Dict[str, float]:
+        return {nome: round(ms, 3) for nome, ms in self.tempos_ms.items()}
+
+
+registro_metricas = RegistroMetricas()
+
+duracao_etapas = registro_metricas.histograma(
+    "catbio_ia_etapa_duracao_segundos",
+    "Duração de cada etapa da classificação do exon29",
+    ("etapa",),
+)
+classificacoes = registro_metricas.contador(
+    "catbio_ia_classificacoes_total",
+    "Classificações concluídas por classe prevista",
+    ("classe",),
+)
+erros = registro_metricas.contador(
+    "catbio_ia_erros_total",
+    "Requisições de classificação recusadas ou com falha, por tipo",
+    ("tipo",),
+)
+
+
+def registrar_etapas(tempos_ms: Dict[str, float]) -> None:
+    for etapa, ms in tempos_ms.items():
+        duracao_etapas.observar(ms / 1000, etapa=etapa)
@@ -4,6 +4,7 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
 
+from inferencia import salvar_ordem_features
 from utils import extrair_features, load_exon29_reference
 
 
@@ -30,6 +31,8 @@ def main():
     print(classification_report(y_test, y_pred))
 
     joblib.dump(clf, "model/random_forest_model.pkl")
+    # Ordem fixa das colunas usada pelo caminho rápido de inferência (inferencia.py)
+    salvar_ordem_features(X.columns)
     print("Modelo treinado e salvo com sucesso.")
 
 
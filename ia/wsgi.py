@@ -0,0 +1,17 @@
+"""Ponto de entrada WSGI do serviço de IA (gunicorn, ver ``gunicorn.conf.py``).
+
+Com ``preload_app`` o modelo ``joblib`` é carregado uma única vez no processo
+mestre e compartilhado pelos workers por copy-on-write. Em produção o
+perfilador fica desligado salvo ``PERFIL`` explícito (ver ``perfilador``).
+"""
+import gc
+import os
+
+os.environ.setdefault("PERFIL", "desligado")
+
+from app import app  # noqa: E402
+
+# Objetos já carregados (modelo) saem do rastreamento do GC, preservando o compartilhamento
+gc.freeze()
+
+application = app